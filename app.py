@@ -1,17 +1,47 @@
 import streamlit as st
+import html
 import time
 import os
-import tempfile
-import requests
+import uuid
+import threading
 from streamlit_mic_recorder import mic_recorder
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from transcription import Transcriber
-from config import LOGGERS, ELEVEN_LABS_API_KEY, VOICE_CONFIG, INTERFACE_TEXT
+from tts_cache import TTSCache
+from audio_workspace import AudioWorkspace
+from tts_client import TTSClient, tts_cache_key
+from streaming_pipeline import StreamingPipeline
+from async_transcriber import AsyncTranscriber, EventLoopBridge
+from audio_server import AudioServer
+from prefetch import Prefetcher
+from vad import trim_silence
+from rate_limiter import current_session
+from metrics import METRICS, MetricsServer, span
+from config import (
+    LOGGERS,
+    VOICE_CONFIG,
+    INTERFACE_TEXT,
+    STREAMING_PIPELINE_ENABLED,
+    ASYNC_PIPELINE_ENABLED,
+    TTS_STREAMING_ENABLED,
+    AUDIO_SERVER_ENABLED,
+    ELEVEN_LABS_READ_TIMEOUT,
+    TTS_EDIT_DEBOUNCE_SECONDS,
+    VAD_ENABLED,
+    METRICS_ENABLED,
+    AUDIO_SPILL_TO_DISK,
+    PREFETCH_ENABLED,
+)
 from audio_player import create_audio_player
 
 # Get UI logger
 ui_logger = LOGGERS['ui']
 tts_logger = LOGGERS['tts']
 
+# Stands in for the Spanish transcript when there is none, so the results still render
+SPANISH_AUDIO_PLACEHOLDER = "Spanish audio"
+
 # Page config optimized for mobile
 st.set_page_config(
     page_title="BiLingual AI",
@@ -471,7 +501,7 @@ def init_session_state():
     ui_logger.debug("Initializing session state variables")
     
     defaults = {
-        'audio_file': None,
+        'audio_file': None,  # recording bytes, or its workspace path with AUDIO_SPILL_TO_DISK
         'transcription': "",
         'translation': "",
         'auto_play': False,
@@ -479,7 +509,12 @@ def init_session_state():
         'last_error': None,
         'interface_language': 'english',  # english or spanish
         'selected_voice_gender': 'male',   # male or female
-        'last_audio_data': None
+        'last_audio_data': None,
+        'streamed_audio': None,  # sentence-chunked TTS from the streaming pipeline
+        'session_id': uuid.uuid4().hex[:12],  # rate limiter fairness key
+        'turn_started_at': None,  # perf_counter when the latest recording arrived
+        'tts_text': "",  # committed translation the player synthesizes
+        'translation_edited_at': None  # monotonic time of the latest uncommitted edit
     }
     
     for key, default_value in defaults.items():
@@ -489,14 +524,102 @@ def init_session_state():
 
 init_session_state()
 
+# Groq requests made during this run queue fairly against other sessions
+current_session.set(st.session_state.session_id)
+
 # Initialize components
 @st.cache_resource(show_spinner=False)
-def get_transcriber(version="v2_with_bidirectional_translation"):
-    ui_logger.info("Initializing transcriber with translate_text_to_english support")
+def get_transcriber(version="v4_with_rate_limiter"):
+    ui_logger.info("Initializing transcriber with translation memory and rate limiter")
     return Transcriber()
 
 transcriber = get_transcriber()
 
+@st.cache_resource(show_spinner=False)
+def get_tts_cache():
+    ui_logger.info("Initializing shared TTS audio cache")
+    return TTSCache()
+
+tts_cache = get_tts_cache()
+
+@st.cache_resource(show_spinner=False)
+def get_audio_workspace():
+    ui_logger.info("Initializing shared audio workspace")
+    return AudioWorkspace(tts_cache=tts_cache)
+
+audio_workspace = get_audio_workspace()
+
+def _session_alive(runtime_session_id):
+    return lambda: Runtime.exists() and Runtime.instance().is_active_session(runtime_session_id)
+
+# Recordings go to this session's workspace directory, which is removed once the session ends
+script_ctx = get_script_run_ctx()
+audio_workspace.open_session(
+    st.session_state.session_id,
+    alive=_session_alive(script_ctx.session_id) if script_ctx else None
+)
+
+@st.cache_resource(show_spinner=False)
+def get_tts_client():
+    ui_logger.info("Initializing shared ElevenLabs TTS client")
+    return TTSClient()
+
+tts_client = get_tts_client()
+
+@st.cache_resource(show_spinner=False)
+def get_audio_server():
+    ui_logger.info("Starting local audio server")
+    return AudioServer(tts_cache)
+
+audio_server = get_audio_server() if AUDIO_SERVER_ENABLED else None
+
+@st.cache_resource(show_spinner=False)
+def get_async_runtime():
+    ui_logger.info("Initializing async transcriber and event loop bridge")
+    bridge = EventLoopBridge()
+    async_transcriber = AsyncTranscriber(
+        translation_memory=transcriber.translation_memory,
+        tts_cache=tts_cache,
+        rate_limiter=transcriber.rate_limiter
+    )
+    return bridge, async_transcriber
+
+if ASYNC_PIPELINE_ENABLED:
+    async_bridge, async_transcriber = get_async_runtime()
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    ui_logger.info("Starting speculative TTS/back-translation prefetcher")
+    return Prefetcher()
+
+prefetcher = get_prefetcher() if PREFETCH_ENABLED else None
+
+@st.cache_resource(show_spinner=False)
+def get_metrics_server():
+    ui_logger.info("Starting Prometheus metrics endpoint")
+    if transcriber.rate_limiter:
+        METRICS.register_gauge(
+            "bilingual_rate_limit_queue_depth",
+            "Groq requests waiting for rate limiter capacity",
+            lambda: {(("model", model),): stats["queue_depth"] for model, stats in transcriber.rate_limiter.stats().items()}
+        )
+    routers = (transcriber.stt, transcriber.mt, tts_client.backends)
+    METRICS.register_gauge(
+        "bilingual_backend_hedge_rate",
+        "Share of backend calls that fired a hedged backup request",
+        lambda: {(("kind", router.kind),): router.stats()["hedging"]["hedge_rate"] for router in routers}
+    )
+    return MetricsServer()
+
+metrics_server = get_metrics_server() if METRICS_ENABLED else None
+
+def finish_turn(error=False):
+    """Record end-to-end latency from record-received to the player rendering"""
+    started = st.session_state.turn_started_at
+    if started is not None:
+        METRICS.observe("end_to_end", time.perf_counter() - started, error=error)
+        st.session_state.turn_started_at = None
+
 def text_to_speech(text, lang='es'):
     """Convert text to speech using ElevenLabs with voice selection based on language and gender"""
     # Ensure text is a proper string
@@ -518,6 +641,8 @@ def text_to_speech(text, lang='es'):
         
         # Always use ElevenLabs now for both languages
         tts_logger.info(f"Using ElevenLabs TTS: {voice_lang} {gender} voice ({voice_id})")
+        if TTS_STREAMING_ENABLED:
+            return eleven_labs_tts_stream(text, voice_id)
         return eleven_labs_tts(text, voice_id)
         
     except Exception as e:
@@ -528,54 +653,102 @@ def eleven_labs_tts(text, voice_id):
     """Generate TTS using ElevenLabs API with specified voice"""
     tts_logger.info(f"Generating ElevenLabs TTS for voice {voice_id}")
     
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-    
-    headers = {
-        "Accept": "audio/mpeg",
-        "Content-Type": "application/json",
-        "xi-api-key": ELEVEN_LABS_API_KEY
-    }
-    
-    data = {
-        "text": text,
-        "model_id": "eleven_multilingual_v2",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.5
-        }
-    }
-    
-    try:
-        tts_logger.debug(f"Making ElevenLabs API request: {url}")
-        response = requests.post(url, json=data, headers=headers)
-        response.raise_for_status()
-        
-        # Save the audio to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-            fp.write(response.content)
-            file_size = len(response.content)
-            tts_logger.info(f"ElevenLabs audio generated: {fp.name} ({file_size} bytes)")
-            
-            # Validate it's actually MP3 audio
-            if file_size < 100:
-                tts_logger.error(f"ElevenLabs audio file too small: {file_size} bytes")
-                return None
-            
-            # Check first few bytes for MP3 signature
-            fp.seek(0)
-            header = fp.read(4)
-            if not (header.startswith(b'ID3') or header.startswith(b'\xff\xfb')):
-                tts_logger.error(f"Invalid MP3 header from ElevenLabs: {header}")
-                return None
-                
-            return fp.name
-            
-    except requests.exceptions.RequestException as e:
-        tts_logger.error(f"ElevenLabs API request failed: {e}")
-        return None
-    except Exception as e:
-        tts_logger.error(f"ElevenLabs TTS generation failed: {e}")
+    # Reruns re-render the player for the same text, so repeats are served from the cache
+    return tts_client.synthesize_to_cache(tts_cache, text, voice_id)
+
+def eleven_labs_tts_stream(text, voice_id):
+    """Stream TTS from ElevenLabs; with the audio server the player can start before the download ends"""
+    tts_logger.info(f"Streaming ElevenLabs TTS for voice {voice_id}")
+    
+    cache_key = tts_cache_key(tts_cache, text, voice_id)
+    cached_path = tts_cache.get(cache_key)
+    if cached_path:
+        return cached_path
+    
+    # A rerun while the download is still running joins it instead of starting another
+    entry, created = tts_cache.open_stream(cache_key)
+    
+    if not audio_server:
+        # Nowhere to relay the stream from, so play the file once it is complete
+        if created:
+            tts_client.stream_to(entry, text, voice_id)
+        return entry.wait_until_done(timeout=ELEVEN_LABS_READ_TIMEOUT)
+    
+    if created:
+        threading.Thread(
+            target=tts_client.stream_to,
+            args=(entry, text, voice_id),
+            name="tts-stream",
+            daemon=True
+        ).start()
+    
+    if not entry.wait_for_data(timeout=ELEVEN_LABS_READ_TIMEOUT):
+        tts_logger.error("ElevenLabs stream produced no audio")
         return None
+    return audio_server.tts_url(cache_key)
+
+def set_translation(text):
+    """Set the translation from a pipeline result; it is committed for TTS right away"""
+    st.session_state.translation = text
+    st.session_state.tts_text = str(text or "")
+    st.session_state.translation_edited_at = None
+
+def edit_translation(text):
+    """Record a text area edit; TTS waits for an explicit commit or the idle debounce"""
+    st.session_state.translation = text
+    st.session_state.translation_edited_at = time.monotonic()
+
+def commit_translation_edit():
+    """Make the edited translation the text the player synthesizes"""
+    st.session_state.tts_text = str(st.session_state.translation or "")
+    st.session_state.translation_edited_at = None
+
+def edit_is_idle():
+    edited_at = st.session_state.translation_edited_at
+    return TTS_EDIT_DEBOUNCE_SECONDS > 0 and time.monotonic() - edited_at >= TTS_EDIT_DEBOUNCE_SECONDS
+
+@st.fragment(run_every=0.5)
+def debounce_translation_edit():
+    """Poll while an edit is pending and rerun the app once it has been idle long enough"""
+    if st.session_state.translation_edited_at is not None and edit_is_idle():
+        st.rerun(scope="app")
+
+def render_audio_commit():
+    """Resolve a pending translation edit and return the text to synthesize
+
+    An edit is committed by the Update audio button or after
+    TTS_EDIT_DEBOUNCE_SECONDS without further edits; until then the player keeps
+    the last committed audio, so half-typed text is never sent to ElevenLabs.
+    """
+    if st.session_state.translation_edited_at is None:
+        return str(st.session_state.tts_text or "")
+    if str(st.session_state.translation or "") == st.session_state.tts_text:
+        # Edited back to the committed text
+        st.session_state.translation_edited_at = None
+    elif edit_is_idle() or st.button("🔊 Update audio", key="commit_translation_edit", use_container_width=True):
+        commit_translation_edit()
+    elif TTS_EDIT_DEBOUNCE_SECONDS > 0:
+        debounce_translation_edit()
+    return str(st.session_state.tts_text or "")
+
+def prefetch_after_translation(translation_text, voice_lang):
+    """Warm the TTS cache for the other voice and, for Spanish, precompute the back-translation"""
+    if not prefetcher:
+        return
+    other_gender = "female" if st.session_state.selected_voice_gender == "male" else "male"
+    other_voice_id = VOICE_CONFIG[voice_lang][other_gender]
+    tasks = [("alternate_voice", lambda: eleven_labs_tts(translation_text, other_voice_id))]
+    if voice_lang == "spanish":
+        tasks.append(("back_translation", lambda: transcriber.translate_text_to_english(translation_text.strip())))
+    # Keyed by text: reruns for the same translation are no-ops, an edit cancels the old work
+    prefetcher.schedule(st.session_state.session_id, (voice_lang, translation_text), tasks)
+
+def keep_recording(audio_bytes):
+    """What st.session_state.audio_file holds for retranslation: the bytes, or a workspace path when spilling"""
+    if AUDIO_SPILL_TO_DISK:
+        return audio_workspace.write(st.session_state.session_id, audio_bytes, ".wav", slot="audio_file")
+    audio_workspace.set_slot(st.session_state.session_id, "audio_file", None)
+    return audio_bytes
 
 def play_audio(file_path):
     """Play audio file with logging - Streamlit Cloud compatible"""
@@ -590,6 +763,8 @@ def main():
     # Get current interface language and text
     interface_lang = st.session_state.interface_language
     text = INTERFACE_TEXT[interface_lang]
+    # Set when this run's streamed translation is already playing above the results
+    early_player = False
     
     # Language Switch at the top
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -616,7 +791,7 @@ def main():
             
             # Clear previous results
             st.session_state.transcription = ""
-            st.session_state.translation = ""
+            set_translation("")
             st.rerun()
     
     # Header with Groq branding
@@ -672,7 +847,7 @@ def main():
         st.session_state.language_mode = new_mode
         # Clear previous results
         st.session_state.transcription = ""
-        st.session_state.translation = ""
+        set_translation("")
     
     # Auto-play toggle (moved up)
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -833,44 +1008,116 @@ def main():
         # Process audio when recording is complete
         if audio and audio != st.session_state.get('last_audio_data'):
             st.session_state.last_audio_data = audio
+            st.session_state.turn_started_at = time.perf_counter()
             audio_bytes = audio['bytes'] if isinstance(audio, dict) else audio
             
             with st.spinner("Processing audio..."):
                 ui_logger.info("Processing recorded audio")
                 
-                # Save audio to temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                    temp_file.write(audio_bytes)
-                    audio_file = temp_file.name
+                with span("preprocess"):
+                    if VAD_ENABLED:
+                        # Don't pay upload bytes and Whisper time for silence
+                        audio_bytes, _ = trim_silence(audio_bytes)
+                    
+                    # Groq gets the recorder bytes straight from memory; only retranslation may need them on disk
+                    audio_file = keep_recording(audio_bytes)
                 
-                if audio_file:
-                    ui_logger.info(f"Audio processing successful: {audio_file}")
+                if audio_bytes:
+                    ui_logger.info(f"Audio processing successful: {len(audio_bytes)} bytes")
                     st.session_state.audio_file = audio_file
                     
-                    if st.session_state.language_mode == "English → Spanish":
+                    if ASYNC_PIPELINE_ENABLED:
+                        # Both voices are synthesized concurrently into the TTS cache,
+                        # so the player below and any voice flip are cache hits
+                        if st.session_state.language_mode == "English → Spanish":
+                            ui_logger.info("Starting async English → Spanish translation workflow")
+                            english_text, spanish_text, _ = async_bridge.run(async_transcriber.english_to_spanish(audio_bytes))
+                            st.session_state.transcription = english_text
+                            set_translation(spanish_text)
+                        else:
+                            ui_logger.info("Starting async Spanish → English translation workflow")
+                            spanish_text, english_translation, _ = async_bridge.run(async_transcriber.spanish_to_english(audio_bytes))
+                            set_translation(english_translation)
+                            st.session_state.transcription = spanish_text or SPANISH_AUDIO_PLACEHOLDER
+                        ui_logger.info("Async translation workflow completed")
+                    elif st.session_state.language_mode == "English → Spanish" and STREAMING_PIPELINE_ENABLED:
+                        ui_logger.info("Starting streamed English → Spanish translation workflow")
+                        english_text = transcriber.transcribe_audio(audio_bytes, language="en")
+                        st.session_state.transcription = english_text
+                        
+                        if english_text and not english_text.startswith("Error"):
+                            # Start TTS on each translated sentence as it streams in
+                            voice_id = VOICE_CONFIG["spanish"][st.session_state.selected_voice_gender]
+                            pipeline = StreamingPipeline(transcriber, lambda sentence: eleven_labs_tts(sentence, voice_id))
+                            track = None
+                            remembered = None
+                            spanish_text = audio_chunks = None
+                            if audio_server:
+                                # The sentence clips are appended to one stream the player follows,
+                                # so playback starts with the first sentence while the rest is translated.
+                                # Its URL is served as immutable, so the key must name the Spanish audio itself
+                                if transcriber.translation_memory:
+                                    remembered = transcriber.translation_memory.lookup("en-es", english_text)
+                                if remembered is not None:
+                                    track_key = tts_cache_key(tts_cache, f"streaming-pipeline\n{remembered}", voice_id)
+                                    cached_track = tts_cache.get(track_key)
+                                    if cached_track:
+                                        spanish_text, audio_chunks = remembered, [cached_track]
+                                else:
+                                    # The translation is unknown until the stream ends, so this run's track is its own
+                                    track_key = tts_cache_key(
+                                        tts_cache, f"streaming-pipeline\n{english_text}\n{uuid.uuid4().hex}", voice_id
+                                    )
+                                if audio_chunks is None:
+                                    track, created = tts_cache.open_stream(track_key)
+                                    if not created:
+                                        track = None
+                                if track or audio_chunks:
+                                    create_audio_player(
+                                        audio_server.tts_url(track_key), "Spanish Translation",
+                                        autoplay=st.session_state.auto_play, audio_server=audio_server
+                                    )
+                            if audio_chunks:
+                                early_player = True
+                            else:
+                                spanish_text, audio_chunks = pipeline.run(english_text, track=track, translation=remembered)
+                                early_player = bool(track and track.done and audio_chunks)
+                            st.session_state.streamed_audio = {
+                                "text": str(spanish_text),
+                                "voice_id": voice_id,
+                                "paths": [track.path] if track and early_player else audio_chunks
+                            } if audio_chunks else None
+                            set_translation(spanish_text)
+                            ui_logger.info("English → Spanish workflow completed")
+                        else:
+                            ui_logger.error(f"Transcription failed: {english_text}")
+                    elif st.session_state.language_mode == "English → Spanish":
                         ui_logger.info("Starting English → Spanish translation workflow")
-                        # English to Spanish
-                        english_text = transcriber.transcribe_audio(audio_file, language="en")
+                        # Transcription and translation run as the configured en-es strategy
+                        english_text, spanish_text = transcriber.translate_speech(audio_bytes, "en-es")
                         st.session_state.transcription = english_text
                         
                         if english_text and not english_text.startswith("Error"):
-                            spanish_text = transcriber.translate_text_to_spanish(english_text)
-                            st.session_state.translation = spanish_text
+                            set_translation(spanish_text)
                             ui_logger.info("English → Spanish workflow completed")
                         else:
                             ui_logger.error(f"Transcription failed: {english_text}")
                     else:
                         ui_logger.info("Starting Spanish → English translation workflow")
                         # Spanish to English  
-                        english_translation = transcriber.translate_audio(audio_file)
-                        st.session_state.translation = english_translation
-                        st.session_state.transcription = "Spanish audio"
+                        spanish_text, english_translation = transcriber.translate_speech(audio_bytes, "es-en")
+                        set_translation(english_translation)
+                        if not spanish_text or spanish_text.startswith("Error"):
+                            spanish_text = SPANISH_AUDIO_PLACEHOLDER
+                        st.session_state.transcription = spanish_text
                         ui_logger.info("Spanish → English workflow completed")
                 else:
                     ui_logger.error("Audio processing failed - no file returned")
                     st.session_state.last_error = "Failed to process audio"
             
-            st.rerun()
+            if not early_player:
+                # A rerun would unmount the player that is already playing the streamed track
+                st.rerun()
     
     
     # Add some spacing before results
@@ -917,7 +1164,7 @@ def main():
                         with st.spinner(text["generating_audio"]):
                             # Translate the edited English text
                             spanish_translation = transcriber.translate_text_to_spanish(current_text.strip())
-                            st.session_state.translation = spanish_translation
+                            set_translation(spanish_translation)
                             st.rerun()
             
             # Spanish editable card with embedded copy
@@ -943,7 +1190,7 @@ def main():
             
             # Update session state if text changed
             if spanish_text != st.session_state.translation:
-                st.session_state.translation = spanish_text
+                edit_translation(spanish_text)
             
             # Translate button (Spanish to English)
             col1, col2, col3 = st.columns([1, 1, 1])
@@ -953,38 +1200,57 @@ def main():
                     current_text = str(spanish_text or "")
                     if current_text.strip():
                         with st.spinner(text["generating_audio"]):
-                            # Translate the edited Spanish text to English
-                            english_translation = transcriber.translate_text_to_english(current_text.strip())
+                            # Translate the edited Spanish text to English, unless it was already prefetched
+                            english_translation = prefetcher.result(
+                                st.session_state.session_id, "back_translation", ("spanish", current_text)
+                            ) if prefetcher else None
+                            if not english_translation or english_translation.startswith("Error"):
+                                english_translation = transcriber.translate_text_to_english(current_text.strip())
                             st.session_state.transcription = english_translation
                             st.rerun()
             
             # Play Spanish audio with custom player
-            translation_text = str(st.session_state.translation or "")
+            translation_text = render_audio_commit()
             if translation_text and not translation_text.startswith("Error"):
                 st.markdown(f"### {text['audio_player']}")
                 
-                # Generate TTS audio
+                # Generate TTS audio, reusing the streamed sentence chunks if they still match
                 with st.spinner(text["generating_audio"]):
-                    audio_path = text_to_speech(translation_text, 'es')
+                    streamed = st.session_state.streamed_audio
+                    voice_id = VOICE_CONFIG["spanish"][st.session_state.selected_voice_gender]
+                    if streamed and streamed["text"] == translation_text and streamed["voice_id"] == voice_id:
+                        audio_path = streamed["paths"]
+                    else:
+                        audio_path = text_to_speech(translation_text, 'es')
                     if audio_path:
                         tts_logger.info(f"Generated Spanish TTS audio: {audio_path}")
+                        audio_workspace.set_slot(st.session_state.session_id, "tts", audio_path)
                         # Check if auto-play is enabled
                         should_autoplay = st.session_state.auto_play
                         if should_autoplay:
                             tts_logger.info("Auto-playing translation")
-                        create_audio_player(audio_path, "Spanish Translation", autoplay=should_autoplay)
+                        if not early_player:
+                            create_audio_player(audio_path, "Spanish Translation", autoplay=should_autoplay, audio_server=audio_server)
+                        finish_turn()
+                        prefetch_after_translation(translation_text, "spanish")
                     else:
                         st.error("Failed to generate audio")
+                        finish_turn(error=True)
         else:
             # Spanish to English mode
-            # Spanish card
+            # Spanish card, with what was said when the transcript is available
+            spanish_text = st.session_state.transcription
+            if spanish_text and spanish_text != SPANISH_AUDIO_PLACEHOLDER:
+                spanish_card_text = html.escape(spanish_text)
+            else:
+                spanish_card_text = text["audio_recorded"]
             st.markdown(f"""
             <div class="language-card">
                 <div class="card-header">
                     <span class="card-flag">🇪🇸</span>
                     <h3 class="card-title">Spanish ({text["original"]})</h3>
                 </div>
-                <div class="card-text">{text["audio_recorded"]}</div>
+                <div class="card-text">{spanish_card_text}</div>
             </div>
             """, unsafe_allow_html=True)
             
@@ -1011,7 +1277,7 @@ def main():
             
             # Update session state if text changed
             if english_translation != st.session_state.translation:
-                st.session_state.translation = english_translation
+                edit_translation(english_translation)
             
             # Refresh/retranslate button
             col1, col2, col3 = st.columns([1, 1, 1])
@@ -1020,12 +1286,14 @@ def main():
                     if st.session_state.audio_file:
                         with st.spinner(text["generating_audio"]):
                             # Re-translate from Spanish audio
-                            new_translation = transcriber.translate_audio(st.session_state.audio_file)
-                            st.session_state.translation = new_translation
+                            spanish_text, new_translation = transcriber.translate_speech(st.session_state.audio_file, "es-en")
+                            set_translation(new_translation)
+                            if spanish_text and not spanish_text.startswith("Error"):
+                                st.session_state.transcription = spanish_text
                             st.rerun()
             
             # Play English audio with custom player
-            translation_text = str(st.session_state.translation or "")
+            translation_text = render_audio_commit()
             if translation_text and not translation_text.startswith("Error"):
                 st.markdown(f"### {text['audio_player']}")
                 
@@ -1034,13 +1302,17 @@ def main():
                     audio_path = text_to_speech(translation_text, 'en')
                     if audio_path:
                         tts_logger.info(f"Generated English TTS audio: {audio_path}")
+                        audio_workspace.set_slot(st.session_state.session_id, "tts", audio_path)
                         # Check if auto-play is enabled
                         should_autoplay = st.session_state.auto_play
                         if should_autoplay:
                             tts_logger.info("Auto-playing translation")
-                        create_audio_player(audio_path, "English Translation", autoplay=should_autoplay)
+                        create_audio_player(audio_path, "English Translation", autoplay=should_autoplay, audio_server=audio_server)
+                        finish_turn()
+                        prefetch_after_translation(translation_text, "english")
                     else:
                         st.error("Failed to generate audio")
+                        finish_turn(error=True)
     
     # Debug info (if there are errors)
     if st.session_state.last_error:
@@ -0,0 +1,379 @@
+"""
+asyncio counterpart to Transcriber, plus ElevenLabs TTS over httpx.
+The blocking Transcriber ties up the Streamlit script thread for the whole
+STT → MT → TTS chain; here independent steps (e.g. synthesizing both voice
+genders) run concurrently on a private event loop reached via EventLoopBridge.
+"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+import httpx
+from groq import AsyncGroq
+from config import (
+    GROQ_API_KEY,
+    LOGGERS,
+    TRANSLATION_MEMORY_ENABLED,
+    VOICE_CONFIG,
+    ELEVEN_LABS_CONNECT_TIMEOUT,
+    ELEVEN_LABS_READ_TIMEOUT,
+    ELEVEN_LABS_POOL_SIZE,
+    LONG_AUDIO_ENABLED,
+    LONG_AUDIO_MAX_WORKERS,
+    SPEECH_TRANSLATION_SOURCE_TRANSCRIPT,
+)
+from audio_encoding import read_audio, is_audio_path, describe_audio
+from long_audio import long_audio_chunks, stitch_transcripts
+from transcription import (
+    STT_MODEL,
+    TRANSLATION_MODEL,
+    SYSTEM_PROMPTS,
+    prepare_groq_upload,
+    transcription_params,
+    translation_params,
+)
+from translation_memory import TranslationMemory, TranslationResult
+from rate_limiter import estimate_chat_tokens
+from metrics import span
+from tts_client import build_tts_request, tts_cache_key, validate_tts_audio
+
+# Get specialized loggers
+transcription_logger = LOGGERS['transcription']
+api_logger = LOGGERS['api']
+tts_logger = LOGGERS['tts']
+
+
+class EventLoopBridge:
+    """Private event loop on a daemon thread that the Streamlit script can call into"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-transcriber-loop", daemon=True)
+        self._thread.start()
+        transcription_logger.info("Async event loop bridge started")
+
+    def submit(self, coro):
+        """Schedule a coroutine and return a concurrent.futures.Future
+
+        The coroutine sees the caller's context variables (e.g. the rate limiter session).
+        """
+        context = contextvars.copy_context()
+
+        async def run_in_caller_context():
+            for var, value in context.items():
+                var.set(value)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(run_in_caller_context(), self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the bridge loop and block until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+class AsyncTranscriber:
+    def __init__(self, translation_memory=None, tts_cache=None, rate_limiter=None, base_url=None):
+        transcription_logger.info("Initializing AsyncTranscriber with async Groq API")
+        try:
+            self.client = AsyncGroq(api_key=GROQ_API_KEY, base_url=base_url)
+            transcription_logger.info("Async Groq client initialized successfully")
+        except Exception as e:
+            transcription_logger.error(f"Failed to initialize async Groq client: {e}")
+            raise
+
+        # Keep-alive pool shared by all TTS requests
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(ELEVEN_LABS_READ_TIMEOUT, connect=ELEVEN_LABS_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=2 * ELEVEN_LABS_POOL_SIZE, max_keepalive_connections=ELEVEN_LABS_POOL_SIZE)
+        )
+
+        if translation_memory is None and TRANSLATION_MEMORY_ENABLED:
+            translation_memory = TranslationMemory()
+        self.translation_memory = translation_memory
+        self.tts_cache = tts_cache
+        # Pass the blocking Transcriber's limiter so both paths share one budget
+        self.rate_limiter = rate_limiter
+
+    async def _acquire(self, model, tokens=0):
+        if self.rate_limiter:
+            await asyncio.to_thread(self.rate_limiter.acquire, model, tokens)
+
+    async def _transcription(self, upload, prompt, language):
+        await self._acquire(STT_MODEL)
+        transcription = await self.client.audio.transcriptions.create(**transcription_params(upload, prompt, language))
+        return transcription.text
+
+    async def _translation(self, upload, prompt):
+        await self._acquire(STT_MODEL)
+        translation = await self.client.audio.translations.create(**translation_params(upload, prompt))
+        return translation.text
+
+    async def aclose(self):
+        await self.http.aclose()
+        await self.client.close()
+
+    async def transcribe_audio(self, audio, prompt=None, language="en"):
+        """Transcribe audio (file path, bytes or buffer) to text"""
+        transcription_logger.info(f"Starting async transcription: audio={describe_audio(audio)}, language={language}")
+
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
+            return "Error: Audio file not found."
+
+        try:
+            start_time = time.time()
+
+            api_logger.info("Making async API call to Groq transcription endpoint")
+            with span("stt", operation="transcribe", path="async"):
+                result_text = await self._run_audio_request(
+                    audio, lambda upload: self._transcription(upload, prompt, language)
+                )
+
+            api_time = time.time() - start_time
+            api_logger.info(f"Async transcription API call completed in {api_time:.2f}s")
+
+            transcription_logger.info(f"Transcription successful: '{result_text[:100]}...' ({len(result_text)} chars)")
+            return result_text
+
+        except Exception as e:
+            transcription_logger.error(f"Async transcription failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            return f"Error during transcription: {str(e)}"
+
+    async def translate_audio(self, audio, prompt=None):
+        """Translate audio (file path, bytes or buffer) from any language to English"""
+        transcription_logger.info(f"Starting async audio translation: audio={describe_audio(audio)}")
+
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
+            return "Error: Audio file not found."
+
+        try:
+            start_time = time.time()
+
+            api_logger.info("Making async API call to Groq translation endpoint")
+            with span("stt", operation="translate", path="async"):
+                result_text = await self._run_audio_request(audio, lambda upload: self._translation(upload, prompt))
+
+            api_time = time.time() - start_time
+            api_logger.info(f"Async translation API call completed in {api_time:.2f}s")
+
+            transcription_logger.info(f"Translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
+            return result_text
+
+        except Exception as e:
+            transcription_logger.error(f"Async audio translation failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            return f"Error during translation: {str(e)}"
+
+    async def transcribe_and_translate_audio(self, audio, language="es", prompt=None):
+        """(transcript in language, English translation) from concurrent calls on one upload"""
+        transcription_logger.info(f"Starting async transcription and audio translation: audio={describe_audio(audio)}, language={language}")
+
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
+            return "Error: Audio file not found.", "Error: Audio file not found."
+
+        try:
+            start_time = time.time()
+            api_logger.info("Making concurrent async API calls to Groq transcription and translation endpoints")
+            with span("stt", operation="transcribe_translate", path="async"):
+                transcript, translation = await self._run_audio_requests(audio, [
+                    lambda upload: self._transcription(upload, prompt, language),
+                    lambda upload: self._translation(upload, prompt),
+                ])
+            api_logger.info(f"Async transcription and translation API calls completed in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            transcription_logger.error(f"Async transcription and audio translation failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            return f"Error during transcription: {str(e)}", f"Error during translation: {str(e)}"
+
+        if isinstance(transcript, Exception):
+            transcription_logger.error(f"Async transcription failed: {transcript}")
+            transcript = f"Error during transcription: {str(transcript)}"
+        if isinstance(translation, Exception):
+            transcription_logger.error(f"Async audio translation failed: {translation}")
+            translation = f"Error during translation: {str(translation)}"
+        return transcript, translation
+
+    async def _read_audio(self, audio):
+        if is_audio_path(audio):
+            return await asyncio.to_thread(read_audio, audio)
+        return read_audio(audio)
+
+    async def _run_audio_requests(self, audio, requests):
+        """Await several request(upload) -> text calls on one recording concurrently
+
+        The audio is read and encoded once. Like the thread pool in
+        Transcriber, at most LONG_AUDIO_MAX_WORKERS uploads are encoded or
+        in flight per request at a time. Returns one result per request: its
+        text, or the exception it raised.
+        """
+        file_path, audio_bytes = await self._read_audio(audio)
+        chunks = await asyncio.to_thread(long_audio_chunks, audio_bytes) if LONG_AUDIO_ENABLED else None
+        pieces = [wav_bytes for _, wav_bytes in chunks] if chunks else [audio_bytes]
+
+        limit = asyncio.Semaphore(LONG_AUDIO_MAX_WORKERS * len(requests))
+
+        async def prepare(wav_bytes):
+            async with limit:
+                return await asyncio.to_thread(prepare_groq_upload, file_path, wav_bytes)
+
+        async def send(request, upload):
+            # Held for the whole request, not just its encoding
+            async with limit:
+                return await request(upload)
+
+        uploads = await asyncio.gather(*(prepare(wav_bytes) for wav_bytes in pieces))
+
+        async def run_request(request):
+            texts = await asyncio.gather(*(send(request, upload) for upload in uploads))
+            return stitch_transcripts(texts) if chunks else texts[0]
+
+        return await asyncio.gather(*(run_request(request) for request in requests), return_exceptions=True)
+
+    async def _run_audio_request(self, audio, request):
+        """Load audio (path, bytes or buffer) and await request(upload) -> text on it
+
+        Long recordings are split at pauses and the chunks sent concurrently.
+        """
+        (result,) = await self._run_audio_requests(audio, [request])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def translate_text_to_spanish(self, english_text):
+        """Translate English text to Spanish using Llama 3.3 70B"""
+        return await self._translate_text("en-es", english_text)
+
+    async def translate_text_to_english(self, spanish_text):
+        """Translate Spanish text to English using Llama 3.3 70B"""
+        return await self._translate_text("es-en", spanish_text)
+
+    async def _translate_text(self, direction, source_text):
+        transcription_logger.info(f"Starting async text translation ({direction}): '{source_text[:50]}...'")
+
+        if self.translation_memory:
+            remembered = await asyncio.to_thread(self.translation_memory.lookup, direction, source_text)
+            if remembered is not None:
+                return remembered
+
+        try:
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPTS[direction]},
+                {"role": "user", "content": source_text}
+            ]
+            estimated_tokens = estimate_chat_tokens(messages, 1000)
+            await self._acquire(TRANSLATION_MODEL, estimated_tokens)
+            start_time = time.time()
+
+            api_logger.info(f"Making async API call to Groq chat completion ({direction})")
+            with span("mt", path="async"):
+                chat_completion = await self.client.chat.completions.create(
+                    messages=messages,
+                    model=TRANSLATION_MODEL,
+                    temperature=0.1,
+                    max_tokens=1000
+                )
+            usage = getattr(chat_completion, "usage", None)
+            if self.rate_limiter and usage:
+                self.rate_limiter.record_usage(TRANSLATION_MODEL, estimated_tokens, usage.total_tokens)
+
+            api_time = time.time() - start_time
+            api_logger.info(f"Async text translation API call ({direction}) completed in {api_time:.2f}s")
+
+            result_text = chat_completion.choices[0].message.content.strip()
+            transcription_logger.info(f"Translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
+
+            if self.translation_memory:
+                await asyncio.to_thread(self.translation_memory.store, direction, source_text, result_text)
+
+            return TranslationResult(result_text)
+
+        except Exception as e:
+            transcription_logger.error(f"Async text translation ({direction}) failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            return TranslationResult(f"Error during text translation: {str(e)}")
+
+    async def text_to_speech(self, text, voice_id):
+        """Synthesize text with ElevenLabs and return the audio file path"""
+        tts_logger.info(f"Generating async ElevenLabs TTS for voice {voice_id}")
+        if not self.tts_cache:
+            tts_logger.error("AsyncTranscriber.text_to_speech needs a TTS cache to store audio")
+            return None
+
+        cache_key = tts_cache_key(self.tts_cache, text, voice_id)
+        cached_path = await asyncio.to_thread(self.tts_cache.get, cache_key)
+        if cached_path:
+            return cached_path
+
+        url, headers, payload = build_tts_request(text, voice_id)
+        try:
+            start_time = time.time()
+            with span("tts", path="async"):
+                response = await self.http.post(url, json=payload, headers=headers)
+                response.raise_for_status()
+
+            audio_bytes = response.content
+            if not validate_tts_audio(audio_bytes):
+                return None
+
+            audio_path = await asyncio.to_thread(self.tts_cache.put, cache_key, audio_bytes)
+            tts_logger.info(
+                f"ElevenLabs audio generated in {time.time() - start_time:.2f}s: "
+                f"{audio_path} ({len(audio_bytes)} bytes)"
+            )
+            return audio_path
+
+        except httpx.HTTPError as e:
+            tts_logger.error(f"ElevenLabs API request failed: {e}")
+            return None
+        except Exception as e:
+            tts_logger.error(f"ElevenLabs TTS generation failed: {e}")
+            return None
+
+    async def synthesize_voices(self, text, voice_lang):
+        """Synthesize text in both voice genders concurrently"""
+        genders = list(VOICE_CONFIG[voice_lang])
+        paths = await asyncio.gather(
+            *(self.text_to_speech(text, VOICE_CONFIG[voice_lang][gender]) for gender in genders)
+        )
+        return dict(zip(genders, paths))
+
+    async def english_to_spanish(self, audio):
+        """Full English → Spanish turn; TTS for both voices is synthesized concurrently"""
+        english_text = await self.transcribe_audio(audio, language="en")
+        if not english_text or english_text.startswith("Error"):
+            return english_text, "", {}
+
+        spanish_text = await self.translate_text_to_spanish(english_text)
+        if spanish_text.startswith("Error"):
+            return english_text, spanish_text, {}
+
+        audio_paths = await self.synthesize_voices(spanish_text, "spanish")
+        return english_text, spanish_text, audio_paths
+
+    async def spanish_to_english(self, audio):
+        """Full Spanish → English turn; TTS for both voices is synthesized concurrently
+
+        Returns (spanish_text, english_translation, audio_paths). The Spanish
+        transcript is requested alongside the translation and is "" when
+        disabled or unavailable.
+        """
+        if SPEECH_TRANSLATION_SOURCE_TRANSCRIPT:
+            spanish_text, english_translation = await self.transcribe_and_translate_audio(audio, language="es")
+            if spanish_text.startswith("Error"):
+                transcription_logger.warning(f"Source transcript unavailable: {spanish_text}")
+                spanish_text = ""
+        else:
+            spanish_text, english_translation = "", await self.translate_audio(audio)
+        if not english_translation or english_translation.startswith("Error"):
+            return spanish_text, english_translation, {}
+
+        audio_paths = await self.synthesize_voices(english_translation, "english")
+        return spanish_text, english_translation, audio_paths
@@ -0,0 +1,203 @@
+"""
+Upload normalization for transcription requests.
+Browser recordings are often 44.1/48 kHz stereo PCM; Whisper only needs 16 kHz
+mono, so recordings are downmixed, resampled and (when soundfile is installed)
+FLAC-encoded before they go over the wire.
+"""
+import io
+import os
+import wave
+import array
+import warnings
+from config import LOGGERS, AUDIO_RATE, AUDIO_CHANNELS, AUDIO_SAMPLE_WIDTH, AUDIO_UPLOAD_FORMAT
+
+audio_logger = LOGGERS['audio']
+
+# Filename sent to Groq for audio that never had a path (recorder bytes, buffers)
+UPLOAD_NAME = "recording.wav"
+
+# audioop is C-fast but deprecated (removed in Python 3.13); fall back to pure Python
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+# Optional: FLAC encoding needs libsndfile via the soundfile package
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
+
+def _to_mono16(pcm, sample_width, channels):
+    """Convert interleaved PCM of any supported width to mono 16-bit samples"""
+    if audioop:
+        if sample_width == 1:
+            # 8-bit WAV is unsigned; audioop expects signed samples
+            pcm = audioop.bias(pcm, 1, -128)
+        if sample_width != 2:
+            pcm = audioop.lin2lin(pcm, sample_width, 2)
+        if channels == 2:
+            pcm = audioop.tomono(pcm, 2, 0.5, 0.5)
+        elif channels > 2:
+            samples = array.array("h", pcm)
+            pcm = samples[::channels].tobytes()
+        return pcm
+
+    if sample_width == 1:
+        samples = [(b - 128) << 8 for b in pcm]
+    elif sample_width == 2:
+        samples = array.array("h", pcm)
+    elif sample_width == 4:
+        samples = [s >> 16 for s in array.array("i", pcm)]
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    if channels > 1:
+        samples = [
+            sum(samples[i:i + channels]) // channels
+            for i in range(0, len(samples) - channels + 1, channels)
+        ]
+    return array.array("h", samples).tobytes()
+
+
+def _resample16(pcm, rate, target_rate):
+    """Resample mono 16-bit PCM"""
+    if rate == target_rate:
+        return pcm
+    if audioop:
+        converted, _ = audioop.ratecv(pcm, 2, 1, rate, target_rate, None)
+        return converted
+
+    # Linear interpolation fallback
+    samples = array.array("h", pcm)
+    if len(samples) < 2:
+        return pcm
+    out_count = int(len(samples) * target_rate / rate)
+    step = rate / target_rate
+    out = array.array("h", bytes(2 * out_count))
+    last = len(samples) - 1
+    for i in range(out_count):
+        position = i * step
+        index = int(position)
+        if index >= last:
+            out[i] = samples[last]
+            continue
+        frac = position - index
+        out[i] = int(samples[index] + (samples[index + 1] - samples[index]) * frac)
+    return out.tobytes()
+
+
+def normalize_audio(audio_bytes, target_rate=AUDIO_RATE, upload_format=AUDIO_UPLOAD_FORMAT):
+    """Downmix to mono, resample to target_rate and encode for upload
+
+    Returns (encoded_bytes, extension). Anything that is not a PCM WAV file is
+    returned unchanged with extension None.
+    """
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            params = reader.getparams()
+            pcm = reader.readframes(params.nframes)
+    except (wave.Error, EOFError) as e:
+        audio_logger.debug(f"Upload normalization skipped, not a PCM WAV file: {e}")
+        return audio_bytes, None
+
+    if params.sampwidth not in (1, 2, 4):
+        audio_logger.debug(f"Upload normalization skipped, unsupported sample width: {params.sampwidth}")
+        return audio_bytes, None
+
+    already_normalized = (
+        params.nchannels == AUDIO_CHANNELS
+        and params.framerate == target_rate
+        and params.sampwidth == AUDIO_SAMPLE_WIDTH
+    )
+    if already_normalized and not (upload_format == "flac" and soundfile):
+        return audio_bytes, ".wav"
+
+    mono = _resample16(_to_mono16(pcm, params.sampwidth, params.nchannels), params.framerate, target_rate)
+
+    if upload_format == "flac" and soundfile:
+        output = io.BytesIO()
+        soundfile.write(output, array.array("h", mono), target_rate, format="FLAC", subtype="PCM_16")
+        encoded, extension = output.getvalue(), ".flac"
+    else:
+        if upload_format == "flac":
+            audio_logger.debug("soundfile not installed, uploading 16 kHz mono WAV instead of FLAC")
+        output = io.BytesIO()
+        with wave.open(output, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(target_rate)
+            writer.writeframes(mono)
+        encoded, extension = output.getvalue(), ".wav"
+
+    saved = len(audio_bytes) - len(encoded)
+    audio_logger.info(
+        f"Upload normalized: {params.framerate}Hz/{params.nchannels}ch/{8 * params.sampwidth}bit → "
+        f"{target_rate}Hz/1ch {extension[1:]}, {len(audio_bytes)} → {len(encoded)} bytes "
+        f"(saved {saved} bytes, {100 * saved / max(1, len(audio_bytes)):.0f}%)"
+    )
+    return encoded, extension
+
+
+def is_audio_path(audio):
+    return isinstance(audio, (str, os.PathLike))
+
+
+def describe_audio(audio):
+    """Short label for logs: the path, or the size of in-memory audio"""
+    if is_audio_path(audio):
+        return os.fspath(audio)
+    size = audio.nbytes if isinstance(audio, memoryview) else getattr(audio, "__len__", lambda: "?")()
+    return f"<{type(audio).__name__}, {size} bytes>"
+
+
+def read_audio(audio, default_name=UPLOAD_NAME):
+    """(name, bytes) for a file path, bytes-like object or binary file object
+
+    In-memory audio is not copied when it already is a bytes object, a
+    memoryview over a whole bytes object, or an unmodified BytesIO built from
+    bytes (whose getvalue() shares that buffer).
+    """
+    if is_audio_path(audio):
+        with open(audio, "rb") as file:
+            return os.fspath(audio), file.read()
+    if isinstance(audio, bytes):
+        return default_name, audio
+    if isinstance(audio, memoryview):
+        if isinstance(audio.obj, bytes) and audio.contiguous and audio.nbytes == len(audio.obj):
+            return default_name, audio.obj
+        return default_name, audio.tobytes()
+    if isinstance(audio, bytearray):
+        return default_name, bytes(audio)
+    if isinstance(audio, io.BytesIO):
+        return default_name, audio.getvalue()
+    if hasattr(audio, "read"):
+        name = getattr(audio, "name", None)
+        return (os.path.basename(name) if isinstance(name, str) else default_name), audio.read()
+    raise TypeError(f"Unsupported audio input: {type(audio).__name__}")
+
+
+def prepare_upload(file_path, audio_bytes):
+    """(filename, bytes) tuple for the Groq client, normalized for upload"""
+    encoded, extension = normalize_audio(audio_bytes)
+    if extension:
+        file_path = os.path.splitext(os.path.basename(file_path))[0] + extension
+    return file_path, encoded
+
+
+def audio_duration(audio_bytes):
+    """Duration in seconds of WAV or FLAC bytes, or None for other formats"""
+    if audio_bytes[:4] == b"fLaC" and len(audio_bytes) >= 26:
+        # STREAMINFO is always the first metadata block: 20-bit sample rate, then 36-bit sample count
+        info = int.from_bytes(audio_bytes[18:26], "big")
+        sample_rate = info >> 44
+        total_samples = info & ((1 << 36) - 1)
+        return total_samples / sample_rate if sample_rate and total_samples else None
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            return reader.getnframes() / reader.getframerate()
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
@@ -1,18 +1,55 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import base64
+import json
 import os
+from metrics import span
+from waveform import peaks_for, combine_peaks
 
-def create_audio_player(audio_file_path, text="Audio", autoplay=False):
-    """Create a custom audio player with waveform visualization"""
+def _audio_source(audio_file_path, audio_server=None):
+    """URL the player loads a clip from: served by the audio server when available, else a data URI"""
+    if audio_file_path.startswith(("http://", "https://")):
+        return audio_file_path
+    if audio_server:
+        return audio_server.url_for(audio_file_path)
     
-    # Read the audio file and encode it
     with open(audio_file_path, "rb") as f:
-        audio_bytes = f.read()
-        audio_b64 = base64.b64encode(audio_bytes).decode()
+        audio_b64 = base64.b64encode(f.read()).decode()
     
     # Get file extension
     file_ext = os.path.splitext(audio_file_path)[1][1:]  # Remove the dot
+    return f"data:audio/{file_ext};base64,{audio_b64}"
+
+def _clip_peaks(audio_paths):
+    """Waveform peaks for the whole track; None if any clip is only reachable by URL (still streaming)"""
+    if any(path.startswith(("http://", "https://")) for path in audio_paths):
+        return None
+    return combine_peaks([peaks_for(path) for path in audio_paths])
+
+def create_audio_player(audio_file_path, text="Audio", autoplay=False, audio_server=None):
+    """Create a custom audio player with waveform visualization
+    
+    audio_file_path may also be a list of paths, which are played back to back
+    as one gapless track (used by the streaming pipeline's sentence chunks),
+    and each entry may be an audio server URL instead of a local file.
+    With an audio_server, clips are referenced by cacheable URL instead of
+    being base64-inlined into the component HTML on every rerender.
+    The waveform is drawn from the clips' real peak envelope (cached next to
+    each file), or as a flat line while a clip is still streaming.
+    """
+    
+    if isinstance(audio_file_path, (list, tuple)):
+        audio_paths = list(audio_file_path)
+    else:
+        audio_paths = [audio_file_path]
+    
+    # File reads and base64 encoding when clips are inlined
+    with span("player_encode", inline="false" if audio_server else "true"):
+        track_sources = json.dumps([_audio_source(path, audio_server) for path in audio_paths])
+    
+    with span("waveform_peaks"):
+        peaks = _clip_peaks(audio_paths)
+    waveform_peaks = json.dumps(peaks["peaks"] if peaks else None)
     
     # HTML for custom audio player
     audio_player_html = f"""
@@ -124,26 +161,14 @@ def create_audio_player(audio_file_path, text="Audio", autoplay=False):
                 position: relative;
                 overflow: hidden;
                 border: 1px solid #404040;
-            }}
-            
-            .wave-bars {{
-                display: flex;
-                align-items: center;
-                height: 100%;
                 padding: 0 1rem;
-                gap: 2px;
             }}
             
-            .wave-bar {{
-                width: 3px;
-                background: linear-gradient(to top, #404040, #606060);
-                border-radius: 2px;
-                transition: background 0.3s ease;
-            }}
-            
-            .wave-bar.active {{
-                background: linear-gradient(to top, #00d4ff, #0099cc);
-                box-shadow: 0 0 6px rgba(0, 212, 255, 0.6);
+            .wave-canvas {{
+                display: block;
+                width: 100%;
+                height: 100%;
+                cursor: pointer;
             }}
         </style>
     </head>
@@ -163,50 +188,102 @@ def create_audio_player(audio_file_path, text="Audio", autoplay=False):
             </div>
             
             <div class="waveform">
-                <div class="wave-bars" id="waveBars"></div>
+                <canvas class="wave-canvas" id="waveCanvas"></canvas>
             </div>
-            
-            <audio id="audioPlayer" style="display: none;" {"autoplay" if autoplay else ""}>
-                <source src="data:audio/{file_ext};base64,{audio_b64}" type="audio/{file_ext}">
-            </audio>
         </div>
         
         <script>
-            const audio = document.getElementById('audioPlayer');
+            const trackSources = {track_sources};
             const playBtn = document.getElementById('playBtn');
             const progressBar = document.getElementById('progressBar');
             const progressContainer = document.getElementById('progressContainer');
             const timeDisplay = document.getElementById('timeDisplay');
-            const waveBars = document.getElementById('waveBars');
+            const waveCanvas = document.getElementById('waveCanvas');
+            const waveContext = waveCanvas.getContext('2d');
+            
+            // [[min, max], ...] in -1..1 computed server-side; null while a clip is still streaming
+            const peaks = {waveform_peaks};
+            const bars = peaks || Array.from({{length: 120}}, () => [-0.04, 0.04]);
+            const IDLE_COLOR = '#5a5a5a';
+            const PLAYED_COLOR = '#00d4ff';
+            let barWidth = 0;
+            let paintedBars = 0;  // bars currently drawn in the played color
+            
+            // One preloaded element per track so the next chunk starts without a gap
+            const tracks = trackSources.map((src) => {{
+                const track = new Audio();
+                track.preload = 'auto';
+                track.src = src;
+                return track;
+            }});
+            const durations = tracks.map(() => 0);
             
+            let trackIndex = 0;
+            let audio = tracks[0];
             let isPlaying = false;
+            let autoplayPending = {str(autoplay).lower()};
             
-            // Generate fake waveform bars
-            function generateWaveform() {{
-                const numBars = 80;
-                waveBars.innerHTML = '';
-                for (let i = 0; i < numBars; i++) {{
-                    const bar = document.createElement('div');
-                    bar.className = 'wave-bar';
-                    const height = Math.random() * 40 + 10;
-                    bar.style.height = height + 'px';
-                    waveBars.appendChild(bar);
+            function totalDuration() {{
+                return durations.reduce((sum, d) => sum + d, 0);
+            }}
+            
+            function elapsedTime() {{
+                let elapsed = audio.currentTime || 0;
+                for (let i = 0; i < trackIndex; i++) {{
+                    elapsed += durations[i];
                 }}
+                return elapsed;
             }}
             
-            // Update waveform animation
+            // Repaint bars [from, to) in one color
+            function paintBars(from, to, color) {{
+                const height = waveCanvas.clientHeight;
+                const middle = height / 2;
+                waveContext.fillStyle = color;
+                for (let i = from; i < to; i++) {{
+                    const top = middle - bars[i][1] * middle * 0.9;
+                    const bottom = middle - bars[i][0] * middle * 0.9;
+                    waveContext.clearRect(i * barWidth, 0, barWidth, height);
+                    waveContext.fillRect(i * barWidth, top, Math.max(1, barWidth - 1), Math.max(1, bottom - top));
+                }}
+            }}
+            
+            // Full draw, only on load and resize
+            function drawWaveform() {{
+                const ratio = window.devicePixelRatio || 1;
+                waveCanvas.width = waveCanvas.clientWidth * ratio;
+                waveCanvas.height = waveCanvas.clientHeight * ratio;
+                waveContext.setTransform(ratio, 0, 0, ratio, 0, 0);
+                barWidth = waveCanvas.clientWidth / bars.length;
+                paintBars(0, bars.length, IDLE_COLOR);
+                paintedBars = 0;
+                updateWaveform();
+            }}
+            
+            // Incremental progress: only bars whose state changed are repainted
             function updateWaveform() {{
-                const bars = waveBars.children;
-                const progress = audio.currentTime / audio.duration;
-                const activeBarIndex = Math.floor(progress * bars.length);
-                
-                for (let i = 0; i < bars.length; i++) {{
-                    if (i <= activeBarIndex) {{
-                        bars[i].classList.add('active');
-                    }} else {{
-                        bars[i].classList.remove('active');
-                    }}
+                const total = totalDuration();
+                const target = total ? Math.min(bars.length, Math.floor(elapsedTime() / total * bars.length)) : 0;
+                if (target > paintedBars) {{
+                    paintBars(paintedBars, target, PLAYED_COLOR);
+                }} else if (target < paintedBars) {{
+                    paintBars(target, paintedBars, IDLE_COLOR);
                 }}
+                paintedBars = target;
+            }}
+            
+            function animateWaveform() {{
+                updateWaveform();
+                if (isPlaying) {{
+                    requestAnimationFrame(animateWaveform);
+                }}
+            }}
+            
+            function startPlayback() {{
+                audio.play();
+                playBtn.textContent = '⏸';
+                isPlaying = true;
+                requestAnimationFrame(animateWaveform);
             }}
             
             // Format time
@@ -216,6 +293,25 @@ def create_audio_player(audio_file_path, text="Audio", autoplay=False):
                 return `${{mins}}:${{secs.toString().padStart(2, '0')}}`;
             }}
             
+            // Seek to a position on the combined timeline
+            function seekTo(seconds) {{
+                let index = 0;
+                while (index < tracks.length - 1 && seconds >= durations[index]) {{
+                    seconds -= durations[index];
+                    index++;
+                }}
+                if (index !== trackIndex) {{
+                    audio.pause();
+                    audio.currentTime = 0;
+                    trackIndex = index;
+                    audio = tracks[index];
+                }}
+                audio.currentTime = seconds;
+                if (isPlaying) {{
+                    audio.play();
+                }}
+            }}
+            
             // Play/pause toggle
             playBtn.addEventListener('click', () => {{
                 if (isPlaying) {{
@@ -223,58 +319,78 @@ def create_audio_player(audio_file_path, text="Audio", autoplay=False):
                     playBtn.textContent = '▶';
                     isPlaying = false;
                 }} else {{
-                    audio.play();
-                    playBtn.textContent = '⏸';
-                    isPlaying = true;
+                    startPlayback();
                 }}
             }});
             
-            // Progress bar click
-            progressContainer.addEventListener('click', (e) => {{
-                const rect = progressContainer.getBoundingClientRect();
-                const percent = (e.clientX - rect.left) / rect.width;
-                audio.currentTime = percent * audio.duration;
+            // Progress bar and waveform click
+            [progressContainer, waveCanvas].forEach((element) => {{
+                element.addEventListener('click', (e) => {{
+                    const rect = element.getBoundingClientRect();
+                    const percent = (e.clientX - rect.left) / rect.width;
+                    seekTo(percent * totalDuration());
+                    updateWaveform();
+                }});
             }});
             
-            // Audio time update
-            audio.addEventListener('timeupdate', () => {{
-                if (audio.duration) {{
-                    const progress = (audio.currentTime / audio.duration) * 100;
+            tracks.forEach((track, index) => {{
+                // Audio time update
+                track.addEventListener('timeupdate', () => {{
+                    if (track !== audio || !totalDuration()) {{
+                        return;
+                    }}
+                    const progress = (elapsedTime() / totalDuration()) * 100;
                     progressBar.style.width = progress + '%';
-                    timeDisplay.textContent = `${{formatTime(audio.currentTime)}} / ${{formatTime(audio.duration)}}`;
+                    timeDisplay.textContent = `${{formatTime(elapsedTime())}} / ${{formatTime(totalDuration())}}`;
+                }});
+                
+                // Track ended: hand over to the next chunk or finish
+                track.addEventListener('ended', () => {{
+                    if (track !== audio) {{
+                        return;
+                    }}
+                    if (index < tracks.length - 1) {{
+                        trackIndex = index + 1;
+                        audio = tracks[trackIndex];
+                        audio.currentTime = 0;
+                        audio.play();
+                        return;
+                    }}
+                    
+                    playBtn.textContent = '▶';
+                    isPlaying = false;
+                    progressBar.style.width = '0%';
+                    trackIndex = 0;
+                    audio = tracks[0];
+                    audio.currentTime = 0;
                     updateWaveform();
-                }}
-            }});
-            
-            // Audio ended
-            audio.addEventListener('ended', () => {{
-                playBtn.textContent = '▶';
-                isPlaying = false;
-                progressBar.style.width = '0%';
+                }});
                 
-                // Reset waveform
-                const bars = waveBars.children;
-                for (let bar of bars) {{
-                    bar.classList.remove('active');
-                }}
+                // Streamed audio reports an unknown duration until the download ends
+                track.addEventListener('durationchange', () => {{
+                    durations[index] = isFinite(track.duration) ? track.duration : 0;
+                }});
+                
+                track.addEventListener('loadedmetadata', () => {{
+                    durations[index] = isFinite(track.duration) ? track.duration : 0;
+                    timeDisplay.textContent = `${{formatTime(elapsedTime())}} / ${{formatTime(totalDuration())}}`;
+                    
+                    // Auto-play if enabled, as soon as the first chunk is playable
+                    if (index === 0 && autoplayPending) {{
+                        autoplayPending = false;
+                        startPlayback();
+                    }}
+                }});
             }});
             
             // Initialize
-            generateWaveform();
-            audio.addEventListener('loadedmetadata', () => {{
-                timeDisplay.textContent = `0:00 / ${{formatTime(audio.duration)}}`;
-                
-                // Auto-play if enabled
-                if ({str(autoplay).lower()}) {{
-                    audio.play();
-                    playBtn.textContent = '⏸';
-                    isPlaying = true;
-                }}
-            }});
+            window.addEventListener('resize', drawWaveform);
+            drawWaveform();
         </script>
     </body>
     </html>
     """
     
     # Render the audio player
-    components.html(audio_player_html, height=250)
\ No newline at end of file
+    with span("player_render"):
+        components.html(audio_player_html, height=250)
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Small local HTTP server the audio player loads audio from by URL.
+Serving by URL instead of base64-inlining keeps the clip out of the Streamlit
+websocket and lets the browser cache it: files support Range requests and
+ETag revalidation, and content-addressed TTS audio is marked immutable.
+Streamed syntheses are relayed with chunked transfer encoding while they are
+still downloading, so the browser can start playback on the first bytes.
+"""
+import os
+import re
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import LOGGERS, AUDIO_SERVER_HOST, AUDIO_SERVER_PORT, AUDIO_SERVER_PUBLIC_URL
+from tts_cache import StreamIncomplete
+
+tts_logger = LOGGERS['tts']
+
+TTS_PATH = re.compile(r"^/tts/([0-9a-f]{64})\.mp3$")
+AUDIO_PATH = re.compile(r"^/audio/([0-9a-f]{32})\.\w+$")
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Registered non-TTS files are pruned of deleted paths once the table grows past this
+MAX_REGISTERED_FILES = 1000
+
+
+def _etag_for(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+class AudioServer:
+    def __init__(self, tts_cache, host=AUDIO_SERVER_HOST, port=AUDIO_SERVER_PORT, public_url=AUDIO_SERVER_PUBLIC_URL):
+        self.tts_cache = tts_cache
+        self.public_url = public_url.rstrip("/")
+        # token -> path for audio that does not live in the TTS cache
+        self._files = {}
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="audio-server", daemon=True)
+        self._thread.start()
+        tts_logger.info(f"Audio server listening on {host}:{self.httpd.server_port} ({self.public_url})")
+
+    def tts_url(self, key):
+        """URL the browser can load the (possibly still downloading) TTS audio from"""
+        return f"{self.public_url}/tts/{key}.mp3"
+
+    def url_for(self, path):
+        """URL for a local audio file; TTS cache files get their content-addressed URL"""
+        abs_path = os.path.abspath(path)
+        if os.path.dirname(abs_path) == os.path.abspath(self.tts_cache.cache_dir):
+            return self.tts_url(os.path.splitext(os.path.basename(abs_path))[0])
+
+        token = hashlib.sha256(abs_path.encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            if len(self._files) >= MAX_REGISTERED_FILES:
+                self._files = {t: p for t, p in self._files.items() if os.path.exists(p)}
+            self._files[token] = abs_path
+        return f"{self.public_url}/audio/{token}{os.path.splitext(abs_path)[1]}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _resolve(self, url_path):
+        """Map a request path to ('stream', entry), ('file', path, etag) or None
+
+        etag is only set for content-addressed TTS audio, whose bytes never change.
+        """
+        match = TTS_PATH.match(url_path)
+        if match:
+            key = match.group(1)
+            entry = self.tts_cache.stream_for(key)
+            if entry:
+                return ("stream", entry)
+            path = self.tts_cache.path_for(key)
+            return ("file", path, f'"{key}"') if path else None
+
+        match = AUDIO_PATH.match(url_path)
+        if match:
+            with self._lock:
+                path = self._files.get(match.group(1))
+            return ("file", path, None) if path else None
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                tts_logger.debug(f"Audio server: {format % args}")
+
+            def do_HEAD(self):
+                self._handle(send_body=False)
+
+            def do_GET(self):
+                self._handle(send_body=True)
+
+            def _handle(self, send_body):
+                target = server._resolve(self.path.split("?", 1)[0])
+                if not target:
+                    self.send_error(404)
+                elif target[0] == "stream":
+                    self._send_stream(target[1], send_body)
+                else:
+                    self._send_file(target[1], target[2], send_body)
+
+            def _common_headers(self):
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Accept-Ranges", "bytes")
+
+            def _send_stream(self, entry, send_body):
+                # Length is unknown while downloading, so ranges are not offered yet
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                if not send_body:
+                    return
+                try:
+                    for chunk in entry.iter_chunks():
+                        self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    tts_logger.debug("Audio server: client went away mid-stream")
+                    self.close_connection = True
+                except StreamIncomplete as e:
+                    # Hang up without the terminating chunk, so neither the browser nor a cache takes it as complete
+                    tts_logger.warning(f"Audio server: aborting stream {entry.key[:12]}: {e}")
+                    self.close_connection = True
+
+            def _send_file(self, path, fixed_etag, send_body):
+                try:
+                    fp = open(path, "rb")
+                except OSError:
+                    self.send_error(404)
+                    return
+
+                with fp:
+                    stat = os.fstat(fp.fileno())
+                    size = stat.st_size
+                    etag = fixed_etag or _etag_for(stat)
+                    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    cache_control = "public, max-age=31536000, immutable" if fixed_etag else "private, max-age=3600"
+
+                    # Browser already has this exact clip
+                    if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Cache-Control", cache_control)
+                        self._common_headers()
+                        self.end_headers()
+                        return
+
+                    start, end = 0, size - 1
+                    status = 200
+                    range_header = self.headers.get("Range")
+                    if_range = self.headers.get("If-Range")
+                    if range_header and (not if_range or if_range == etag):
+                        byte_range = self._parse_range(range_header, size)
+                        if byte_range is None:
+                            self.send_response(416)
+                            self.send_header("Content-Range", f"bytes */{size}")
+                            self.send_header("Content-Length", "0")
+                            self._common_headers()
+                            self.end_headers()
+                            return
+                        if byte_range:
+                            start, end = byte_range
+                            status = 206
+
+                    length = end - start + 1
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(length))
+                    if status == 206:
+                        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+                    self.send_header("Cache-Control", cache_control)
+                    self._common_headers()
+                    self.end_headers()
+                    if not send_body:
+                        return
+
+                    fp.seek(start)
+                    remaining = length
+                    try:
+                        while remaining > 0:
+                            chunk = fp.read(min(65536, remaining))
+                            if not chunk:
+                                break
+                            self.wfile.write(chunk)
+                            remaining -= len(chunk)
+                    except (BrokenPipeError, ConnectionResetError):
+                        self.close_connection = True
+
+            @staticmethod
+            def _parse_range(range_header, size):
+                """(start, end) for a single byte range, False to ignore it, None if unsatisfiable"""
+                match = RANGE_HEADER.match(range_header.strip())
+                if not match or not any(match.groups()):
+                    # Multi-range or malformed: fall back to the whole file
+                    return False
+                first, last = match.groups()
+                if first:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                else:
+                    # Suffix range: the last N bytes
+                    start = max(0, size - int(last))
+                    end = size - 1
+                if start >= size or start > end:
+                    return None
+                return start, end
+
+        return Handler
@@ -0,0 +1,231 @@
+"""
+Managed scratch space for recordings.
+Each session writes into its own directory under AUDIO_WORKSPACE_DIR. Files a
+session still needs (its current recording, the TTS output it is playing) are
+reference counted through named slots; everything else is garbage collected
+once it is older than max_age or the workspace grows past max_bytes, and a
+session's directory is removed when the session ends.
+"""
+import os
+import time
+import shutil
+import threading
+from config import (
+    LOGGERS,
+    AUDIO_WORKSPACE_DIR,
+    AUDIO_WORKSPACE_MAX_BYTES,
+    AUDIO_WORKSPACE_MAX_AGE_SECONDS,
+    AUDIO_WORKSPACE_GC_INTERVAL,
+    AUDIO_WORKSPACE_SESSION_GRACE,
+)
+
+audio_logger = LOGGERS['audio']
+
+
+class AudioWorkspace:
+    def __init__(self, root=AUDIO_WORKSPACE_DIR, max_bytes=AUDIO_WORKSPACE_MAX_BYTES,
+                 max_age=AUDIO_WORKSPACE_MAX_AGE_SECONDS, gc_interval=AUDIO_WORKSPACE_GC_INTERVAL,
+                 session_grace=AUDIO_WORKSPACE_SESSION_GRACE, tts_cache=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.gc_interval = gc_interval
+        # A browser can drop and reconnect, so a session is only ended after being gone this long
+        self.session_grace = session_grace
+        # TTS outputs live in the cache; slots pin them there instead of owning them
+        self.tts_cache = tts_cache
+        self.removed_files = 0
+        self.removed_sessions = 0
+
+        # path -> reference count
+        self._refs = {}
+        # session -> {slot: (path, ...)}
+        self._slots = {}
+        # session -> callable returning False once the session has ended
+        self._alive = {}
+        # session -> monotonic time alive() first returned False
+        self._gone_since = {}
+        self._counter = 0
+        self._last_gc = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+        self.collect()
+        audio_logger.info(f"Audio workspace ready: {self.root} (max {self.max_bytes} bytes, max age {self.max_age}s)")
+
+    def open_session(self, session_id, alive=None):
+        """Register a session; alive() is polled during GC to detect sessions that ended"""
+        with self._lock:
+            self._slots.setdefault(session_id, {})
+            if alive is not None:
+                self._alive[session_id] = alive
+        os.makedirs(self._session_dir(session_id), exist_ok=True)
+        # Every script run opens its session, so this keeps GC going even when nothing is written
+        self.maybe_collect()
+
+    def _session_dir(self, session_id):
+        return os.path.join(self.root, session_id)
+
+    def write(self, session_id, audio_bytes, suffix=".wav", slot=None):
+        """Write audio into the session's directory and return its path
+
+        With slot, the file is held in that slot (replacing whatever was there)
+        before GC can see it.
+        """
+        session_dir = self._session_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        with self._lock:
+            self._counter += 1
+            name = f"{time.time_ns():x}-{self._counter}{suffix}"
+        path = os.path.join(session_dir, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(audio_bytes)
+        os.replace(tmp_path, path)
+
+        if slot:
+            self.set_slot(session_id, slot, path)
+        else:
+            self.maybe_collect()
+        return path
+
+    def set_slot(self, session_id, slot, paths):
+        """Hold paths (one path, a list, or None) in a session slot, releasing the previous ones"""
+        if paths is None:
+            paths = ()
+        elif isinstance(paths, str):
+            paths = (paths,)
+        # URLs (streamed TTS) have nothing on disk to hold
+        paths = tuple(path for path in paths if not path.startswith(("http://", "https://")))
+
+        with self._lock:
+            slots = self._slots.setdefault(session_id, {})
+            previous = slots.pop(slot, ())
+            if paths:
+                slots[slot] = paths
+            for path in paths:
+                self._retain_locked(path)
+            for path in previous:
+                self._release_locked(path)
+        self.maybe_collect()
+
+    def _retain_locked(self, path):
+        self._refs[path] = self._refs.get(path, 0) + 1
+        if self._refs[path] == 1 and self.tts_cache and not self._owns(path):
+            self.tts_cache.pin(path)
+
+    def _release_locked(self, path):
+        count = self._refs.get(path, 0) - 1
+        if count > 0:
+            self._refs[path] = count
+            return
+        self._refs.pop(path, None)
+        if self.tts_cache and not self._owns(path):
+            self.tts_cache.unpin(path)
+
+    def _owns(self, path):
+        return os.path.abspath(path).startswith(os.path.abspath(self.root) + os.sep)
+
+    def end_session(self, session_id):
+        """Release everything a session holds and delete its directory"""
+        with self._lock:
+            slots = self._slots.pop(session_id, {})
+            self._alive.pop(session_id, None)
+            self._gone_since.pop(session_id, None)
+            for paths in slots.values():
+                for path in paths:
+                    self._release_locked(path)
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+        self.removed_sessions += 1
+        audio_logger.info(f"Audio workspace session ended: {session_id}")
+
+    def maybe_collect(self):
+        """Run collect() if gc_interval has passed since the last run"""
+        with self._lock:
+            if time.monotonic() - self._last_gc < self.gc_interval:
+                return
+            # Claimed before collecting so concurrent callers don't all run it
+            self._last_gc = time.monotonic()
+        self.collect()
+
+    def collect(self):
+        """End dead sessions, then delete unreferenced files by age and size"""
+        self._last_gc = time.monotonic()
+
+        with self._lock:
+            candidates = list(self._alive.items())
+        ended = []
+        now = time.monotonic()
+        for session_id, alive in candidates:
+            try:
+                is_alive = alive()
+            except Exception as e:
+                audio_logger.warning(f"Audio workspace liveness check failed for {session_id}: {e}")
+                continue
+            with self._lock:
+                if is_alive:
+                    self._gone_since.pop(session_id, None)
+                elif now - self._gone_since.setdefault(session_id, now) >= self.session_grace:
+                    ended.append(session_id)
+        for session_id in ended:
+            self.end_session(session_id)
+
+        now = time.time()
+        files = []
+        total_bytes = 0
+        for session_entry in os.scandir(self.root):
+            if not session_entry.is_dir():
+                continue
+            with self._lock:
+                known = session_entry.name in self._slots
+            names = os.listdir(session_entry.path)
+            if not names and not known and now - session_entry.stat().st_mtime > self.max_age:
+                # Left behind by a previous process
+                shutil.rmtree(session_entry.path, ignore_errors=True)
+                self.removed_sessions += 1
+                continue
+            for name in names:
+                path = os.path.join(session_entry.path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total_bytes += stat.st_size
+                files.append((stat.st_mtime, path, stat.st_size))
+
+        removed = 0
+        # Oldest first, so the size limit also drops the oldest unreferenced files
+        for mtime, path, size in sorted(files):
+            if now - mtime <= self.max_age and total_bytes <= self.max_bytes:
+                break
+            with self._lock:
+                if path in self._refs:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            total_bytes -= size
+            removed += 1
+
+        if removed:
+            self.removed_files += removed
+            audio_logger.info(f"Audio workspace removed {removed} files ({self._counters(total_bytes)})")
+        return total_bytes
+
+    def _counters(self, total_bytes):
+        return (
+            f"bytes={total_bytes} sessions={len(self._slots)} held={len(self._refs)} "
+            f"removed_files={self.removed_files} removed_sessions={self.removed_sessions}"
+        )
+
+    def stats(self):
+        """Snapshot of workspace counters"""
+        with self._lock:
+            return {
+                "sessions": len(self._slots),
+                "held_files": len(self._refs),
+                "removed_files": self.removed_files,
+                "removed_sessions": self.removed_sessions,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,521 @@
+"""
+Pluggable speech-to-text, translation and text-to-speech engines.
+Each kind of engine shares one small interface:
+
+    STT  transcribe(upload, prompt, language) -> text
+         translate(upload, prompt) -> English text
+    MT   translate(direction, text) -> text
+    TTS  synthesize(text, voice_id) -> MP3 bytes
+
+STT_BACKENDS / MT_BACKENDS / TTS_BACKENDS in config.py list the engines to
+use, primary first. A BackendRouter sends each call to the primary and falls
+back down the list when an engine fails, so "groq,local" keeps working
+offline. Short inputs (a few seconds of audio, a sentence of text) instead go
+to whichever healthy engine has the lowest recent median latency, once every
+engine has been measured; until then they follow the configured order, and
+engines without enough samples are measured with copies of short requests
+off the request path, so a cold local model never answers a user first.
+
+The router keeps a rolling window of latencies and errors per engine. An
+engine failing too often is skipped until a cooldown passes, engines with a
+max_size (e.g. groq-fast) only see inputs up to it, and with hedging on a call
+that outlasts its engine's recent p95 races a backup request on the next one.
+
+The local engines run on the CPU and need optional packages: faster-whisper
+for STT and argostranslate (with its en/es language packages) for MT.
+"""
+import io
+import time
+import random
+import threading
+import contextvars
+from collections import deque
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import (
+    LOGGERS,
+    LOCAL_STT_MODEL,
+    LOCAL_STT_COMPUTE_TYPE,
+    LOCAL_STT_THREADS,
+    BACKEND_STATS_WINDOW,
+    BACKEND_MIN_SAMPLES,
+    BACKEND_MAX_ERROR_RATE,
+    BACKEND_UNHEALTHY_COOLDOWN,
+    BACKEND_HEDGE_ENABLED,
+    BACKEND_HEDGE_QUANTILE,
+    BACKEND_HEDGE_AUDIT_RATE,
+    BACKEND_HEDGE_WORKERS,
+    MT_FAST_MODEL,
+    MT_FAST_MAX_CHARS,
+)
+from metrics import METRICS, quantile
+
+transcription_logger = LOGGERS['transcription']
+api_logger = LOGGERS['api']
+
+# Optional: local Whisper on CTranslate2
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+# Optional: local translation models on CTranslate2
+try:
+    import argostranslate.translate as argos_translate
+except ImportError:
+    argos_translate = None
+
+
+class BackendUnavailable(RuntimeError):
+    """An engine's optional dependency or model is missing"""
+
+
+class BackendCancelled(Exception):
+    """A hedged attempt gave up because the other request already answered, or a backup declined to start"""
+
+
+class HedgedAttempt:
+    """One side of a hedged race, visible to engines through current_attempt"""
+
+    def __init__(self, backup=False):
+        self.backup = backup
+        self.cancel = threading.Event()
+        # Set when the engine declined the attempt before sending anything
+        self.refused = False
+
+
+# Set while a hedged attempt runs; engines that can stop early poll it
+current_attempt = contextvars.ContextVar("backend_attempt", default=None)
+
+
+def check_cancelled():
+    """Raise BackendCancelled if the current hedged attempt lost its race"""
+    attempt = current_attempt.get()
+    if attempt is not None and attempt.cancel.is_set():
+        raise BackendCancelled()
+
+
+class GroqSTT:
+    name = "groq"
+
+    def __init__(self, transcriber):
+        # The Transcriber owns the Groq client and the rate limiter
+        self.transcriber = transcriber
+
+    def transcribe(self, upload, prompt, language):
+        return self.transcriber._groq_transcription(upload, prompt, language)
+
+    def translate(self, upload, prompt):
+        return self.transcriber._groq_translation(upload, prompt)
+
+
+class LocalWhisperSTT:
+    """faster-whisper on the CPU; the model is loaded on first use"""
+    name = "local"
+
+    def __init__(self, owner=None, model_name=LOCAL_STT_MODEL, compute_type=LOCAL_STT_COMPUTE_TYPE,
+                 cpu_threads=LOCAL_STT_THREADS):
+        if WhisperModel is None:
+            raise BackendUnavailable("local STT needs the faster-whisper package")
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                transcription_logger.info(f"Loading local Whisper model {self.model_name} ({self.compute_type})")
+                self._model = WhisperModel(
+                    self.model_name, device="cpu", compute_type=self.compute_type, cpu_threads=self.cpu_threads
+                )
+            return self._model
+
+    def _run(self, upload, prompt, language, task):
+        _, audio_bytes = upload
+        segments, _ = self._get_model().transcribe(
+            io.BytesIO(audio_bytes), language=language, task=task, initial_prompt=prompt, beam_size=1
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    def transcribe(self, upload, prompt, language):
+        return self._run(upload, prompt, language, "transcribe")
+
+    def translate(self, upload, prompt):
+        return self._run(upload, prompt, None, "translate")
+
+
+class GroqMT:
+    name = "groq"
+    # None uses the Transcriber's translation model
+    model = None
+
+    def __init__(self, transcriber):
+        self.transcriber = transcriber
+
+    def translate(self, direction, text):
+        return self.transcriber._groq_translate_text(direction, text, model=self.model)
+
+
+class GroqFastMT(GroqMT):
+    """A smaller Groq chat model; quick, but only trusted with short phrases"""
+    name = "groq-fast"
+    model = MT_FAST_MODEL
+    max_size = MT_FAST_MAX_CHARS
+
+
+class LocalArgosMT:
+    """Argos Translate on the CPU; the en<->es packages must already be installed"""
+    name = "local"
+
+    def __init__(self, owner=None):
+        if argos_translate is None:
+            raise BackendUnavailable("local MT needs the argostranslate package")
+        installed = {language.code for language in argos_translate.get_installed_languages()}
+        if not {"en", "es"} <= installed:
+            raise BackendUnavailable("local MT needs the Argos en and es language packages installed")
+
+    def translate(self, direction, text):
+        source, _, target = direction.partition("-")
+        return argos_translate.translate(text, source, target).strip()
+
+
+class ElevenLabsTTS:
+    name = "elevenlabs"
+
+    def __init__(self, tts_client):
+        self.tts_client = tts_client
+
+    def synthesize(self, text, voice_id):
+        return self.tts_client.synthesize(text, voice_id)
+
+
+STT_ENGINES = {"groq": GroqSTT, "local": LocalWhisperSTT}
+MT_ENGINES = {"groq": GroqMT, "groq-fast": GroqFastMT, "local": LocalArgosMT}
+TTS_ENGINES = {"elevenlabs": ElevenLabsTTS}
+ENGINES = {"stt": STT_ENGINES, "mt": MT_ENGINES, "tts": TTS_ENGINES}
+
+
+class _BackendStats:
+    def __init__(self, window):
+        # Latencies of recent successful calls, kept apart for short inputs and the rest
+        self.latencies = {True: deque(maxlen=window), False: deque(maxlen=window)}
+        # True for each recent failed call
+        self.errors = deque(maxlen=window)
+        # monotonic time the engine was last marked unhealthy, or None
+        self.unhealthy_since = None
+
+
+class BackendRouter:
+    def __init__(self, kind, backends, short_size, window=BACKEND_STATS_WINDOW, min_samples=BACKEND_MIN_SAMPLES,
+                 max_error_rate=BACKEND_MAX_ERROR_RATE, cooldown=BACKEND_UNHEALTHY_COOLDOWN,
+                 hedge=BACKEND_HEDGE_ENABLED, hedge_quantile=BACKEND_HEDGE_QUANTILE,
+                 hedge_audit_rate=BACKEND_HEDGE_AUDIT_RATE, hedge_workers=BACKEND_HEDGE_WORKERS):
+        """backends are in preference order; inputs up to short_size go to the fastest healthy one"""
+        self.kind = kind
+        self.backends = list(backends)
+        self.short_size = short_size
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_audit_rate = hedge_audit_rate
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self.refused = 0
+
+        self._stats = {backend.name: _BackendStats(window) for backend in self.backends}
+        # Seconds saved by audited hedges (0 when the primary answered first anyway)
+        self._savings = deque(maxlen=window)
+        # Engines with a measuring copy of a request in flight
+        self._probing = set()
+        self._probe_executor = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix=f"{kind}-hedge") if hedge else None
+
+    @property
+    def primary(self):
+        return self.backends[0]
+
+    def _is_short(self, size):
+        return size is not None and size <= self.short_size
+
+    def _healthy_locked(self, name, now, claim_probe=False):
+        stats = self._stats[name]
+        if stats.unhealthy_since is None:
+            return True
+        if now - stats.unhealthy_since < self.cooldown:
+            return False
+        if claim_probe:
+            # After the cooldown one call probes the engine; the rest wait another cooldown unless it recovers
+            stats.unhealthy_since = now
+        return True
+
+    def order(self, size=None):
+        """Backends to try for an input of size (seconds of audio or characters), best first
+
+        Engines with a max_size only serve inputs up to it. Short inputs go to
+        the healthy engine with the lowest recent median latency once all of
+        them have min_samples; others, and short inputs until then, follow the
+        configured preference. Unhealthy engines come last, as a last resort.
+        """
+        candidates = [
+            backend for backend in self.backends
+            if getattr(backend, "max_size", None) is None or (size is not None and size <= backend.max_size)
+        ] or list(self.backends)
+
+        short = self._is_short(size)
+        with self._lock:
+            now = time.monotonic()
+            healthy = [backend for backend in candidates if self._healthy_locked(backend.name, now, claim_probe=True)]
+            medians = {
+                backend.name: median(self._stats[backend.name].latencies[True])
+                for backend in healthy
+                if len(self._stats[backend.name].latencies[True]) >= self.min_samples
+            }
+        if short and len(healthy) > 1 and len(medians) == len(healthy):
+            healthy.sort(key=lambda backend: medians[backend.name])
+        return healthy + [backend for backend in candidates if backend not in healthy]
+
+    def call(self, method, *args, size=None):
+        """Run backend.method(*args) on the best backend, falling back (or hedging) to the others"""
+        candidates = self.order(size)
+        short = self._is_short(size)
+        if short:
+            self._probe_unmeasured(candidates[1:], method, args)
+        if self.hedge:
+            return self._call_hedged(candidates, method, args, short)
+        return self._call_in_order(candidates, method, args, short)
+
+    def _attempt(self, backend, method, args, short, attempt=None):
+        if attempt is not None:
+            current_attempt.set(attempt)
+        start = time.perf_counter()
+        try:
+            check_cancelled()
+            result = getattr(backend, method)(*args)
+        except BackendCancelled:
+            # Its true latency is unknown, so it is left out; audited hedges keep the tail in the stats
+            if attempt is not None and not attempt.cancel.is_set():
+                attempt.refused = True
+            else:
+                with self._lock:
+                    self.cancelled += 1
+            raise
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            METRICS.observe("backend", elapsed, error=True, kind=self.kind, backend=backend.name)
+            api_logger.warning(f"{self.kind} backend {backend.name} failed: {e}")
+            self._record(backend.name, short, elapsed, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        METRICS.observe("backend", elapsed, kind=self.kind, backend=backend.name)
+        self._record(backend.name, short, elapsed)
+        return result
+
+    def _probe_unmeasured(self, backends, method, args):
+        """Time healthy engines that lack short samples on a copy of this request, off the request path
+
+        One copy per engine at a time, until it has min_samples; the answer is
+        discarded. Its latency (or failure) is recorded like any other call.
+        """
+        context = contextvars.copy_context()
+        for backend in backends:
+            with self._lock:
+                stats = self._stats[backend.name]
+                if (backend.name in self._probing or stats.unhealthy_since is not None
+                        or len(stats.latencies[True]) >= self.min_samples):
+                    continue
+                self._probing.add(backend.name)
+                if self._probe_executor is None:
+                    self._probe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{self.kind}-probe")
+            self._probe_executor.submit(context.copy().run, self._probe, backend, method, args)
+
+    def _probe(self, backend, method, args):
+        try:
+            self._attempt(backend, method, args, True)
+        except Exception:
+            # Already logged and counted against the engine by _attempt
+            pass
+        finally:
+            with self._lock:
+                self._probing.discard(backend.name)
+
+    def _call_in_order(self, candidates, method, args, short, error=None):
+        for backend in candidates:
+            try:
+                return self._attempt(backend, method, args, short)
+            except Exception as e:
+                error = e
+        raise error
+
+    def _call_hedged(self, candidates, method, args, short):
+        """Start the best backend; if it outlasts its recent latency quantile, race a backup against it
+
+        The first answer wins and the other attempt is cancelled: dropped if
+        still queued, and stopped early by engines that check_cancelled().
+        Engines may also refuse a backup (raise BackendCancelled), e.g. when it
+        would have to wait for rate limit capacity; the call then counts as
+        refused, not hedged, since no second request was sent. A sample of
+        hedges (hedge_audit_rate) lets a losing primary finish instead, to
+        measure how much time hedging actually saved.
+        """
+        start = time.perf_counter()
+        primary = candidates[0]
+        delay = self.hedge_delay(primary.name, short)
+        if delay is None:
+            result = self._call_in_order(candidates, method, args, short)
+            self._record_call(time.perf_counter() - start)
+            return result
+
+        # Workers run in the caller's context so the rate limiter still sees its session
+        context = contextvars.copy_context()
+        first_attempt = HedgedAttempt()
+        first = self._executor.submit(context.copy().run, self._attempt, primary, method, args, short, first_attempt)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            try:
+                result = first.result()
+            except Exception as e:
+                result = self._call_in_order(candidates[1:], method, args, short, error=e)
+            self._record_call(time.perf_counter() - start)
+            return result
+
+        # With a single engine the backup is a duplicate request to it
+        backup = candidates[1] if len(candidates) > 1 else primary
+        audited = random.random() < self.hedge_audit_rate
+        api_logger.debug(f"Hedging {self.kind} call: {primary.name} exceeded {delay:.2f}s, starting {backup.name}")
+        second_attempt = HedgedAttempt(backup=True)
+        second = self._executor.submit(context.copy().run, self._attempt, backup, method, args, short, second_attempt)
+
+        error = None
+        pending = {first: first_attempt, second: second_attempt}
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                elapsed = time.perf_counter() - start
+                if future is second and audited and first in pending:
+                    # Let the primary finish to learn what the caller would have waited for
+                    pending.pop(first)
+                    first.add_done_callback(
+                        lambda primary_future, answered=elapsed: primary_future.exception() is None
+                        and self._record_saving(start, answered)
+                    )
+                for loser, attempt in pending.items():
+                    attempt.cancel.set()
+                    loser.cancel()
+                refused = second_attempt.refused
+                self._record_call(elapsed, hedged=not refused, backup_won=future is second, refused=refused)
+                if audited and future is first and not refused:
+                    self._record_saving(start, elapsed)
+                return result
+        result = self._call_in_order(candidates[2:], method, args, short, error=error)
+        refused = second_attempt.refused
+        self._record_call(time.perf_counter() - start, hedged=not refused, refused=refused)
+        return result
+
+    def _record_call(self, elapsed, hedged=False, backup_won=False, refused=False):
+        if refused:
+            outcome = "refused"
+        else:
+            outcome = ("backup" if backup_won else "primary") if hedged else "unhedged"
+        METRICS.observe("backend_call", elapsed, kind=self.kind, outcome=outcome)
+        with self._lock:
+            self.calls += 1
+            if hedged:
+                self.hedged += 1
+            if refused:
+                self.refused += 1
+            if backup_won:
+                self.hedge_wins += 1
+
+    def _record_saving(self, start, answered):
+        """Audited hedge: time between the answer and when the primary alone would have answered"""
+        saved = max(0.0, time.perf_counter() - start - answered)
+        METRICS.observe("hedge_saved", saved, kind=self.kind)
+        with self._lock:
+            self._savings.append(saved)
+
+    def hedge_delay(self, name, short):
+        """The hedge_quantile (p95 by default) of the engine's recent latency, or None until there are enough samples"""
+        with self._lock:
+            latencies = sorted(self._stats[name].latencies[short])
+        if len(latencies) < self.min_samples:
+            return None
+        return quantile(latencies, self.hedge_quantile)
+
+    def _record(self, name, short, seconds, error=False):
+        with self._lock:
+            stats = self._stats[name]
+            stats.errors.append(error)
+            if not error:
+                stats.latencies[short].append(seconds)
+                if stats.unhealthy_since is not None:
+                    stats.unhealthy_since = None
+                    api_logger.info(f"{self.kind} backend {name} recovered")
+                return
+            error_rate = sum(stats.errors) / len(stats.errors)
+            if len(stats.errors) >= self.min_samples and error_rate > self.max_error_rate:
+                if stats.unhealthy_since is None:
+                    api_logger.warning(f"{self.kind} backend {name} marked unhealthy (error rate {error_rate:.0%})")
+                # A failed probe restarts the cooldown
+                stats.unhealthy_since = time.monotonic()
+
+    def stats(self):
+        """{backend name: {calls, error_rate, p50, p95, healthy}, "hedging": {...}}"""
+        with self._lock:
+            now = time.monotonic()
+            snapshot = {}
+            for backend in self.backends:
+                stats = self._stats[backend.name]
+                latencies = sorted(stats.latencies[True] + stats.latencies[False])
+                snapshot[backend.name] = {
+                    "calls": len(stats.errors),
+                    "error_rate": sum(stats.errors) / len(stats.errors) if stats.errors else 0.0,
+                    "p50": quantile(latencies, 0.5) if latencies else None,
+                    "p95": quantile(latencies, 0.95) if latencies else None,
+                    "healthy": self._healthy_locked(backend.name, now),
+                }
+            savings = sorted(self._savings)
+            snapshot["hedging"] = {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+                "backup_wins": self.hedge_wins,
+                "cancelled": self.cancelled,
+                "refused": self.refused,
+                "audited": len(savings),
+                "saved_mean": sum(savings) / len(savings) if savings else None,
+                "saved_p95": quantile(savings, 0.95) if savings else None,
+            }
+            return snapshot
+
+
+def build_router(kind, names, owner, short_size, **options):
+    """BackendRouter over the named engines of kind; unavailable optional engines are skipped
+
+    options are passed on to BackendRouter.
+    """
+    backends = []
+    for name in names:
+        engine = ENGINES[kind].get(name)
+        if engine is None:
+            raise ValueError(f"Unknown {kind} backend: {name}")
+        try:
+            backends.append(engine(owner))
+        except BackendUnavailable as e:
+            transcription_logger.warning(f"Skipping {kind} backend {name}: {e}")
+    if not backends:
+        raise ValueError(f"No usable {kind} backend in {', '.join(names)}")
+    transcription_logger.info(f"{kind} backends: {', '.join(backend.name for backend in backends)}")
+    return BackendRouter(kind, backends, short_size, **options)
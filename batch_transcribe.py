@@ -0,0 +1,255 @@
+"""
+Batch transcription and translation over directories of recordings.
+Files are streamed from a directory walk through a bounded worker pool,
+identical audio is only sent to Groq once (matched by content hash), and
+progress is checkpointed to SQLite, so memory stays flat however large the
+archive is and an interrupted run picks up where it stopped.
+
+Usage:
+    python batch_transcribe.py calls/ -o calls.jsonl --direction es-en
+
+Each finished file is appended to the JSONL output with its transcript and
+translation.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from config import LOGGERS, BATCH_TRANSCRIBE_WORKERS, BATCH_TRANSCRIBE_EXTENSIONS
+from transcription import Transcriber
+
+transcription_logger = LOGGERS['transcription']
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def walk_audio_files(root, extensions=BATCH_TRANSCRIBE_EXTENSIONS):
+    """Yield audio file paths under root in a stable order, one directory at a time"""
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if os.path.splitext(file_name)[1].lower() in extensions:
+                yield os.path.join(dir_path, file_name)
+
+
+def file_sha256(path):
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BatchCheckpoint:
+    """Which files are done and what each distinct recording produced"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                sha256 TEXT NOT NULL,
+                direction TEXT NOT NULL,
+                transcript TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                PRIMARY KEY (sha256, direction)
+            )
+        """)
+        self._conn.commit()
+
+    def is_done(self, path):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone()
+        return row is not None
+
+    def result_for(self, sha256, direction):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcript, translation FROM results WHERE sha256 = ? AND direction = ?",
+                (sha256, direction)
+            ).fetchone()
+        return {"transcript": row[0], "translation": row[1]} if row else None
+
+    def store_result(self, sha256, direction, result):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (sha256, direction, transcript, translation) VALUES (?, ?, ?, ?)",
+                (sha256, direction, result["transcript"], result["translation"])
+            )
+            self._conn.commit()
+
+    def mark_done(self, path, sha256):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, sha256, finished_at) VALUES (?, ?, ?)",
+                (path, sha256, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class BatchTranscriber:
+    def __init__(self, transcriber, checkpoint, direction="en-es", max_workers=BATCH_TRANSCRIBE_WORKERS):
+        self.transcriber = transcriber
+        self.checkpoint = checkpoint
+        self.direction = direction
+        self.max_workers = max_workers
+        # sha256 -> Future for recordings being processed right now, so duplicates wait instead of re-uploading
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _transcribe(self, path):
+        """Transcript and translation for one recording, or an error message"""
+        if self.direction == "en-es":
+            transcript = self.transcriber.transcribe_audio(path, language="en")
+            if transcript.startswith("Error"):
+                return {"error": transcript}
+            translation = self.transcriber.translate_text_to_spanish(transcript)
+        else:
+            # One read of the file, with the transcription and translation requests in flight together
+            transcript, translation = self.transcriber.transcribe_and_translate_audio(path, language="es")
+            if transcript.startswith("Error"):
+                return {"error": transcript}
+
+        if translation.startswith("Error"):
+            return {"error": str(translation)}
+        return {"transcript": transcript, "translation": str(translation)}
+
+    def process_file(self, path):
+        """Process one file, reusing the result of identical audio; returns a JSONL record"""
+        start_time = time.time()
+        sha256 = file_sha256(path)
+
+        result = self.checkpoint.result_for(sha256, self.direction)
+        duplicate = result is not None
+        if not duplicate:
+            with self._lock:
+                pending = self._in_flight.get(sha256)
+                owner = False
+                if pending is None:
+                    # An owner may have stored its result and left since the read above
+                    result = self.checkpoint.result_for(sha256, self.direction)
+                    duplicate = result is not None
+                    if not duplicate:
+                        owner = True
+                        pending = self._in_flight[sha256] = Future()
+
+        if not duplicate:
+            if owner:
+                try:
+                    result = self._transcribe(path)
+                    if "error" not in result:
+                        self.checkpoint.store_result(sha256, self.direction, result)
+                    pending.set_result(result)
+                except Exception as e:
+                    result = {"error": f"Error during batch transcription: {e}"}
+                    pending.set_result(result)
+                finally:
+                    with self._lock:
+                        del self._in_flight[sha256]
+            else:
+                result = pending.result()
+                duplicate = True
+
+        return {
+            "path": path,
+            "sha256": sha256,
+            "direction": self.direction,
+            "status": "error" if "error" in result else "ok",
+            "duplicate": duplicate,
+            "seconds": round(time.time() - start_time, 3),
+            **result,
+        }
+
+    def run(self, paths, output_path):
+        """Process paths into output_path, skipping checkpointed files; returns stats"""
+        stats = {"files": 0, "ok": 0, "failed": 0, "duplicates": 0, "skipped": 0}
+        start_time = time.time()
+
+        with open(output_path, "a", encoding="utf-8") as output, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-transcribe") as executor:
+            in_flight = set()
+
+            def drain():
+                done, still_running = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = future.result()
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                    stats["files"] += 1
+                    stats["ok" if record["status"] == "ok" else "failed"] += 1
+                    stats["duplicates"] += record["duplicate"]
+                    if record["status"] == "ok":
+                        # Failed files stay unmarked so the next run retries them
+                        self.checkpoint.mark_done(record["path"], record["sha256"])
+                return still_running
+
+            # Only a bounded window of files is ever queued, whatever the archive size
+            for path in paths:
+                if self.checkpoint.is_done(path):
+                    stats["skipped"] += 1
+                    continue
+                in_flight.add(executor.submit(self._safe_process, path))
+                if len(in_flight) >= 2 * self.max_workers:
+                    in_flight = drain()
+            while in_flight:
+                in_flight = drain()
+
+        stats["seconds"] = time.time() - start_time
+        stats["files_per_second"] = stats["files"] / stats["seconds"] if stats["seconds"] else 0.0
+        transcription_logger.info(
+            f"Batch transcription ({self.direction}) finished: {stats['ok']} ok ({stats['duplicates']} duplicates), "
+            f"{stats['failed']} failed, {stats['skipped']} skipped in {stats['seconds']:.1f}s"
+        )
+        return stats
+
+    def _safe_process(self, path):
+        try:
+            return self.process_file(path)
+        except OSError as e:
+            transcription_logger.error(f"Batch transcription could not read {path}: {e}")
+            return {"path": path, "sha256": None, "direction": self.direction, "status": "error",
+                    "duplicate": False, "error": str(e)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and translate a directory of recordings to JSONL")
+    parser.add_argument("root", help="Directory to walk for audio files")
+    parser.add_argument("-o", "--output", help="Output JSONL (default: <root>.<direction>.jsonl)")
+    parser.add_argument("--direction", choices=["en-es", "es-en"], default="en-es", help="Language spoken → target language")
+    parser.add_argument("--workers", type=int, default=BATCH_TRANSCRIBE_WORKERS, help="Files processed concurrently")
+    parser.add_argument("--checkpoint", help="Checkpoint database (default: <output>.checkpoint.sqlite3)")
+    args = parser.parse_args(argv)
+
+    output_path = args.output or f"{os.path.normpath(args.root)}.{args.direction}.jsonl"
+    checkpoint = BatchCheckpoint(args.checkpoint or f"{output_path}.checkpoint.sqlite3")
+    try:
+        batch = BatchTranscriber(Transcriber(), checkpoint, direction=args.direction, max_workers=args.workers)
+        stats = batch.run(walk_audio_files(args.root), output_path)
+    finally:
+        checkpoint.close()
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Headless batch translation for phrasebooks and transcripts.
+Segments are packed many to a chat completion, batches run concurrently with
+a shared back-off when Groq rate-limits us, and results are appended to a
+JSONL file as they finish, so an interrupted run resumes where it stopped.
+
+Usage:
+    python batch_translate.py phrases.txt -o phrases.es.jsonl --direction en-es
+
+Input is either plain text (one segment per line) or JSONL with "text" and an
+optional "id" on each line.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import groq
+from config import (
+    LOGGERS,
+    BATCH_TRANSLATE_SIZE,
+    BATCH_TRANSLATE_MAX_CHARS,
+    BATCH_TRANSLATE_WORKERS,
+    BATCH_TRANSLATE_MAX_RETRIES,
+)
+from transcription import Transcriber
+from rate_limiter import RateLimitTimeout
+from tts_client import parse_retry_after
+
+transcription_logger = LOGGERS['transcription']
+api_logger = LOGGERS['api']
+
+
+def read_segments(input_path):
+    """Yield (segment_id, text) from a text or JSONL file"""
+    is_jsonl = input_path.endswith(".jsonl")
+    with open(input_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            if is_jsonl:
+                record = json.loads(line)
+                yield str(record.get("id", line_number)), record["text"]
+            else:
+                yield str(line_number), line
+
+
+def load_completed(output_path):
+    """IDs already translated successfully in a previous run's output"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["id"])
+    return completed
+
+
+def make_batches(segments, batch_size=BATCH_TRANSLATE_SIZE, max_chars=BATCH_TRANSLATE_MAX_CHARS):
+    """Group (segment_id, text) pairs by count and by packed prompt size"""
+    batch, chars = [], 0
+    for segment in segments:
+        if batch and (len(batch) >= batch_size or chars + len(segment[1]) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(segment)
+        chars += len(segment[1])
+    if batch:
+        yield batch
+
+
+class BatchTranslator:
+    def __init__(self, transcriber, direction="en-es", batch_size=BATCH_TRANSLATE_SIZE,
+                 max_chars=BATCH_TRANSLATE_MAX_CHARS, max_workers=BATCH_TRANSLATE_WORKERS,
+                 max_retries=BATCH_TRANSLATE_MAX_RETRIES):
+        self.transcriber = transcriber
+        self.direction = direction
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        # When one worker is rate-limited every worker waits, instead of all of them hammering the API
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_for_rate_limit(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _back_off(self, attempt, retry_after=None):
+        delay = retry_after if retry_after is not None else random.uniform(0, min(30, 2 ** attempt))
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return delay
+
+    @staticmethod
+    def _error_records(batch, error):
+        return [
+            {"id": segment_id, "source": text, "translation": None, "status": "error", "error": str(error)}
+            for segment_id, text in batch
+        ]
+
+    def translate_batch(self, batch):
+        """Translate one batch of (segment_id, text); returns JSONL records"""
+        texts = [text for _, text in batch]
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                results = self.transcriber.translate_text_batch(self.direction, texts)
+                break
+            except groq.RateLimitError as e:
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                error = e
+            except (groq.APIConnectionError, groq.InternalServerError, RateLimitTimeout) as e:
+                retry_after = None
+                error = e
+            except Exception as e:
+                # Not retryable (e.g. groq.BadRequestError, AuthenticationError); only this batch fails
+                api_logger.error(f"Batch of {len(batch)} segments failed: {e}")
+                return self._error_records(batch, e)
+
+            if attempt >= self.max_retries:
+                api_logger.error(f"Batch of {len(batch)} segments failed after {attempt + 1} attempts: {error}")
+                return self._error_records(batch, error)
+            delay = self._back_off(attempt, retry_after)
+            api_logger.warning(f"Batch translation throttled/failed (attempt {attempt + 1}), backing off {delay:.1f}s: {error}")
+            attempt += 1
+
+        records = []
+        for (segment_id, text), result in zip(batch, results):
+            failed = result.startswith("Error")
+            records.append({
+                "id": segment_id,
+                "source": text,
+                "translation": None if failed else str(result),
+                "status": "error" if failed else "ok",
+                "from_memory": result.from_memory,
+                **({"error": str(result)} if failed else {}),
+            })
+        return records
+
+    def run(self, segments, output_path, resume=True):
+        """Translate (segment_id, text) pairs into output_path; returns throughput stats"""
+        completed = load_completed(output_path) if resume else set()
+        if completed:
+            transcription_logger.info(f"Resuming batch translation: {len(completed)} segments already done")
+
+        stats = {"segments": 0, "translated": 0, "failed": 0, "skipped": 0, "from_memory": 0}
+
+        def remaining():
+            for segment_id, text in segments:
+                if segment_id in completed:
+                    stats["skipped"] += 1
+                    continue
+                yield segment_id, text
+
+        start_time = time.time()
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-translate") as executor:
+            in_flight = set()
+            batches = make_batches(remaining(), self.batch_size, self.max_chars)
+
+            def drain():
+                done, still_running = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for record in future.result():
+                        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        stats["segments"] += 1
+                        stats["translated" if record["status"] == "ok" else "failed"] += 1
+                        stats["from_memory"] += bool(record.get("from_memory"))
+                    output.flush()
+                return still_running
+
+            # Keep a bounded number of batches queued so huge inputs are never fully in memory
+            for batch in batches:
+                in_flight.add(executor.submit(self.translate_batch, batch))
+                if len(in_flight) >= 2 * self.max_workers:
+                    in_flight = drain()
+            while in_flight:
+                in_flight = drain()
+
+        stats["seconds"] = time.time() - start_time
+        stats["segments_per_second"] = stats["segments"] / stats["seconds"] if stats["seconds"] else 0.0
+        transcription_logger.info(
+            f"Batch translation ({self.direction}) finished: {stats['translated']} ok, {stats['failed']} failed, "
+            f"{stats['skipped']} skipped in {stats['seconds']:.1f}s ({stats['segments_per_second']:.1f} segments/s)"
+        )
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-translate a phrasebook or transcript to JSONL")
+    parser.add_argument("input", help="Text file (one segment per line) or JSONL with a 'text' field")
+    parser.add_argument("-o", "--output", help="Output JSONL (default: <input>.<direction>.jsonl)")
+    parser.add_argument("--direction", choices=["en-es", "es-en"], default="en-es")
+    parser.add_argument("--batch-size", type=int, default=BATCH_TRANSLATE_SIZE, help="Segments per request")
+    parser.add_argument("--max-chars", type=int, default=BATCH_TRANSLATE_MAX_CHARS, help="Source characters per request")
+    parser.add_argument("--workers", type=int, default=BATCH_TRANSLATE_WORKERS, help="Concurrent requests")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args(argv)
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}.{args.direction}.jsonl"
+    translator = BatchTranslator(
+        Transcriber(),
+        direction=args.direction,
+        batch_size=args.batch_size,
+        max_chars=args.max_chars,
+        max_workers=args.workers
+    )
+    stats = translator.run(read_segments(args.input), output_path, resume=not args.no_resume)
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Deterministic WAV fixture corpus for the benchmarks.
+Recordings are synthesized from a seed (voiced bursts separated by pauses over
+low noise, at the sample rates browsers actually produce) instead of being
+checked in, and are regenerated only when missing.
+"""
+import os
+import math
+import wave
+import array
+import random
+
+# (name, seconds, sample_rate, channels)
+CORPUS = (
+    ("short_16k_mono", 3, 16000, 1),
+    ("phrase_44k_stereo", 6, 44100, 2),
+    ("sentence_48k_mono", 12, 48000, 1),
+    ("long_48k_stereo", 150, 48000, 2),
+)
+
+
+def _speech_like(seconds, rate, rng):
+    """Alternating voiced bursts and pauses, with a noise floor"""
+    samples = array.array("h")
+    position = 0
+    total = int(seconds * rate)
+    while position < total:
+        burst = int(rng.uniform(0.4, 2.5) * rate)
+        pitch = rng.uniform(90, 250)
+        for i in range(min(burst, total - position)):
+            t = i / rate
+            envelope = min(1.0, i / (0.02 * rate), (burst - i) / (0.02 * rate))
+            value = envelope * (4000 * math.sin(2 * math.pi * pitch * t) + 1500 * math.sin(2 * math.pi * 3 * pitch * t))
+            samples.append(int(value + rng.gauss(0, 80)))
+        position += burst
+
+        pause = int(rng.uniform(0.15, 0.9) * rate)
+        for _ in range(min(pause, total - position)):
+            samples.append(int(rng.gauss(0, 60)))
+        position += pause
+    return samples
+
+
+def ensure_corpus(corpus_dir, seed=1234):
+    """Write any missing fixtures into corpus_dir and return {name: path}"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = {}
+    for index, (name, seconds, rate, channels) in enumerate(CORPUS):
+        path = os.path.join(corpus_dir, f"{name}.wav")
+        paths[name] = path
+        if os.path.exists(path):
+            continue
+
+        mono = _speech_like(seconds, rate, random.Random(seed + index))
+        if channels == 2:
+            frames = array.array("h")
+            for sample in mono:
+                frames.append(sample)
+                frames.append(sample // 2)
+        else:
+            frames = mono
+
+        temp_path = f"{path}.tmp"
+        with wave.open(temp_path, "wb") as writer:
+            writer.setnchannels(channels)
+            writer.setsampwidth(2)
+            writer.setframerate(rate)
+            writer.writeframes(frames.tobytes())
+        os.replace(temp_path, path)
+    return paths
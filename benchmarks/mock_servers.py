@@ -0,0 +1,201 @@
+"""
+Local stand-ins for the Groq and ElevenLabs HTTP APIs.
+Both answer with well-formed responses after a configurable latency plus
+jitter, and inject 429/500 errors at a configurable rate, so the real clients
+(groq SDK, TTSClient) can be benchmarked without spending API quota.
+"""
+import re
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SEGMENT_MARKER = re.compile(r"^\[\[(\d+)\]\][ \t]*$", re.MULTILINE)
+
+# One silent-ish MPEG-1 Layer III frame; responses start with an ID3 tag so validate_tts_audio accepts them
+FAKE_MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+
+
+class MockBehavior:
+    """Latency, jitter and error injection for one mock server"""
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, rate_limit_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter)
+        time.sleep(self.latency + jitter)
+
+    def injected_status(self):
+        """429, 500 or None for this request"""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class _MockServer:
+    name = "mock"
+
+    def __init__(self, behavior=None, host="127.0.0.1", port=0):
+        self.behavior = behavior or MockBehavior()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=f"{self.name}-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle(self, handler, path, body):
+        raise NotImplementedError
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests += 1
+                server.behavior.delay()
+
+                status = server.behavior.injected_status()
+                if status:
+                    self.send_json(status, {"error": {"message": f"injected {status}", "type": "mock_error"}},
+                                   {"Retry-After": "0"} if status == 429 else None)
+                    return
+                server.handle(self, self.path.split("?", 1)[0], body)
+
+            def send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _mock_translation(text):
+    """Deterministic stand-in translation that keeps batch markers intact"""
+    if SEGMENT_MARKER.search(text):
+        parts = SEGMENT_MARKER.split(text)
+        return "\n".join(f"[[{number}]]\n[es] {segment.strip()}" for number, segment in zip(parts[1::2], parts[2::2]))
+    return f"[es] {text.strip()}"
+
+
+class MockGroqServer(_MockServer):
+    """Groq's OpenAI-compatible audio transcription/translation and chat completion endpoints"""
+    name = "mock-groq"
+
+    def __init__(self, behavior=None, host="127.0.0.1", port=0, transcript="this is a benchmark transcript"):
+        self.transcript = transcript
+        super().__init__(behavior, host, port)
+
+    def handle(self, handler, path, body):
+        if path.endswith("/audio/transcriptions") or path.endswith("/audio/translations"):
+            # Longer uploads transcribe to more words, roughly one per 4 KB of audio
+            words = max(1, len(body) // 4096)
+            text = " ".join(self.transcript.split()[i % len(self.transcript.split())] for i in range(words))
+            handler.send_json(200, {"text": text})
+        elif path.endswith("/chat/completions"):
+            request = json.loads(body or b"{}")
+            source = next((m["content"] for m in reversed(request.get("messages", [])) if m["role"] == "user"), "")
+            content = _mock_translation(source)
+            if request.get("stream"):
+                self._stream_completion(handler, request, content)
+            else:
+                handler.send_json(200, self._completion(request, content))
+        else:
+            handler.send_json(404, {"error": {"message": f"unknown path {path}"}})
+
+    @staticmethod
+    def _usage(request, content):
+        prompt_tokens = sum(len(m["content"]) for m in request.get("messages", [])) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _completion(self, request, content):
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": self._usage(request, content),
+        }
+
+    def _stream_completion(self, handler, request, content):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+        for word in re.findall(r"\S+\s*", content):
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+            }
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+        # Like Groq, usage only comes with the final chunk
+        final = {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": "req-mock", "usage": self._usage(request, content)},
+        }
+        handler.wfile.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        handler.wfile.write(b"data: [DONE]\n\n")
+
+
+class MockElevenLabsServer(_MockServer):
+    """ElevenLabs text-to-speech and text-to-speech/stream endpoints"""
+    name = "mock-elevenlabs"
+
+    def handle(self, handler, path, body):
+        if not path.startswith("/v1/text-to-speech/"):
+            handler.send_json(404, {"detail": f"unknown path {path}"})
+            return
+
+        text = json.loads(body or b"{}").get("text", "")
+        # About one 26 ms frame per character, like real speech
+        audio = b"ID3" + bytes(7) + FAKE_MP3_FRAME * max(4, len(text))
+        handler.send_response(200)
+        handler.send_header("Content-Type", "audio/mpeg")
+        handler.send_header("Content-Length", str(len(audio)))
+        handler.end_headers()
+        handler.wfile.write(audio)
@@ -0,0 +1,233 @@
+"""
+Benchmark the STT → MT → TTS path against local mock servers.
+
+Usage (from the repository root):
+    python -m benchmarks.run                       # run and compare against benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline     # record a new baseline
+    python -m benchmarks.run --scenarios stt,mt --concurrency 1,8 --latency 0.2 --error-rate 0.05
+
+Each scenario drives the real Transcriber / TTSClient code at each concurrency
+level and reports throughput and latency percentiles. A scenario regresses when
+its p95 or throughput is worse than the baseline by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import itertools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# The clients refuse to start without keys; the mocks ignore them
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("ELEVEN_LABS", "benchmark")
+
+from config import LOGGERS, VOICE_CONFIG
+from metrics import METRICS, quantile
+from transcription import Transcriber
+from tts_cache import TTSCache
+from tts_client import TTSClient
+from benchmarks.corpus import ensure_corpus
+from benchmarks.mock_servers import MockBehavior, MockGroqServer, MockElevenLabsServer
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "bilingual-ai", "benchmark-corpus")
+
+PHRASES = (
+    "Good morning, how can I help you today?",
+    "Please take a seat, the doctor will see you shortly.",
+    "Could you spell your last name for me?",
+    "Your appointment has been moved to next Tuesday at three in the afternoon.",
+    "Do you have any allergies to medication?",
+)
+SHORT_RECORDINGS = ("short_16k_mono", "phrase_44k_stereo", "sentence_48k_mono")
+
+
+class BenchmarkContext:
+    def __init__(self, groq_url, elevenlabs_url, corpus):
+        self.corpus = corpus
+        # No translation memory or rate limiter: every request must reach the mock
+        self.transcriber = Transcriber(translation_memory=False, rate_limiter=False, base_url=groq_url)
+        self.tts_client = TTSClient(base_url=elevenlabs_url)
+        self.tts_cache = TTSCache(cache_dir=tempfile.mkdtemp(prefix="bilingual-benchmark-tts-"))
+        self.voice_id = VOICE_CONFIG["spanish"]["male"]
+        # Keeps TTS texts unique across runs and calls so every synthesis is a cache miss
+        self.run_id = f"{time.time_ns():x}"
+        self._serial = itertools.count()
+
+    def recording(self, index):
+        return self.corpus[SHORT_RECORDINGS[index % len(SHORT_RECORDINGS)]]
+
+    def phrase(self, index):
+        return f"{PHRASES[index % len(PHRASES)]} ({self.unique_suffix()})"
+
+    def unique_suffix(self):
+        return f"{self.run_id}-{next(self._serial)}"
+
+
+def _stt(ctx, index):
+    return not ctx.transcriber.transcribe_audio(ctx.recording(index), language="en").startswith("Error")
+
+
+def _stt_long(ctx, index):
+    return not ctx.transcriber.transcribe_audio(ctx.corpus["long_48k_stereo"], language="en").startswith("Error")
+
+
+def _mt(ctx, index):
+    return not ctx.transcriber.translate_text_to_spanish(ctx.phrase(index)).startswith("Error")
+
+
+def _tts(ctx, index):
+    return ctx.tts_client.synthesize_to_cache(ctx.tts_cache, ctx.phrase(index), ctx.voice_id) is not None
+
+
+def _pipeline(ctx, index):
+    english_text = ctx.transcriber.transcribe_audio(ctx.recording(index), language="en")
+    if english_text.startswith("Error"):
+        return False
+    spanish_text = ctx.transcriber.translate_text_to_spanish(f"{english_text} ({ctx.unique_suffix()})")
+    if spanish_text.startswith("Error"):
+        return False
+    return ctx.tts_client.synthesize_to_cache(ctx.tts_cache, str(spanish_text), ctx.voice_id) is not None
+
+
+# name -> (callable(ctx, index) -> success, share of --requests to run)
+SCENARIOS = {
+    "stt": (_stt, 1.0),
+    "stt_long": (_stt_long, 0.1),
+    "mt": (_mt, 1.0),
+    "tts": (_tts, 1.0),
+    "pipeline": (_pipeline, 1.0),
+}
+
+
+def run_scenario(ctx, name, concurrency, requests):
+    scenario, share = SCENARIOS[name]
+    requests = max(concurrency, int(requests * share))
+
+    def timed(index):
+        start = time.perf_counter()
+        try:
+            ok = scenario(ctx, index)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{name}") as executor:
+        outcomes = list(executor.map(timed, range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in outcomes)
+    errors = sum(1 for _, ok in outcomes if not ok)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "error_rate": errors / requests,
+        "throughput_rps": requests / wall,
+        "mean": sum(latencies) / len(latencies),
+        "p50": quantile(latencies, 0.50),
+        "p95": quantile(latencies, 0.95),
+        "p99": quantile(latencies, 0.99),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for results that are worse than baseline beyond tolerance"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        if result["p95"] > reference["p95"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {result['p95']:.3f}s vs baseline {reference['p95']:.3f}s")
+        if result["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: throughput {result['throughput_rps']:.2f}/s vs baseline {reference['throughput_rps']:.2f}/s"
+            )
+        if result["error_rate"] > reference["error_rate"] + 0.02:
+            regressions.append(f"{key}: error rate {result['error_rate']:.1%} vs baseline {reference['error_rate']:.1%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark STT → MT → TTS against local mock APIs")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario and concurrency level")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Mock latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of mock requests answered with 429")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    # Per-request logging would dominate the measurements
+    for logger in LOGGERS.values():
+        logger.setLevel(logging.WARNING)
+
+    def behavior(offset):
+        return MockBehavior(args.latency, args.jitter, args.error_rate, args.rate_limit_rate, seed=args.seed + offset)
+
+    corpus = ensure_corpus(args.corpus_dir, seed=args.seed)
+    groq_server = MockGroqServer(behavior(0))
+    elevenlabs_server = MockElevenLabsServer(behavior(1))
+    try:
+        ctx = BenchmarkContext(groq_server.url, elevenlabs_server.url, corpus)
+        results = {}
+        for name in args.scenarios.split(","):
+            for concurrency in (int(level) for level in args.concurrency.split(",")):
+                key = f"{name}@{concurrency}"
+                results[key] = run_scenario(ctx, name, concurrency, args.requests)
+                result = results[key]
+                print(
+                    f"{key:<16} {result['throughput_rps']:8.2f} req/s  p50 {result['p50'] * 1000:7.1f}ms  "
+                    f"p95 {result['p95'] * 1000:7.1f}ms  p99 {result['p99'] * 1000:7.1f}ms  errors {result['errors']}"
+                )
+    finally:
+        groq_server.close()
+        elevenlabs_server.close()
+
+    report = {
+        "settings": {key: getattr(args, key) for key in ("requests", "latency", "jitter", "error_rate", "rate_limit_rate", "seed")},
+        "results": results,
+        "stages": METRICS.summary(),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"settings": report["settings"], "results": results}, file, indent=2)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("settings") != report["settings"]:
+        print(f"Warning: baseline was recorded with different settings: {baseline.get('settings')}")
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import os
 import logging
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,6 +21,39 @@ VOICE_CONFIG = {
     }
 }
 
+# ElevenLabs TTS Configuration
+ELEVEN_LABS_BASE_URL = os.getenv("ELEVEN_LABS_BASE_URL", "https://api.elevenlabs.io")
+ELEVEN_LABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVEN_LABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.5
+}
+ELEVEN_LABS_CONNECT_TIMEOUT = float(os.getenv("ELEVEN_LABS_CONNECT_TIMEOUT", "3.05"))
+ELEVEN_LABS_READ_TIMEOUT = float(os.getenv("ELEVEN_LABS_READ_TIMEOUT", "30"))
+ELEVEN_LABS_MAX_RETRIES = int(os.getenv("ELEVEN_LABS_MAX_RETRIES", "3"))
+ELEVEN_LABS_BACKOFF_BASE = float(os.getenv("ELEVEN_LABS_BACKOFF_BASE", "0.5"))
+ELEVEN_LABS_BACKOFF_MAX = float(os.getenv("ELEVEN_LABS_BACKOFF_MAX", "8"))
+ELEVEN_LABS_POOL_SIZE = int(os.getenv("ELEVEN_LABS_POOL_SIZE", "10"))
+ELEVEN_LABS_BREAKER_THRESHOLD = int(os.getenv("ELEVEN_LABS_BREAKER_THRESHOLD", "5"))
+ELEVEN_LABS_BREAKER_RESET = float(os.getenv("ELEVEN_LABS_BREAKER_RESET", "30"))
+
+# Streaming TTS Configuration (progressive playback needs the audio server)
+TTS_STREAMING_ENABLED = os.getenv("TTS_STREAMING_ENABLED", "FALSE").upper() == "TRUE"
+TTS_STREAM_CHUNK_SIZE = int(os.getenv("TTS_STREAM_CHUNK_SIZE", "16384"))
+
+# Edited translations are only re-synthesized on "Update audio" or after this
+# many idle seconds (0 = only on the button)
+TTS_EDIT_DEBOUNCE_SECONDS = float(os.getenv("TTS_EDIT_DEBOUNCE_SECONDS", "2.0"))
+
+# Local Audio Server Configuration
+AUDIO_SERVER_ENABLED = os.getenv("AUDIO_SERVER_ENABLED", "FALSE").upper() == "TRUE"
+AUDIO_SERVER_HOST = os.getenv("AUDIO_SERVER_HOST", "127.0.0.1")
+AUDIO_SERVER_PORT = int(os.getenv("AUDIO_SERVER_PORT", "8502"))
+AUDIO_SERVER_PUBLIC_URL = (os.getenv("AUDIO_SERVER_PUBLIC_URL") or f"http://localhost:{AUDIO_SERVER_PORT}").rstrip("/")
+
+# Audio player waveform: (min, max) peak pairs computed per clip
+WAVEFORM_PEAKS = int(os.getenv("WAVEFORM_PEAKS", "300"))
+
 # Bilingual Interface Text
 INTERFACE_TEXT = {
     "english": {
@@ -81,6 +115,140 @@ AUDIO_RATE = 16000
 AUDIO_CHANNELS = 1
 AUDIO_SAMPLE_WIDTH = 2
 
+# Upload normalization: mono, AUDIO_RATE, and "flac" (needs soundfile) or "wav"
+AUDIO_NORMALIZE_ENABLED = os.getenv("AUDIO_NORMALIZE_ENABLED", "TRUE").upper() == "TRUE"
+AUDIO_UPLOAD_FORMAT = os.getenv("AUDIO_UPLOAD_FORMAT", "flac").lower()
+
+# Voice Activity Detection (silence trimming before upload)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "TRUE").upper() == "TRUE"
+VAD_FRAME_MS = 30
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", "240"))
+VAD_MAX_PAUSE_MS = int(os.getenv("VAD_MAX_PAUSE_MS", "600"))
+VAD_KEEP_PAUSE_MS = int(os.getenv("VAD_KEEP_PAUSE_MS", "300"))
+VAD_ENERGY_RATIO = float(os.getenv("VAD_ENERGY_RATIO", "3.0"))
+VAD_MIN_RMS = int(os.getenv("VAD_MIN_RMS", "150"))
+
+# Long-audio mode: recordings over LONG_AUDIO_MIN_SECONDS are split at pauses
+# and the chunks transcribed concurrently
+LONG_AUDIO_ENABLED = os.getenv("LONG_AUDIO_ENABLED", "TRUE").upper() == "TRUE"
+LONG_AUDIO_MIN_SECONDS = float(os.getenv("LONG_AUDIO_MIN_SECONDS", "120"))
+LONG_AUDIO_CHUNK_SECONDS = float(os.getenv("LONG_AUDIO_CHUNK_SECONDS", "60"))
+LONG_AUDIO_OVERLAP_SECONDS = float(os.getenv("LONG_AUDIO_OVERLAP_SECONDS", "1.5"))
+LONG_AUDIO_MAX_WORKERS = int(os.getenv("LONG_AUDIO_MAX_WORKERS", "4"))
+
+# Speech translation strategy per direction: sequential, direct (es-en only),
+# pipelined, or auto (pick the fastest measured strategy)
+SPEECH_TRANSLATION_STRATEGIES = {
+    "en-es": os.getenv("SPEECH_TRANSLATION_STRATEGY_EN_ES", "sequential").lower(),
+    "es-en": os.getenv("SPEECH_TRANSLATION_STRATEGY_ES_EN", "direct").lower(),
+}
+SPEECH_TRANSLATION_SEGMENT_SECONDS = float(os.getenv("SPEECH_TRANSLATION_SEGMENT_SECONDS", "15"))
+SPEECH_TRANSLATION_AUTO_MIN_SAMPLES = int(os.getenv("SPEECH_TRANSLATION_AUTO_MIN_SAMPLES", "5"))
+# Direct Spanish -> English also transcribes the Spanish, concurrently on the same upload
+SPEECH_TRANSLATION_SOURCE_TRANSCRIPT = os.getenv("SPEECH_TRANSLATION_SOURCE_TRANSCRIPT", "TRUE").upper() == "TRUE"
+
+# Engines per stage, primary first; later ones are fallbacks and short-input candidates.
+# "local" runs on the CPU (faster-whisper for STT, argostranslate for MT);
+# "groq-fast" is a smaller Groq chat model only used for short text
+def _parse_backends(value):
+    return [name.strip().lower() for name in value.split(",") if name.strip()]
+
+STT_BACKENDS = _parse_backends(os.getenv("STT_BACKENDS", "groq"))
+MT_BACKENDS = _parse_backends(os.getenv("MT_BACKENDS", "groq"))
+TTS_BACKENDS = _parse_backends(os.getenv("TTS_BACKENDS", "elevenlabs"))
+# Inputs at most this long go to whichever engine has been fastest lately
+BACKEND_SHORT_AUDIO_SECONDS = float(os.getenv("BACKEND_SHORT_AUDIO_SECONDS", "5"))
+BACKEND_SHORT_TEXT_CHARS = int(os.getenv("BACKEND_SHORT_TEXT_CHARS", "200"))
+# Rolling per-engine statistics: an engine whose error rate over the window
+# exceeds BACKEND_MAX_ERROR_RATE is skipped, and retried after the cooldown
+BACKEND_STATS_WINDOW = int(os.getenv("BACKEND_STATS_WINDOW", "100"))
+BACKEND_MIN_SAMPLES = int(os.getenv("BACKEND_MIN_SAMPLES", "5"))
+BACKEND_MAX_ERROR_RATE = float(os.getenv("BACKEND_MAX_ERROR_RATE", "0.5"))
+BACKEND_UNHEALTHY_COOLDOWN = float(os.getenv("BACKEND_UNHEALTHY_COOLDOWN", "30"))
+# Hedging: when a call outlasts the engine's recent p95, fire a backup on the next one
+BACKEND_HEDGE_ENABLED = os.getenv("BACKEND_HEDGE_ENABLED", "FALSE").upper() == "TRUE"
+BACKEND_HEDGE_QUANTILE = float(os.getenv("BACKEND_HEDGE_PERCENTILE", "95")) / 100
+# Share of hedges whose losing primary runs to completion, to measure the time saved
+BACKEND_HEDGE_AUDIT_RATE = float(os.getenv("BACKEND_HEDGE_AUDIT_RATE", "0.1"))
+# Hedge only the text translation calls (translate_text_to_spanish/english)
+TRANSLATION_HEDGE_ENABLED = os.getenv("TRANSLATION_HEDGE_ENABLED", "FALSE").upper() == "TRUE"
+TRANSLATION_HEDGE_QUANTILE = float(os.getenv("TRANSLATION_HEDGE_PERCENTILE", "95")) / 100
+BACKEND_HEDGE_WORKERS = int(os.getenv("BACKEND_HEDGE_WORKERS", "8"))
+MT_FAST_MODEL = os.getenv("MT_FAST_MODEL", "llama-3.1-8b-instant")
+MT_FAST_MAX_CHARS = int(os.getenv("MT_FAST_MAX_CHARS", "200"))
+LOCAL_STT_MODEL = os.getenv("LOCAL_STT_MODEL", "small")
+LOCAL_STT_COMPUTE_TYPE = os.getenv("LOCAL_STT_COMPUTE_TYPE", "int8")
+LOCAL_STT_THREADS = int(os.getenv("LOCAL_STT_THREADS", "4"))
+
+# TTS Cache Configuration
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "bilingual-ai", "tts-cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# Audio Workspace: per-session scratch directories for recordings, garbage
+# collected by age and total size
+AUDIO_WORKSPACE_DIR = os.getenv("AUDIO_WORKSPACE_DIR") or os.path.join(tempfile.gettempdir(), "bilingual-ai", "workspace")
+AUDIO_WORKSPACE_MAX_BYTES = int(os.getenv("AUDIO_WORKSPACE_MAX_MB", "500")) * 1024 * 1024
+AUDIO_WORKSPACE_MAX_AGE_SECONDS = float(os.getenv("AUDIO_WORKSPACE_MAX_AGE_SECONDS", "3600"))
+AUDIO_WORKSPACE_GC_INTERVAL = float(os.getenv("AUDIO_WORKSPACE_GC_INTERVAL", "60"))
+AUDIO_WORKSPACE_SESSION_GRACE = float(os.getenv("AUDIO_WORKSPACE_SESSION_GRACE", "300"))
+# Recordings are sent to Groq from memory; with spill enabled the copy kept for
+# "Retranslate from Audio" is written to the workspace instead of session memory
+AUDIO_SPILL_TO_DISK = os.getenv("AUDIO_SPILL_TO_DISK", "FALSE").upper() == "TRUE"
+
+# Translation Memory Configuration
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "TRUE").upper() == "TRUE"
+TRANSLATION_MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH") or os.path.join(tempfile.gettempdir(), "bilingual-ai", "translation_memory.sqlite3")
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "50000"))
+TRANSLATION_MEMORY_FUZZY_THRESHOLD = float(os.getenv("TRANSLATION_MEMORY_FUZZY_THRESHOLD", "0"))
+
+# Streaming Pipeline Configuration
+STREAMING_PIPELINE_ENABLED = os.getenv("STREAMING_PIPELINE_ENABLED", "FALSE").upper() == "TRUE"
+STREAMING_TTS_WORKERS = int(os.getenv("STREAMING_TTS_WORKERS", "3"))
+STREAMING_MIN_SENTENCE_CHARS = int(os.getenv("STREAMING_MIN_SENTENCE_CHARS", "20"))
+
+# Async Pipeline Configuration
+ASYNC_PIPELINE_ENABLED = os.getenv("ASYNC_PIPELINE_ENABLED", "FALSE").upper() == "TRUE"
+
+# Speculative prefetch: after a translation, synthesize the other voice gender
+# and the back-translation in the background so toggling them is instant
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "FALSE").upper() == "TRUE"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "8"))
+
+# Groq Rate Limiting: "model=requests_per_minute:tokens_per_minute,..." (0 = unlimited)
+def _parse_rate_limits(value):
+    limits = {}
+    for item in value.split(","):
+        model, _, rates = item.partition("=")
+        if model.strip() and rates:
+            requests_per_minute, _, tokens_per_minute = rates.partition(":")
+            limits[model.strip()] = (int(requests_per_minute or 0), int(tokens_per_minute or 0))
+    return limits
+
+GROQ_RATE_LIMIT_ENABLED = os.getenv("GROQ_RATE_LIMIT_ENABLED", "TRUE").upper() == "TRUE"
+GROQ_RATE_LIMITS = _parse_rate_limits(
+    os.getenv("GROQ_RATE_LIMITS", "whisper-large-v3=20:0,llama-3.3-70b-versatile=30:12000,llama-3.1-8b-instant=30:6000")
+)
+GROQ_RATE_LIMIT_MAX_WAIT = float(os.getenv("GROQ_RATE_LIMIT_MAX_WAIT", "60"))
+
+# Metrics Configuration (Prometheus text format at http://METRICS_HOST:METRICS_PORT/metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "FALSE").upper() == "TRUE"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1024"))
+
+# Batch Translation Configuration (batch_translate.py)
+BATCH_TRANSLATE_SIZE = int(os.getenv("BATCH_TRANSLATE_SIZE", "25"))
+BATCH_TRANSLATE_MAX_CHARS = int(os.getenv("BATCH_TRANSLATE_MAX_CHARS", "6000"))
+BATCH_TRANSLATE_WORKERS = int(os.getenv("BATCH_TRANSLATE_WORKERS", "4"))
+BATCH_TRANSLATE_MAX_RETRIES = int(os.getenv("BATCH_TRANSLATE_MAX_RETRIES", "5"))
+
+# Batch Transcription Configuration (batch_transcribe.py)
+BATCH_TRANSCRIBE_WORKERS = int(os.getenv("BATCH_TRANSCRIBE_WORKERS", "4"))
+BATCH_TRANSCRIBE_EXTENSIONS = tuple(
+    ext.strip().lower() for ext in os.getenv("BATCH_TRANSCRIBE_EXTENSIONS", ".wav,.mp3,.m4a,.flac,.ogg,.webm,.mp4").split(",")
+)
+
 # Setup logging
 def setup_logging():
     """Setup minimal logging for essential info only"""
@@ -0,0 +1,151 @@
+"""
+Long-audio mode for transcription and audio translation.
+A long recording is cut at VAD-detected pauses into overlapping windows, the
+windows are sent to Whisper concurrently through a bounded worker pool, and
+the texts are stitched back together with the overlapped words removed, so
+wall-clock time tracks the slowest chunk instead of the whole recording.
+"""
+import io
+import re
+import wave
+import contextvars
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    LOGGERS,
+    VAD_FRAME_MS,
+    LONG_AUDIO_MIN_SECONDS,
+    LONG_AUDIO_CHUNK_SECONDS,
+    LONG_AUDIO_OVERLAP_SECONDS,
+    LONG_AUDIO_MAX_WORKERS,
+)
+from vad import analyze_frames
+
+transcription_logger = LOGGERS['transcription']
+audio_logger = LOGGERS['audio']
+
+# Words compared when looking for text repeated across a chunk boundary
+STITCH_WINDOW_WORDS = 25
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _best_cut(speech, frames_rms, low, high):
+    """Frame index to cut at: middle of the longest pause in [low, high], else the quietest frame"""
+    best_start, best_length = None, 0
+    run_start = None
+    for index in range(low, high + 1):
+        if index < len(speech) and not speech[index]:
+            if run_start is None:
+                run_start = index
+            # >= prefers the latest of equally long pauses, keeping chunks near full length
+            if index - run_start + 1 >= best_length:
+                best_start, best_length = run_start, index - run_start + 1
+        else:
+            run_start = None
+
+    if best_start is not None:
+        return best_start + best_length // 2
+    return min(range(low, high + 1), key=lambda index: frames_rms[index])
+
+
+def split_at_pauses(wav_bytes, chunk_seconds=LONG_AUDIO_CHUNK_SECONDS,
+                    overlap_seconds=LONG_AUDIO_OVERLAP_SECONDS, frame_ms=VAD_FRAME_MS):
+    """Cut a WAV recording into overlapping windows that end at pauses
+
+    Returns a list of (start_seconds, wav_bytes), or None if the input is not
+    a PCM WAV file.
+    """
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as reader:
+            params = reader.getparams()
+            pcm = reader.readframes(params.nframes)
+    except (wave.Error, EOFError) as e:
+        audio_logger.debug(f"Long-audio split skipped, not a PCM WAV file: {e}")
+        return None
+
+    samples_per_frame = max(1, params.framerate * frame_ms // 1000)
+    chunk_bytes = samples_per_frame * params.sampwidth * params.nchannels
+    frames_rms, speech = analyze_frames(pcm, params.sampwidth, params.nchannels, samples_per_frame)
+    total = len(frames_rms)
+
+    frames_per_chunk = max(1, int(chunk_seconds * 1000 / frame_ms))
+    overlap_frames = int(overlap_seconds * 1000 / frame_ms)
+    # Look for a pause in the last quarter of each window
+    search_frames = frames_per_chunk // 4
+
+    cuts = [0]
+    while total - cuts[-1] > frames_per_chunk:
+        target = cuts[-1] + frames_per_chunk
+        cuts.append(_best_cut(speech, frames_rms, max(cuts[-1] + 1, target - search_frames), target))
+    cuts.append(total)
+
+    chunks = []
+    for index in range(len(cuts) - 1):
+        # Each window reaches back over the previous cut so words split by it survive
+        start = max(0, cuts[index] - overlap_frames) if index else 0
+        end = cuts[index + 1]
+        output = io.BytesIO()
+        with wave.open(output, "wb") as writer:
+            writer.setnchannels(params.nchannels)
+            writer.setsampwidth(params.sampwidth)
+            writer.setframerate(params.framerate)
+            writer.writeframes(pcm[start * chunk_bytes:end * chunk_bytes])
+        chunks.append((start * samples_per_frame / params.framerate, output.getvalue()))
+    return chunks
+
+
+def long_audio_chunks(audio_bytes, min_seconds=LONG_AUDIO_MIN_SECONDS):
+    """Chunks for a recording long enough to be worth splitting, else None"""
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            duration = reader.getnframes() / reader.getframerate()
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+    if duration <= min_seconds:
+        return None
+
+    chunks = split_at_pauses(audio_bytes)
+    if not chunks or len(chunks) < 2:
+        return None
+    transcription_logger.info(f"Long-audio mode: {duration:.1f}s recording split into {len(chunks)} chunks")
+    return chunks
+
+
+def _words(text):
+    return [match.group(0).casefold() for match in WORD.finditer(text)]
+
+
+def stitch_transcripts(texts, window_words=STITCH_WINDOW_WORDS):
+    """Join per-chunk texts, dropping words repeated across each overlap"""
+    stitched = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if not stitched:
+            stitched = text
+            continue
+
+        tail = _words(stitched)[-window_words:]
+        head_matches = list(WORD.finditer(text))[:window_words]
+        head = [match.group(0).casefold() for match in head_matches]
+        match = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(0, len(tail), 0, len(head))
+
+        # Only a run that ends the previous chunk and starts this one is overlap;
+        # a single repeated word is as likely to be real speech
+        if match.size >= 2 and match.a + match.size >= len(tail) - 1 and match.b <= 1:
+            drop_until = head_matches[match.b + match.size - 1].end()
+            text = text[drop_until:].lstrip(" ,.;:!?…")
+            if not text:
+                continue
+        stitched = f"{stitched} {text}"
+    return stitched
+
+
+def transcribe_chunks(chunks, request, max_workers=LONG_AUDIO_MAX_WORKERS):
+    """Run request(wav_bytes) -> text over the chunks concurrently and stitch the results"""
+    # Workers run in the caller's context so e.g. the rate limiter still sees its session
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="long-audio") as executor:
+        texts = list(executor.map(lambda chunk: context.copy().run(request, chunk[1]), chunks))
+    return stitch_transcripts(texts)
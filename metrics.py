@@ -0,0 +1,194 @@
+"""
+Per-stage latency metrics and a Prometheus text endpoint.
+Code wraps each stage of a turn (preprocess, STT, MT, TTS, player render) in
+span(), and the whole turn from record-received to player render is recorded
+as end_to_end. Durations go into cumulative histograms and a window of recent
+samples for p50/p95/p99, served at /metrics by MetricsServer.
+"""
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import LOGGERS, METRICS_HOST, METRICS_PORT, METRICS_WINDOW
+
+api_logger = LOGGERS['api']
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def quantile(ordered, q):
+    """Nearest-rank quantile of a non-empty sorted list"""
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _StageStats:
+    def __init__(self, window):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+
+class MetricsRegistry:
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        # (stage, sorted label items) -> _StageStats
+        self._stages = {}
+        # name -> (help, callback returning {label tuple: value})
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        with self._lock:
+            stats = self._stages.get(key)
+            if stats is None:
+                stats = self._stages[key] = _StageStats(self.window)
+            stats.observe(seconds)
+            if error:
+                stats.errors += 1
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block as one sample of stage; exceptions are counted as errors and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True, **labels)
+            raise
+        self.observe(stage, time.perf_counter() - start, **labels)
+
+    def register_gauge(self, name, help_text, callback):
+        """Export callback() -> {((label, value), ...): number} as a gauge on every scrape"""
+        self._gauges[name] = (help_text, callback)
+
+    def summary(self):
+        """{stage: {count, p50, p95, p99, mean, errors}} over the recent window, for logs and tests"""
+        summary = {}
+        with self._lock:
+            for (stage, labels), stats in self._stages.items():
+                ordered = sorted(stats.recent)
+                name = stage + _format_labels(labels)
+                summary[name] = {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "mean": stats.total / stats.count if stats.count else 0.0,
+                    **{f"p{int(q * 100)}": quantile(ordered, q) if ordered else 0.0 for q in QUANTILES},
+                }
+        return summary
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = [
+            "# HELP bilingual_stage_duration_seconds Time spent in each pipeline stage",
+            "# TYPE bilingual_stage_duration_seconds histogram",
+        ]
+        quantile_lines = [
+            "# HELP bilingual_stage_duration_recent_seconds Stage latency quantiles over the most recent samples",
+            "# TYPE bilingual_stage_duration_recent_seconds summary",
+        ]
+        error_lines = [
+            "# HELP bilingual_stage_errors_total Stage executions that raised",
+            "# TYPE bilingual_stage_errors_total counter",
+        ]
+
+        with self._lock:
+            for (stage, labels), stats in sorted(self._stages.items()):
+                base = (("stage", stage),) + labels
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f"bilingual_stage_duration_seconds_bucket{_format_labels(base + (('le', bound),))} {cumulative}")
+                lines.append(f"bilingual_stage_duration_seconds_bucket{_format_labels(base + (('le', '+Inf'),))} {stats.count}")
+                lines.append(f"bilingual_stage_duration_seconds_sum{_format_labels(base)} {stats.total:.6f}")
+                lines.append(f"bilingual_stage_duration_seconds_count{_format_labels(base)} {stats.count}")
+
+                ordered = sorted(stats.recent)
+                for q in QUANTILES:
+                    value = quantile(ordered, q) if ordered else float("nan")
+                    quantile_lines.append(
+                        f"bilingual_stage_duration_recent_seconds{_format_labels(base + (('quantile', q),))} {value:.6f}"
+                    )
+                quantile_lines.append(f"bilingual_stage_duration_recent_seconds_sum{_format_labels(base)} {sum(ordered):.6f}")
+                quantile_lines.append(f"bilingual_stage_duration_recent_seconds_count{_format_labels(base)} {len(ordered)}")
+                error_lines.append(f"bilingual_stage_errors_total{_format_labels(base)} {stats.errors}")
+
+        lines += quantile_lines + error_lines
+        for name, (help_text, callback) in sorted(self._gauges.items()):
+            try:
+                values = callback()
+            except Exception as e:
+                api_logger.warning(f"Metrics gauge {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in values.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every module and session
+METRICS = MetricsRegistry()
+span = METRICS.span
+
+
+class MetricsServer:
+    """Serves METRICS at /metrics for Prometheus to scrape"""
+
+    def __init__(self, registry=METRICS, host=METRICS_HOST, port=METRICS_PORT):
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        api_logger.info(f"Metrics endpoint listening on http://{host}:{self.httpd.server_port}/metrics")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                api_logger.debug(f"Metrics server: {format % args}")
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
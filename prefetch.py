@@ -0,0 +1,140 @@
+"""
+Speculative background work after a translation lands.
+Users often flip the voice gender or ask for the back-translation right after
+a turn; both cost a blocking API call on the next rerun. The prefetcher runs
+that work ahead of time on a small shared pool: the alternate voice lands in
+the TTS cache, and the back-translation is kept here until the UI asks for it.
+Scheduling a new key for a session (the text changed) cancels whatever was
+still queued for the old one, and stale results are dropped.
+"""
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import LOGGERS, PREFETCH_WORKERS, PREFETCH_MAX_PENDING
+from metrics import METRICS
+
+tts_logger = LOGGERS['tts']
+
+# Sessions whose prefetch state is kept; older ones are forgotten first
+MAX_SESSIONS = 256
+
+
+class _SessionPrefetch:
+    def __init__(self, key):
+        self.key = key
+        self.futures = []
+        # task name -> value returned by the task
+        self.results = {}
+
+
+class Prefetcher:
+    def __init__(self, max_workers=PREFETCH_WORKERS, max_pending=PREFETCH_MAX_PENDING):
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.dropped = 0
+        self.used = 0
+
+        # session -> _SessionPrefetch for the latest key, least recently scheduled first
+        self._sessions = OrderedDict()
+        self._pending = 0
+        # Reentrant: cancel() and add_done_callback() can run _task_done while schedule() holds it
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        tts_logger.info(f"Prefetcher ready ({max_workers} workers, max {max_pending} pending)")
+
+    def schedule(self, session_id, key, tasks):
+        """Run tasks [(name, fn), ...] speculatively for key
+
+        Rescheduling the same key is a no-op, so this is safe to call on every
+        rerun. A different key supersedes the session's previous one: its queued
+        tasks are cancelled and running ones have their results discarded.
+        Returns True if tasks were queued.
+        """
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous and previous.key == key:
+                return False
+            if previous:
+                for future in previous.futures:
+                    if future.cancel():
+                        self.cancelled += 1
+
+            state = _SessionPrefetch(key)
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+
+            for name, fn in tasks:
+                if self._pending >= self.max_pending:
+                    # Speculative work is optional; never let it queue up behind real traffic
+                    self.dropped += 1
+                    continue
+                self._pending += 1
+                self.submitted += 1
+                # Run in the caller's context so the rate limiter still sees the session
+                context = contextvars.copy_context()
+                future = self._executor.submit(context.run, self._run, session_id, state, name, fn)
+                future.add_done_callback(self._task_done)
+                state.futures.append(future)
+        return True
+
+    def _task_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _is_current(self, session_id, state):
+        with self._lock:
+            return self._sessions.get(session_id) is state
+
+    def _run(self, session_id, state, name, fn):
+        if not self._is_current(session_id, state):
+            with self._lock:
+                self.stale += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            METRICS.observe("prefetch", time.perf_counter() - start, error=True, task=name)
+            tts_logger.warning(f"Prefetch {name} failed: {e}")
+            return
+        METRICS.observe("prefetch", time.perf_counter() - start, task=name)
+
+        with self._lock:
+            self.completed += 1
+            if self._sessions.get(session_id) is state:
+                state.results[name] = value
+            else:
+                self.stale += 1
+        tts_logger.debug(f"Prefetch {name} finished in {time.perf_counter() - start:.2f}s")
+
+    def result(self, session_id, name, key):
+        """The finished result of task name if it was prefetched for key, else None"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if not state or state.key != key:
+                return None
+            value = state.results.get(name)
+            if value is not None:
+                self.used += 1
+            return value
+
+    def stats(self):
+        """Snapshot of prefetch counters"""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "stale": self.stale,
+                "dropped": self.dropped,
+                "used": self.used,
+            }
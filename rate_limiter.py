@@ -0,0 +1,199 @@
+"""
+Client-side rate limiting for Groq calls.
+Every Streamlit session shares one Transcriber, so without coordination a burst
+of users turns straight into 429s. Requests wait here instead: each model has
+a requests/minute and a tokens/minute token bucket, and waiting requests are
+granted round-robin across sessions so one busy session cannot starve the rest.
+"""
+import time
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from config import LOGGERS, GROQ_RATE_LIMITS, GROQ_RATE_LIMIT_MAX_WAIT
+
+api_logger = LOGGERS['api']
+
+# Which UI session a request belongs to; app.py sets it at the start of each script run
+current_session = contextvars.ContextVar("rate_limit_session", default="default")
+
+
+class RateLimitTimeout(Exception):
+    """A request waited longer than the limiter's max_wait for capacity"""
+
+
+def estimate_chat_tokens(messages, max_tokens):
+    """Rough token count for a chat completion: ~4 chars/token in, about as much out"""
+    prompt_tokens = sum(len(message["content"]) for message in messages) // 4 + 1
+    user_tokens = sum(len(message["content"]) for message in messages if message["role"] == "user") // 4 + 1
+    return prompt_tokens + min(max_tokens, user_tokens)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of budget"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount is available; oversized requests wait for a full bucket"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta):
+        """Charge (or refund) the difference between estimated and actual usage"""
+        self.level = min(self.capacity, self.level - delta)
+
+
+class _ModelLimiter:
+    def __init__(self, model, requests_per_minute, tokens_per_minute):
+        self.model = model
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.condition = threading.Condition()
+        # session -> deque of waiting tickets; the front session's first ticket goes next
+        self.queues = OrderedDict()
+        self.granted = 0
+        self.delayed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def wait_time(self, tokens, now):
+        delay = self.requests.wait_time(1, now) if self.requests else 0.0
+        if self.tokens:
+            delay = max(delay, self.tokens.wait_time(tokens, now))
+        return delay
+
+    def take(self, tokens, now):
+        if self.requests:
+            self.requests.take(1, now)
+        if self.tokens and tokens:
+            self.tokens.take(tokens, now)
+
+    def remove(self, session, ticket, served):
+        queue = self.queues[session]
+        queue.remove(ticket)
+        if not queue:
+            del self.queues[session]
+        elif served:
+            # Round-robin: a session that was just served goes to the back; one that timed out keeps its turn
+            self.queues.move_to_end(session)
+        self.condition.notify_all()
+
+
+class RateLimiter:
+    def __init__(self, limits=GROQ_RATE_LIMITS, max_wait=GROQ_RATE_LIMIT_MAX_WAIT):
+        """limits maps model -> (requests_per_minute, tokens_per_minute); 0 means unlimited"""
+        self.max_wait = max_wait
+        self._models = {
+            model: _ModelLimiter(model, requests_per_minute, tokens_per_minute)
+            for model, (requests_per_minute, tokens_per_minute) in limits.items()
+        }
+        api_logger.info(f"Groq rate limiter ready: {limits} (max_wait={max_wait}s)")
+
+    def acquire(self, model, tokens=0, session=None):
+        """Block until model has capacity for one request of ~tokens; returns seconds waited"""
+        limiter = self._models.get(model)
+        if not limiter:
+            return 0.0
+
+        session = session or current_session.get()
+        ticket = object()
+        start = time.monotonic()
+        deadline = start + self.max_wait
+
+        served = False
+        with limiter.condition:
+            limiter.queues.setdefault(session, deque()).append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    head_session = next(iter(limiter.queues))
+                    delay = None
+                    if limiter.queues[head_session][0] is ticket:
+                        delay = limiter.wait_time(tokens, now)
+                        if delay <= 0:
+                            limiter.take(tokens, now)
+                            served = True
+                            break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        limiter.timeouts += 1
+                        raise RateLimitTimeout(
+                            f"Waited {self.max_wait:g}s for {model} rate limit capacity "
+                            f"({self._queue_depth(limiter)} requests queued)"
+                        )
+                    limiter.condition.wait(remaining if delay is None else min(delay, remaining))
+            finally:
+                limiter.remove(session, ticket, served)
+
+            waited = time.monotonic() - start
+            limiter.granted += 1
+            limiter.total_wait += waited
+            limiter.max_wait = max(limiter.max_wait, waited)
+            if waited > 0.05:
+                limiter.delayed += 1
+                api_logger.info(
+                    f"Rate limiter held {model} request {waited:.2f}s "
+                    f"(session={session}, queue_depth={self._queue_depth(limiter)})"
+                )
+        return waited
+
+    def try_acquire(self, model, tokens=0):
+        """Take capacity for one request only if it is free right now and nobody is queued; returns True if taken"""
+        limiter = self._models.get(model)
+        if not limiter:
+            return True
+        with limiter.condition:
+            now = time.monotonic()
+            if limiter.queues or limiter.wait_time(tokens, now) > 0:
+                return False
+            limiter.take(tokens, now)
+            limiter.granted += 1
+        return True
+
+    def record_usage(self, model, estimated_tokens, actual_tokens):
+        """Correct the tokens bucket once the real usage of a request is known"""
+        limiter = self._models.get(model)
+        if not limiter or not limiter.tokens or actual_tokens is None:
+            return
+        with limiter.condition:
+            limiter.tokens.adjust(actual_tokens - estimated_tokens)
+            limiter.condition.notify_all()
+
+    @staticmethod
+    def _queue_depth(limiter):
+        return sum(len(queue) for queue in limiter.queues.values())
+
+    def stats(self):
+        """Per-model queue depth, waiting sessions, wait times and remaining budget"""
+        stats = {}
+        for model, limiter in self._models.items():
+            with limiter.condition:
+                # Refill so the reported budget is current
+                limiter.wait_time(0, time.monotonic())
+                stats[model] = {
+                    "queue_depth": self._queue_depth(limiter),
+                    "sessions_waiting": len(limiter.queues),
+                    "granted": limiter.granted,
+                    "delayed": limiter.delayed,
+                    "timeouts": limiter.timeouts,
+                    "avg_wait": limiter.total_wait / limiter.granted if limiter.granted else 0.0,
+                    "max_wait": limiter.max_wait,
+                    "requests_available": round(limiter.requests.level, 2) if limiter.requests else None,
+                    "tokens_available": round(limiter.tokens.level) if limiter.tokens else None,
+                }
+        return stats
@@ -0,0 +1,188 @@
+"""
+Speech translation strategies: how a recording becomes text in the other language.
+
+sequential  Whisper transcription, then one Llama translation of the transcript.
+direct      One Whisper translation call, with the source transcript
+            requested concurrently on the same upload. Whisper only
+            translates into English, so this exists for es-en only.
+pipelined   The recording is cut at pauses into short segments. Every segment
+            is transcribed concurrently and its Llama translation starts as
+            soon as its own transcript arrives, so translation overlaps the
+            rest of the transcription instead of waiting for all of it.
+
+Every run is timed per (direction, strategy). "auto" tries each strategy
+until it has enough samples, then picks the one with the lowest recent median.
+"""
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    LOGGERS,
+    LONG_AUDIO_MAX_WORKERS,
+    SPEECH_TRANSLATION_STRATEGIES,
+    SPEECH_TRANSLATION_SEGMENT_SECONDS,
+    SPEECH_TRANSLATION_AUTO_MIN_SAMPLES,
+    SPEECH_TRANSLATION_SOURCE_TRANSCRIPT,
+)
+from audio_encoding import read_audio, is_audio_path
+from long_audio import split_at_pauses
+from metrics import METRICS
+
+transcription_logger = LOGGERS['transcription']
+
+SOURCE_LANGUAGE = {"en-es": "en", "es-en": "es"}
+# Strategies each direction supports, in the order "auto" tries them
+STRATEGIES = {
+    "en-es": ("sequential", "pipelined"),
+    "es-en": ("direct", "sequential", "pipelined"),
+}
+# Recent runs per (direction, strategy) used by "auto"
+LATENCY_WINDOW = 50
+
+
+def _is_error(text):
+    return str(text or "").startswith("Error")
+
+
+class SpeechTranslator:
+    def __init__(self, transcriber, strategies=SPEECH_TRANSLATION_STRATEGIES,
+                 segment_seconds=SPEECH_TRANSLATION_SEGMENT_SECONDS,
+                 min_samples=SPEECH_TRANSLATION_AUTO_MIN_SAMPLES, max_workers=LONG_AUDIO_MAX_WORKERS,
+                 source_transcript=SPEECH_TRANSLATION_SOURCE_TRANSCRIPT):
+        """strategies maps direction -> strategy name or "auto" """
+        self.transcriber = transcriber
+        self.strategies = dict(strategies)
+        self.segment_seconds = segment_seconds
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.source_transcript = source_transcript
+        # (direction, strategy) -> recent successful latencies in seconds
+        self._latencies = {}
+        # direction -> pipelined runs that fell back to sequential (too short to split)
+        self._fallbacks = {}
+        self._lock = threading.Lock()
+
+        for direction, strategy in self.strategies.items():
+            if strategy != "auto" and strategy not in STRATEGIES.get(direction, ()):
+                raise ValueError(f"Unknown {direction} speech translation strategy: {strategy}")
+
+    def choose(self, direction):
+        """Strategy to use for direction: the configured one, or the fastest so far for "auto" """
+        configured = self.strategies.get(direction, STRATEGIES[direction][0])
+        if configured != "auto":
+            return configured
+
+        with self._lock:
+            samples = {name: list(self._latencies.get((direction, name), ())) for name in STRATEGIES[direction]}
+            # Fallbacks count as tries, or short recordings would keep "auto" on pipelined forever
+            tries = {name: len(samples[name]) for name in STRATEGIES[direction]}
+            tries["pipelined"] += self._fallbacks.get(direction, 0)
+        untried = [name for name in STRATEGIES[direction] if tries[name] < self.min_samples]
+        if untried:
+            return min(untried, key=lambda name: tries[name])
+        return min((name for name in STRATEGIES[direction] if samples[name]), key=lambda name: median(samples[name]))
+
+    def translate(self, audio, direction, strategy=None):
+        """(source_text, translation) for a recording; either may be an "Error..." string
+
+        source_text is "" for the direct strategy when source_transcript is off.
+        """
+        strategy = strategy or self.choose(direction)
+        if is_audio_path(audio) and not os.path.exists(audio):
+            # e.g. a spilled recording the workspace has already collected
+            transcription_logger.error(f"Audio file not found: {audio}")
+            return "Error: Audio file not found.", ""
+
+        start = time.perf_counter()
+        try:
+            segments = None
+            if strategy == "pipelined":
+                _, audio = read_audio(audio)
+                # No overlap: each segment is translated on its own, so repeated words could not be stitched away
+                segments = split_at_pauses(audio, chunk_seconds=self.segment_seconds, overlap_seconds=0)
+                if not segments or len(segments) < 2:
+                    # Too short (or not WAV) to split; nothing to overlap, so it runs and is timed as sequential
+                    strategy = "sequential"
+                    with self._lock:
+                        self._fallbacks[direction] = self._fallbacks.get(direction, 0) + 1
+            transcription_logger.info(f"Speech translation {direction} using {strategy} strategy")
+
+            if strategy == "pipelined":
+                source_text, translation = self._pipelined(segments, direction)
+            else:
+                run = {"sequential": self._sequential, "direct": self._direct}[strategy]
+                source_text, translation = run(audio, direction)
+        except Exception as e:
+            transcription_logger.error(f"Speech translation {direction}/{strategy} failed: {e}")
+            source_text, translation = f"Error during speech translation: {str(e)}", ""
+        elapsed = time.perf_counter() - start
+
+        failed = _is_error(source_text) or _is_error(translation)
+        METRICS.observe("speech_translation", elapsed, error=failed, direction=direction, strategy=strategy)
+        if not failed:
+            with self._lock:
+                self._latencies.setdefault((direction, strategy), deque(maxlen=LATENCY_WINDOW)).append(elapsed)
+        transcription_logger.info(f"Speech translation {direction}/{strategy} finished in {elapsed:.2f}s")
+        return source_text, translation
+
+    def _sequential(self, audio, direction):
+        source_text = self.transcriber.transcribe_audio(audio, language=SOURCE_LANGUAGE[direction])
+        if _is_error(source_text) or not source_text.strip():
+            return source_text, ""
+        return source_text, self.transcriber.translate_text(direction, source_text)
+
+    def _direct(self, audio, direction):
+        if not self.source_transcript:
+            return "", self.transcriber.translate_audio(audio)
+        source_text, translation = self.transcriber.transcribe_and_translate_audio(
+            audio, language=SOURCE_LANGUAGE[direction]
+        )
+        if _is_error(source_text) and not _is_error(translation):
+            # The transcript is a bonus; a failed one must not cost the translation
+            transcription_logger.warning(f"Source transcript unavailable: {source_text}")
+            return "", translation
+        return source_text, translation
+
+    def _pipelined(self, segments, direction):
+        transcription_logger.info(f"Pipelined speech translation: {len(segments)} segments")
+
+        def transcribe_then_translate(wav_bytes):
+            source_text = self.transcriber.transcribe_audio(wav_bytes, language=SOURCE_LANGUAGE[direction])
+            if _is_error(source_text) or not source_text.strip():
+                return source_text, ""
+            return source_text, self.transcriber.translate_text(direction, source_text)
+
+        # Workers run in the caller's context so the rate limiter still sees its session
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="speech-pipeline") as executor:
+            results = list(executor.map(
+                lambda segment: context.copy().run(transcribe_then_translate, segment[1]), segments
+            ))
+
+        for source_text, translation in results:
+            if _is_error(source_text):
+                return source_text, ""
+            if _is_error(translation):
+                return " ".join(text.strip() for text, _ in results if text.strip()), translation
+        return (
+            " ".join(text.strip() for text, _ in results if text.strip()),
+            " ".join(str(translation).strip() for _, translation in results if str(translation).strip()),
+        )
+
+    def stats(self):
+        """{direction: {strategy: {runs, median}}} over the recent window"""
+        with self._lock:
+            return {
+                direction: {
+                    name: {
+                        "runs": len(self._latencies.get((direction, name), ())),
+                        "median": median(self._latencies[(direction, name)]) if self._latencies.get((direction, name)) else None,
+                    }
+                    for name in names
+                }
+                for direction, names in STRATEGIES.items()
+            }
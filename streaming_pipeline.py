@@ -0,0 +1,164 @@
+"""
+Streaming English → Spanish pipeline.
+The Llama completion is consumed as a stream, cut at sentence boundaries, and
+each finished sentence goes to TTS right away, so synthesis overlaps the rest
+of the translation instead of waiting for it. The sentence clips can also be
+appended, in order, to one TTS cache stream as they finish, which a player can
+follow through the audio server and start on the first sentence.
+"""
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import LOGGERS, STREAMING_TTS_WORKERS, STREAMING_MIN_SENTENCE_CHARS
+from translation_memory import TranslationResult
+
+transcription_logger = LOGGERS['transcription']
+tts_logger = LOGGERS['tts']
+
+# Sentence terminators, optionally followed by closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?…]+[\"'”»)\]]*\s+|\n+")
+
+# Abbreviations that end in a period but do not end a sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "sra", "srta", "dra", "st", "vs",
+    "etc", "e.g", "i.e", "ud", "uds", "no", "núm", "aprox", "p.ej",
+}
+
+
+class SentenceSplitter:
+    """Incrementally cut streamed text into sentences worth a TTS call"""
+
+    def __init__(self, min_chars=STREAMING_MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta):
+        """Add streamed text and return any sentences completed by it"""
+        self._buffer += delta
+        sentences = []
+        search_from = 0
+
+        while True:
+            match = SENTENCE_END.search(self._buffer, search_from)
+            if not match:
+                break
+
+            candidate = self._buffer[:match.end()].strip()
+            words = candidate.rstrip(".!?…\"'”»)]").split()
+            last_word = words[-1].casefold() if words else ""
+            if last_word in ABBREVIATIONS or len(candidate) < self.min_chars:
+                # Keep going; short fragments are merged with the next sentence
+                search_from = match.end()
+                continue
+
+            sentences.append(candidate)
+            self._buffer = self._buffer[match.end():]
+            search_from = 0
+
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+
+class StreamingPipeline:
+    def __init__(self, transcriber, synthesize, max_workers=STREAMING_TTS_WORKERS):
+        """synthesize(sentence) must return an audio file path or None"""
+        self.transcriber = transcriber
+        self.synthesize = synthesize
+        self.max_workers = max_workers
+
+    def run(self, english_text, track=None, translation=None):
+        """Translate and synthesize sentence by sentence
+
+        Returns (translation, audio_paths); audio_paths is None if any chunk
+        failed so the caller can fall back to a single full-text synthesis.
+        A translation the caller already has (e.g. from translation memory) is
+        synthesized the same way without asking the model again.
+
+        With track (a StreamingEntry this caller created), each chunk is
+        appended to it as soon as it and the chunks before it are ready; the
+        track is finished on success and failed otherwise.
+        """
+        start_time = time.time()
+        first_audio = {}
+        first_audio_lock = threading.Lock()
+        splitter = SentenceSplitter()
+        parts = []
+        futures = []
+        appended = 0
+
+        def append_ready(wait=False):
+            """Copy finished chunks into track in order; False if one failed"""
+            nonlocal appended
+            while appended < len(futures) and (wait or futures[appended].done()):
+                audio_path = futures[appended].result()
+                if not audio_path or audio_path.startswith(("http://", "https://")):
+                    return False
+                try:
+                    with open(audio_path, "rb") as fp:
+                        track.write(fp.read())
+                except OSError as e:
+                    tts_logger.error(f"Streaming pipeline: could not append chunk {appended} to the track: {e}")
+                    return False
+                appended += 1
+            return True
+
+        def synthesize_chunk(sentence):
+            audio_path = self.synthesize(sentence)
+            with first_audio_lock:
+                if audio_path and "time" not in first_audio:
+                    first_audio["time"] = time.time() - start_time
+                    tts_logger.info(f"Streaming pipeline: first audio chunk ready after {first_audio['time']:.2f}s")
+            return audio_path
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="streaming-tts") as executor:
+            try:
+                if translation is not None:
+                    deltas = [translation]
+                else:
+                    deltas = self.transcriber.stream_translate_text_to_spanish(english_text)
+                for delta in deltas:
+                    parts.append(delta)
+                    for sentence in splitter.feed(delta):
+                        tts_logger.debug(f"Streaming pipeline: sentence {len(futures)} ready: '{sentence[:50]}'")
+                        futures.append(executor.submit(synthesize_chunk, sentence))
+                    if track and not append_ready():
+                        track.fail()
+                        track = None
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                if track:
+                    track.fail()
+                return TranslationResult(f"Error during text translation: {str(e)}"), None
+
+            for sentence in splitter.flush():
+                futures.append(executor.submit(synthesize_chunk, sentence))
+
+            if track:
+                if append_ready(wait=True) and appended:
+                    track.finish()
+                else:
+                    track.fail()
+
+            audio_paths = [future.result() for future in futures]
+
+        translation = "".join(parts).strip()
+        from_memory = len(parts) == 1 and getattr(parts[0], "from_memory", False)
+        translation = TranslationResult(translation, from_memory=from_memory)
+
+        total_time = time.time() - start_time
+        transcription_logger.info(
+            f"Streaming pipeline completed in {total_time:.2f}s "
+            f"({len(audio_paths)} chunks, first audio after {first_audio.get('time', total_time):.2f}s)"
+        )
+
+        if not audio_paths or not all(audio_paths):
+            tts_logger.error("Streaming pipeline: one or more TTS chunks failed")
+            return translation, None
+        return translation, audio_paths
@@ -0,0 +1,41 @@
+import http.client
+import threading
+
+import pytest
+
+from audio_server import AudioServer
+from tts_cache import TTSCache
+
+
+@pytest.fixture
+def served(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path))
+    server = AudioServer(cache, host="127.0.0.1", port=0, public_url="http://127.0.0.1")
+    yield cache, server
+    server.close()
+
+
+def _get(server, key):
+    connection = http.client.HTTPConnection("127.0.0.1", server.httpd.server_port, timeout=5)
+    connection.request("GET", f"/tts/{key}.mp3")
+    return connection.getresponse()
+
+
+def test_complete_stream_is_terminated(served):
+    cache, server = served
+    entry, _ = cache.open_stream("a" * 64)
+    entry.write(b"ID3" + bytes(200))
+    threading.Timer(0.1, entry.finish).start()
+
+    assert _get(server, "a" * 64).read() == b"ID3" + bytes(200)
+
+
+def test_failed_stream_is_cut_off(served):
+    cache, server = served
+    entry, _ = cache.open_stream("b" * 64)
+    entry.write(b"ID3" + bytes(200))
+    threading.Timer(0.1, entry.fail).start()
+
+    response = _get(server, "b" * 64)
+    with pytest.raises(http.client.IncompleteRead):
+        response.read()
@@ -0,0 +1,44 @@
+from audio_workspace import AudioWorkspace
+from tts_cache import TTSCache
+
+
+def _workspace(tmp_path, tts_cache):
+    return AudioWorkspace(
+        root=str(tmp_path / "workspace"), max_bytes=10**9, max_age=3600,
+        gc_interval=0, session_grace=0, tts_cache=tts_cache,
+    )
+
+
+def test_dead_sessions_release_tts_pins_without_spilling(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path / "tts"), max_bytes=10000)
+    workspace = _workspace(tmp_path, cache)
+    sessions = {}
+
+    # Only TTS output is held; nothing is written to the workspace (spill off)
+    for number in range(30):
+        session_id = f"session-{number}"
+        sessions[session_id] = True
+        workspace.open_session(session_id, alive=lambda session_id=session_id: sessions[session_id])
+        key = TTSCache.make_key(f"phrase {number}", "voice", "model", None)
+        path = cache.put(key, b"\0" * 1000)
+        workspace.set_slot(session_id, "tts", path)
+        sessions[session_id] = False
+
+    workspace.open_session("fresh", alive=lambda: True)
+
+    assert workspace.stats()["sessions"] == 1
+    assert workspace.removed_sessions == 30
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_live_sessions_keep_their_pins(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path / "tts"), max_bytes=1000)
+    workspace = _workspace(tmp_path, cache)
+    workspace.open_session("live", alive=lambda: True)
+    path = cache.put(TTSCache.make_key("kept", "voice", "model", None), b"\0" * 1000)
+    workspace.set_slot("live", "tts", path)
+
+    cache.put(TTSCache.make_key("other", "voice", "model", None), b"\0" * 1000)
+    workspace.open_session("another", alive=lambda: True)
+
+    assert cache.get(TTSCache.make_key("kept", "voice", "model", None)) is not None
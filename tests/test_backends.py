@@ -0,0 +1,99 @@
+import time
+
+from backends import BackendRouter, BackendCancelled, check_cancelled, current_attempt
+
+
+class FakeEngine:
+    def __init__(self, name, delay=0.0, fail=False, refuse_backups=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.refuse_backups = refuse_backups
+        self.requests = 0
+
+    def transcribe(self, audio):
+        attempt = current_attempt.get()
+        if self.refuse_backups and attempt is not None and attempt.backup:
+            raise BackendCancelled("no rate limit headroom for a hedged request")
+        self.requests += 1
+        time.sleep(self.delay)
+        check_cancelled()
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return self.name
+
+
+def _router(backends, **options):
+    options.setdefault("min_samples", 3)
+    options.setdefault("hedge", False)
+    return BackendRouter("stt", backends, short_size=10, **options)
+
+
+def _measure(router, name, seconds, short=False):
+    for _ in range(router.min_samples):
+        router._record(name, short, seconds)
+
+
+def test_short_inputs_go_to_the_fastest_engine_once_all_are_measured():
+    slow, fast = FakeEngine("slow"), FakeEngine("fast")
+    router = _router([slow, fast])
+    _measure(router, "slow", 0.5, short=True)
+
+    assert [backend.name for backend in router.order(5)] == ["slow", "fast"]
+    _measure(router, "fast", 0.1, short=True)
+    assert [backend.name for backend in router.order(5)] == ["fast", "slow"]
+    # Long inputs keep the configured preference
+    assert [backend.name for backend in router.order(60)] == ["slow", "fast"]
+
+
+def test_failing_engine_falls_back_and_is_probed_by_one_call_after_its_cooldown():
+    broken, spare = FakeEngine("broken", fail=True), FakeEngine("spare")
+    router = _router([broken, spare], cooldown=0.05, max_error_rate=0.5)
+
+    for _ in range(router.min_samples):
+        assert router.call("transcribe", b"audio") == "spare"
+    assert not router.stats()["broken"]["healthy"]
+    assert [backend.name for backend in router.order()] == ["spare", "broken"]
+
+    time.sleep(0.06)
+    assert [backend.name for backend in router.order()] == ["broken", "spare"]
+    assert [backend.name for backend in router.order()] == ["spare", "broken"]
+
+
+def test_slow_primary_is_hedged_and_cancelled_when_the_backup_answers():
+    slow, fast = FakeEngine("slow", delay=0.3), FakeEngine("fast")
+    router = _router([slow, fast], hedge=True, hedge_audit_rate=0.0)
+    _measure(router, "slow", 0.01)
+
+    assert router.call("transcribe", b"audio") == "fast"
+    router._executor.shutdown(wait=True)
+
+    hedging = router.stats()["hedging"]
+    assert (hedging["calls"], hedging["hedged"], hedging["backup_wins"]) == (1, 1, 1)
+    assert hedging["cancelled"] == 1
+
+
+def test_refused_backup_is_not_counted_as_a_hedge():
+    engine = FakeEngine("groq", delay=0.1, refuse_backups=True)
+    router = _router([engine], hedge=True, hedge_audit_rate=1.0)
+    _measure(router, "groq", 0.01)
+
+    assert router.call("transcribe", b"audio") == "groq"
+
+    hedging = router.stats()["hedging"]
+    assert engine.requests == 1
+    assert (hedging["calls"], hedging["hedged"], hedging["refused"]) == (1, 0, 1)
+    assert (hedging["cancelled"], hedging["audited"]) == (0, 0)
+
+
+def test_audited_hedge_lets_the_primary_finish_to_measure_the_saving():
+    slow, fast = FakeEngine("slow", delay=0.2), FakeEngine("fast")
+    router = _router([slow, fast], hedge=True, hedge_audit_rate=1.0)
+    _measure(router, "slow", 0.01)
+
+    assert router.call("transcribe", b"audio") == "fast"
+    router._executor.shutdown(wait=True)
+
+    hedging = router.stats()["hedging"]
+    assert (hedging["backup_wins"], hedging["cancelled"], hedging["audited"]) == (1, 0, 1)
+    assert hedging["saved_mean"] > 0.1
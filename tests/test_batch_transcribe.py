@@ -0,0 +1,66 @@
+from batch_transcribe import BatchCheckpoint, BatchTranscriber, file_sha256
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.uploads = 0
+
+    def transcribe_audio(self, audio, language="en"):
+        self.uploads += 1
+        return "hello"
+
+    def translate_text_to_spanish(self, text):
+        return "hola"
+
+
+def _recording(tmp_path, name, content=b"RIFF same audio"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_owner_finishing_before_the_lock_is_not_uploaded_again(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.sqlite3"))
+    transcriber = FakeTranscriber()
+    batch = BatchTranscriber(transcriber, checkpoint)
+    path = _recording(tmp_path, "b.wav")
+    sha256 = file_sha256(path)
+    result_for = checkpoint.result_for
+
+    def owner_finishes_meanwhile(digest, direction):
+        # The first read misses, then the identical file's owner stores its result and leaves
+        result = result_for(digest, direction)
+        checkpoint.result_for = result_for
+        checkpoint.store_result(sha256, direction, {"transcript": "hello", "translation": "hola"})
+        return result
+    checkpoint.result_for = owner_finishes_meanwhile
+
+    record = batch.process_file(path)
+
+    assert transcriber.uploads == 0
+    assert record["duplicate"] and record["status"] == "ok"
+
+
+def test_identical_recordings_are_uploaded_once(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.sqlite3"))
+    transcriber = FakeTranscriber()
+    paths = [_recording(tmp_path, "a.wav"), _recording(tmp_path, "b.wav"), _recording(tmp_path, "c.wav", b"other")]
+
+    stats = BatchTranscriber(transcriber, checkpoint, max_workers=3).run(paths, str(tmp_path / "out.jsonl"))
+
+    assert transcriber.uploads == 2
+    assert stats["ok"] == 3 and stats["duplicates"] == 1
+
+
+def test_rerun_skips_checkpointed_files_and_retries_failures(tmp_path):
+    checkpoint = BatchCheckpoint(str(tmp_path / "checkpoint.sqlite3"))
+    transcriber = FakeTranscriber()
+    paths = [_recording(tmp_path, "a.wav"), str(tmp_path / "missing.wav")]
+    output = str(tmp_path / "out.jsonl")
+
+    first = BatchTranscriber(transcriber, checkpoint).run(paths, output)
+    second = BatchTranscriber(transcriber, checkpoint).run(paths, output)
+
+    assert (first["ok"], first["failed"]) == (1, 1)
+    assert (second["skipped"], second["failed"]) == (1, 1)
+    assert transcriber.uploads == 1
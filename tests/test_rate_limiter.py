@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import deque
+
+import pytest
+
+from rate_limiter import RateLimiter, RateLimitTimeout, _ModelLimiter
+
+
+def _drained_limiter(requests_per_minute, max_wait=5.0):
+    limiter = RateLimiter({"model": (requests_per_minute, 0)}, max_wait=max_wait)
+    limiter._models["model"].requests.level = 0
+    return limiter
+
+
+def test_waiting_requests_are_granted_round_robin_across_sessions():
+    limiter = _drained_limiter(1200)
+    model = limiter._models["model"]
+    granted = []
+
+    def request(session):
+        limiter.acquire("model", session=session)
+        granted.append(session)
+
+    threads = []
+    for session in ["busy", "busy", "busy", "quiet"]:
+        thread = threading.Thread(target=request, args=(session,))
+        thread.start()
+        threads.append(thread)
+        while sum(len(queue) for queue in model.queues.values()) < len(threads) - len(granted):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert granted[:2] == ["busy", "quiet"]
+    assert sorted(granted) == ["busy", "busy", "busy", "quiet"]
+
+
+def test_request_times_out_and_leaves_the_queue():
+    limiter = _drained_limiter(1, max_wait=0.05)
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("model", session="late")
+
+    stats = limiter.stats()["model"]
+    assert (stats["timeouts"], stats["queue_depth"], stats["granted"]) == (1, 0, 0)
+
+
+def test_timed_out_session_keeps_its_turn():
+    limiter = _ModelLimiter("model", 60, 0)
+    first, second, other = object(), object(), object()
+    limiter.queues["busy"] = deque([first, second])
+    limiter.queues["quiet"] = deque([other])
+
+    with limiter.condition:
+        limiter.remove("busy", first, served=False)
+    assert list(limiter.queues) == ["busy", "quiet"]
+
+    with limiter.condition:
+        limiter.remove("busy", second, served=True)
+    assert list(limiter.queues) == ["quiet"]
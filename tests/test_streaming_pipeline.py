@@ -0,0 +1,57 @@
+from streaming_pipeline import StreamingPipeline
+from tts_cache import TTSCache
+
+
+class FakeTranscriber:
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    def stream_translate_text_to_spanish(self, english_text):
+        yield from self.deltas
+
+
+def _synthesizer(cache, fail_on=None):
+    def synthesize(sentence):
+        if sentence == fail_on:
+            return None
+        return cache.put(TTSCache.make_key(sentence, "voice", "model", None), sentence.encode())
+    return synthesize
+
+
+def test_track_gets_every_chunk_in_order(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path))
+    deltas = ["Hola a todos mis amigos. ", "¿Cómo están ustedes hoy? ", "Muy bien, gracias."]
+    track, _ = cache.open_stream("track")
+
+    translation, paths = StreamingPipeline(FakeTranscriber(deltas), _synthesizer(cache)).run("hi", track=track)
+
+    assert str(translation) == "".join(deltas).strip()
+    assert len(paths) == 3
+    assert track.done
+    with open(track.path, "rb") as fp:
+        assert fp.read() == "".join(delta.strip() for delta in deltas).encode()
+
+
+def test_track_fails_when_a_chunk_fails(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path))
+    deltas = ["Hola a todos mis amigos. ", "¿Cómo están ustedes hoy?"]
+    track, _ = cache.open_stream("track")
+    synthesize = _synthesizer(cache, fail_on="¿Cómo están ustedes hoy?")
+
+    _, paths = StreamingPipeline(FakeTranscriber(deltas), synthesize).run("hi", track=track)
+
+    assert paths is None
+    assert track.failed
+    assert cache.path_for("track") is None
+
+
+def test_known_translation_is_synthesized_without_the_model(tmp_path):
+    cache = TTSCache(cache_dir=str(tmp_path))
+    remembered = "Hola a todos mis amigos. ¿Cómo están ustedes hoy?"
+
+    translation, paths = StreamingPipeline(FakeTranscriber(["Otra traducción."]), _synthesizer(cache)).run(
+        "hi", translation=remembered
+    )
+
+    assert str(translation) == remembered
+    assert len(paths) == 2
@@ -0,0 +1,53 @@
+import itertools
+
+import translation_memory
+from translation_memory import TranslationMemory
+
+
+class FakeClock:
+    """Strictly increasing time.time(), so recency is never tied"""
+
+    def __init__(self):
+        self._ticks = itertools.count(1)
+
+    def time(self):
+        return float(next(self._ticks))
+
+
+def _memory(tmp_path, monkeypatch, **options):
+    monkeypatch.setattr(translation_memory, "time", FakeClock())
+    return TranslationMemory(db_path=str(tmp_path / "memory.sqlite3"), **options)
+
+
+def test_exact_match_ignores_case_and_spacing(tmp_path, monkeypatch):
+    memory = _memory(tmp_path, monkeypatch, fuzzy_threshold=0)
+    memory.store("en-es", "Thank you for calling.", "Gracias por llamar.")
+
+    result = memory.lookup("en-es", "  thank you   for CALLING. ")
+
+    assert result == "Gracias por llamar."
+    assert result.from_memory and result.match_score == 1.0
+    assert memory.lookup("es-en", "Thank you for calling.") is None
+
+
+def test_fuzzy_match_only_above_the_threshold(tmp_path, monkeypatch):
+    memory = _memory(tmp_path, monkeypatch, fuzzy_threshold=0.9)
+    memory.store("en-es", "Please hold while I transfer your call.", "Espere mientras transfiero su llamada.")
+
+    close = memory.lookup("en-es", "Please hold while I transfer your calls.")
+    assert close == "Espere mientras transfiero su llamada."
+    assert 0.9 <= close.match_score < 1.0
+    assert memory.lookup("en-es", "Please hold while I check your account.") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    memory = _memory(tmp_path, monkeypatch, max_entries=2, fuzzy_threshold=0)
+    memory.store("en-es", "Good morning.", "Buenos días.")
+    memory.store("en-es", "Good night.", "Buenas noches.")
+    assert memory.lookup("en-es", "Good morning.") is not None
+
+    memory.store("en-es", "Goodbye.", "Adiós.")
+
+    assert memory.count() == 2
+    assert memory.lookup("en-es", "Good night.") is None
+    assert memory.lookup("en-es", "Good morning.") == "Buenos días."
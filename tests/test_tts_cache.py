@@ -0,0 +1,19 @@
+import os
+import time
+
+from tts_cache import TTSCache, STALE_TMP_SECONDS
+
+
+def test_startup_keeps_temp_files_another_process_is_still_writing(tmp_path):
+    writing = tmp_path / f"{'a' * 64}.mp3.1.tmp"
+    leftover = tmp_path / f"{'b' * 64}.mp3.2.tmp"
+    writing.write_bytes(b"ID3 partial")
+    leftover.write_bytes(b"ID3 partial")
+    old = time.time() - STALE_TMP_SECONDS - 60
+    os.utime(leftover, (old, old))
+
+    cache = TTSCache(cache_dir=str(tmp_path), max_bytes=1024 * 1024)
+
+    assert writing.exists()
+    assert not leftover.exists()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+import requests
+
+import tts_client
+from tts_client import TTSClient, CircuitBreaker, CircuitOpenError
+from benchmarks.mock_servers import MockBehavior, MockElevenLabsServer
+
+
+@pytest.fixture
+def server():
+    server = MockElevenLabsServer(MockBehavior(latency=0, jitter=0, seed=1))
+    yield server
+    server.close()
+
+
+def _patch_backoff_sleep(monkeypatch, on_sleep):
+    """Replace time.sleep for the test's own thread; the mock server threads keep sleeping for real"""
+    real_sleep = tts_client.time.sleep
+    test_thread = threading.current_thread()
+
+    def sleep(delay):
+        if threading.current_thread() is test_thread:
+            on_sleep(delay)
+        else:
+            real_sleep(delay)
+    monkeypatch.setattr(tts_client.time, "sleep", sleep)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    _patch_backoff_sleep(monkeypatch, delays.append)
+    return delays
+
+
+def _client(server, **options):
+    options.setdefault("breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    return TTSClient(base_url=server.url, max_retries=2, backoff_base=0.5, backoff_max=2, **options)
+
+
+def _synthesis_url(server):
+    return f"{server.url}/v1/text-to-speech/voice"
+
+
+def test_retries_429_after_retry_after(server, sleeps):
+    server.behavior.rate_limit_rate = 1.0
+    client = _client(server)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.post(_synthesis_url(server), json={"text": "hola"})
+
+    assert server.requests == 3
+    # The mock asks for Retry-After: 0, which wins over the exponential backoff
+    assert sleeps == [0.0, 0.0]
+
+
+def test_recovers_after_a_retried_429(server, monkeypatch):
+    server.behavior.rate_limit_rate = 1.0
+    client = _client(server)
+
+    def recover(delay):
+        server.behavior.rate_limit_rate = 0.0
+    _patch_backoff_sleep(monkeypatch, recover)
+
+    response = client.post(_synthesis_url(server), json={"text": "hola"})
+
+    assert response.status_code == 200
+    assert server.requests == 2
+    assert client.breaker.state == "closed"
+
+
+def test_backoff_is_capped(server):
+    client = _client(server)
+
+    assert client._backoff(0, retry_after=120) == client.backoff_max
+    assert all(0 <= client._backoff(attempt) <= client.backoff_max for attempt in range(20))
+
+
+def test_breaker_opens_half_opens_and_closes(server, monkeypatch):
+    server.behavior.error_rate = 1.0
+    client = TTSClient(base_url=server.url, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    url = _synthesis_url(server)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.post(url, json={"text": "hola"})
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.post(url, json={"text": "hola"})
+    assert server.requests == 2
+
+    # Past the cooldown a single trial goes through and closes the breaker
+    monkeypatch.setattr(tts_client.time, "monotonic", lambda: client.breaker.opened_at + 61)
+    server.behavior.error_rate = 0.0
+    assert client.post(url, json={"text": "hola"}).status_code == 200
+    assert client.breaker.state == "closed"
+    assert client.breaker.failures == 0
+
+
+def test_client_error_does_not_close_the_breaker(server):
+    client = TTSClient(base_url=server.url, max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    client.breaker.record_failure()
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.post(f"{server.url}/unknown", json={"text": "hola"})
+
+    assert client.breaker.state == "half-open"
+    assert client.breaker.failures == 1
+    # The trial was released, so the next request is allowed through
+    assert client.post(_synthesis_url(server), json={"text": "hola"}).status_code == 200
+    assert client.breaker.state == "closed"
+
+
+def test_unexpected_error_releases_the_half_open_trial(server, monkeypatch):
+    client = TTSClient(base_url=server.url, max_retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    client.breaker.record_failure()
+    real_post = client.session.post
+
+    def broken_body(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+    monkeypatch.setattr(client.session, "post", broken_body)
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.post(_synthesis_url(server), json={"text": "hola"})
+
+    monkeypatch.setattr(client.session, "post", real_post)
+    assert client.post(_synthesis_url(server), json={"text": "hola"}).status_code == 200
+    assert client.breaker.state == "closed"
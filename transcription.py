@@ -1,54 +1,263 @@
 import os
+import re
 import time
 from groq import Groq
 import json
-from config import GROQ_API_KEY, LOGGERS
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    GROQ_API_KEY,
+    LOGGERS,
+    TRANSLATION_MEMORY_ENABLED,
+    AUDIO_NORMALIZE_ENABLED,
+    LONG_AUDIO_ENABLED,
+    LONG_AUDIO_MAX_WORKERS,
+    GROQ_RATE_LIMIT_ENABLED,
+    STT_BACKENDS,
+    MT_BACKENDS,
+    BACKEND_SHORT_AUDIO_SECONDS,
+    BACKEND_SHORT_TEXT_CHARS,
+    TRANSLATION_HEDGE_ENABLED,
+    TRANSLATION_HEDGE_QUANTILE,
+)
+from translation_memory import TranslationMemory, TranslationResult
+from rate_limiter import RateLimiter, estimate_chat_tokens
+from metrics import METRICS, span
+from audio_encoding import prepare_upload, read_audio, is_audio_path, describe_audio, audio_duration
+from long_audio import long_audio_chunks, transcribe_chunks, stitch_transcripts
+from speech_translation import SpeechTranslator
+from backends import build_router, current_attempt, check_cancelled, BackendCancelled
 
 # Get specialized loggers
 transcription_logger = LOGGERS['transcription']
 api_logger = LOGGERS['api']
 
+# Models and prompts, shared with AsyncTranscriber
+STT_MODEL = "whisper-large-v3"
+TRANSLATION_MODEL = "llama-3.3-70b-versatile"
+SYSTEM_PROMPTS = {
+    "en-es": "You are a professional translator. Translate the following English text to natural, conversational Spanish. Only return the Spanish translation, no explanations.",
+    "es-en": "You are a professional translator. Translate the following Spanish text to natural, conversational English. Only return the English translation, no explanations."
+}
+
+# Batch translation packs segments behind numbered marker lines like [[1]]
+BATCH_INSTRUCTIONS = (
+    " The text is a list of independent segments, each introduced by a marker line such as [[1]]."
+    " Translate every segment separately and return each marker line unchanged, in the same order,"
+    " followed by its translation. Never merge, split, or skip segments."
+)
+SEGMENT_MARKER = re.compile(r"^\[\[(\d+)\]\][ \t]*$", re.MULTILINE)
+
+
+# Request builders, shared with AsyncTranscriber
+def prepare_groq_upload(file_path, audio_bytes):
+    """(filename, bytes) tuple the Groq client uploads"""
+    if AUDIO_NORMALIZE_ENABLED:
+        # Downmix/resample/encode so we upload 16 kHz mono instead of raw browser PCM
+        return prepare_upload(file_path, audio_bytes)
+    return file_path, audio_bytes
+
+
+def transcription_params(upload, prompt, language):
+    """Keyword arguments for a Whisper transcription request"""
+    return dict(file=upload, model=STT_MODEL, prompt=prompt, response_format="json", language=language, temperature=0.0)
+
+
+def translation_params(upload, prompt):
+    """Keyword arguments for a Whisper translation (to English) request"""
+    return dict(file=upload, model=STT_MODEL, prompt=prompt, response_format="json", temperature=0.0)
+
+
 class Transcriber:
-    def __init__(self):
+    def __init__(self, translation_memory=None, rate_limiter=None, base_url=None):
         transcription_logger.info("Initializing Transcriber with Groq API")
         try:
-            self.client = Groq(api_key=GROQ_API_KEY)
+            # base_url=None falls back to the GROQ_BASE_URL env var, then the public API
+            self.client = Groq(api_key=GROQ_API_KEY, base_url=base_url)
             transcription_logger.info("Groq client initialized successfully")
         except Exception as e:
             transcription_logger.error(f"Failed to initialize Groq client: {e}")
             raise
+        
+        if translation_memory is None and TRANSLATION_MEMORY_ENABLED:
+            translation_memory = TranslationMemory()
+        self.translation_memory = translation_memory
+        
+        # Shared by every session using this Transcriber, so requests queue instead of 429ing
+        if rate_limiter is None and GROQ_RATE_LIMIT_ENABLED:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
+
+        # Groq is one engine among those configured; see backends.py
+        self.stt = build_router("stt", STT_BACKENDS, self, BACKEND_SHORT_AUDIO_SECONDS)
+        if TRANSLATION_HEDGE_ENABLED:
+            # Text translation tails are hedged on their own percentile
+            self.mt = build_router("mt", MT_BACKENDS, self, BACKEND_SHORT_TEXT_CHARS,
+                                   hedge=True, hedge_quantile=TRANSLATION_HEDGE_QUANTILE)
+        else:
+            self.mt = build_router("mt", MT_BACKENDS, self, BACKEND_SHORT_TEXT_CHARS)
+
+        self.speech_translator = SpeechTranslator(self)
+
+    def _acquire(self, model, tokens=0):
+        """Wait for rate limiter capacity (no-op without a limiter)"""
+        if self.rate_limiter:
+            with span("rate_limit_wait", model=model):
+                self.rate_limiter.acquire(model, tokens)
+
+    def _acquire_chat(self, model, estimated_tokens):
+        """Rate limit a chat completion; hedge backups are refused instead of queued"""
+        attempt = current_attempt.get()
+        if attempt is not None and attempt.backup:
+            # Queueing would defeat the hedge and spend budget the primary may still need
+            if self.rate_limiter and not self.rate_limiter.try_acquire(model, estimated_tokens):
+                raise BackendCancelled("no rate limit headroom for a hedged request")
+        else:
+            self._acquire(model, estimated_tokens)
+        check_cancelled()
+
+    def _record_usage(self, model, estimated_tokens, usage):
+        """Correct the rate limiter's token estimate with what Groq reports"""
+        if self.rate_limiter and usage:
+            self.rate_limiter.record_usage(model, estimated_tokens, usage.total_tokens)
+
+    def _create_chat_completion(self, messages, max_tokens, model=TRANSLATION_MODEL):
+        """Rate-limited Llama chat completion"""
+        estimated_tokens = estimate_chat_tokens(messages, max_tokens)
+        self._acquire_chat(model, estimated_tokens)
+        with span("mt", model=model):
+            chat_completion = self.client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=0.1,
+                max_tokens=max_tokens
+            )
+        self._record_usage(model, estimated_tokens, getattr(chat_completion, "usage", None))
+        return chat_completion
+
+    def _stream_chat_completion(self, messages, max_tokens, model=TRANSLATION_MODEL):
+        """Rate-limited streamed Llama chat completion, yielding the text as it arrives
+
+        The whole read is one "mt" sample, and the usage Groq sends with the
+        final chunk corrects the rate limiter's estimate. A stream the reader
+        abandons (e.g. a cancelled hedge) is closed and not sampled.
+        """
+        estimated_tokens = estimate_chat_tokens(messages, max_tokens)
+        self._acquire_chat(model, estimated_tokens)
+        start = time.perf_counter()
+        usage = None
+        try:
+            stream = self.client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            try:
+                for chunk in stream:
+                    x_groq = getattr(chunk, "x_groq", None)
+                    usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+        except GeneratorExit:
+            raise
+        except Exception:
+            METRICS.observe("mt", time.perf_counter() - start, error=True, model=model, mode="stream")
+            raise
+        METRICS.observe("mt", time.perf_counter() - start, model=model, mode="stream")
+        self._record_usage(model, estimated_tokens, usage)
+
+    def _run_audio_request(self, audio, request):
+        """Load audio (path, bytes or buffer) and run request(upload) -> text on it
+
+        Long recordings are split at pauses and the chunks sent concurrently.
+        """
+        file_path, audio_bytes = read_audio(audio)
+        transcription_logger.debug(f"Audio size: {len(audio_bytes)} bytes")
 
-    def transcribe_audio(self, file_path, prompt=None, language="en"):
-        """Transcribe audio file to text"""
-        transcription_logger.info(f"Starting transcription: file={file_path}, language={language}")
-        api_logger.debug(f"Transcription params: prompt={prompt}, model=whisper-large-v3")
+        chunks = long_audio_chunks(audio_bytes) if LONG_AUDIO_ENABLED else None
+        if chunks:
+            return transcribe_chunks(chunks, lambda wav_bytes: request(prepare_groq_upload(file_path, wav_bytes)))
+        return request(prepare_groq_upload(file_path, audio_bytes))
+
+    def _run_audio_requests(self, audio, requests):
+        """Run several request(upload) -> text calls on one recording concurrently
+
+        The audio is read and encoded once and every request gets the same
+        upload(s). Returns one result per request: its text, or the exception
+        it raised.
+        """
+        file_path, audio_bytes = read_audio(audio)
+        transcription_logger.debug(f"Audio size: {len(audio_bytes)} bytes, {len(requests)} requests")
+
+        chunks = long_audio_chunks(audio_bytes) if LONG_AUDIO_ENABLED else None
+        pieces = [wav_bytes for _, wav_bytes in chunks] if chunks else [audio_bytes]
+
+        # Workers run in the caller's context so the rate limiter still sees its session
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=LONG_AUDIO_MAX_WORKERS * len(requests), thread_name_prefix="audio-requests") as executor:
+            uploads = list(executor.map(
+                lambda wav_bytes: context.copy().run(prepare_groq_upload, file_path, wav_bytes), pieces
+            ))
+            futures = [
+                [executor.submit(context.copy().run, request, upload) for upload in uploads]
+                for request in requests
+            ]
+
+        results = []
+        for request_futures in futures:
+            try:
+                texts = [future.result() for future in request_futures]
+            except Exception as e:
+                results.append(e)
+                continue
+            results.append(stitch_transcripts(texts) if chunks else texts[0])
+        return results
+
+    def _create_transcription(self, upload, prompt, language):
+        return self.stt.call("transcribe", upload, prompt, language, size=audio_duration(upload[1]))
+
+    def _create_translation(self, upload, prompt):
+        return self.stt.call("translate", upload, prompt, size=audio_duration(upload[1]))
+
+    def _groq_transcription(self, upload, prompt, language):
+        self._acquire(STT_MODEL)
+        transcription = self.client.audio.transcriptions.create(**transcription_params(upload, prompt, language))
+        return transcription.text
+
+    def _groq_translation(self, upload, prompt):
+        self._acquire(STT_MODEL)
+        translation = self.client.audio.translations.create(**translation_params(upload, prompt))
+        return translation.text
+
+    def transcribe_audio(self, audio, prompt=None, language="en"):
+        """Transcribe audio to text
+
+        audio is a file path, or bytes/memoryview/BytesIO holding the recording,
+        which is uploaded straight from memory.
+        """
+        transcription_logger.info(f"Starting transcription: audio={describe_audio(audio)}, language={language}")
+        api_logger.debug(f"Transcription params: prompt={prompt}, model={STT_MODEL}")
         
-        if not os.path.exists(file_path):
-            transcription_logger.error(f"Audio file not found: {file_path}")
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
             return "Error: Audio file not found."
 
         try:
-            # Get file info for logging
-            file_size = os.path.getsize(file_path)
-            transcription_logger.debug(f"Audio file size: {file_size} bytes")
-            
             start_time = time.time()
             
-            with open(file_path, "rb") as file:
-                api_logger.info("Making API call to Groq transcription endpoint")
-                transcription = self.client.audio.transcriptions.create(
-                    file=(file_path, file.read()),
-                    model="whisper-large-v3",
-                    prompt=prompt,
-                    response_format="json",
-                    language=language,
-                    temperature=0.0
+            api_logger.info("Making API call to Groq transcription endpoint")
+            with span("stt", operation="transcribe"):
+                result_text = self._run_audio_request(
+                    audio, lambda upload: self._create_transcription(upload, prompt, language)
                 )
             
             api_time = time.time() - start_time
             api_logger.info(f"Transcription API call completed in {api_time:.2f}s")
             
-            result_text = transcription.text
             transcription_logger.info(f"Transcription successful: '{result_text[:100]}...' ({len(result_text)} chars)")
             
             return result_text
@@ -58,35 +267,27 @@ class Transcriber:
             api_logger.error(f"API Error details: {str(e)}")
             return f"Error during transcription: {str(e)}"
 
-    def translate_audio(self, file_path, prompt=None):
-        """Translate audio from any language to English"""
-        transcription_logger.info(f"Starting audio translation: file={file_path}")
-        api_logger.debug(f"Translation params: prompt={prompt}, model=whisper-large-v3")
+    def translate_audio(self, audio, prompt=None):
+        """Translate audio (file path, bytes or buffer) from any language to English"""
+        transcription_logger.info(f"Starting audio translation: audio={describe_audio(audio)}")
+        api_logger.debug(f"Translation params: prompt={prompt}, model={STT_MODEL}")
         
-        if not os.path.exists(file_path):
-            transcription_logger.error(f"Audio file not found: {file_path}")
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
             return "Error: Audio file not found."
 
         try:
-            file_size = os.path.getsize(file_path)
-            transcription_logger.debug(f"Audio file size: {file_size} bytes")
-            
             start_time = time.time()
             
-            with open(file_path, "rb") as file:
-                api_logger.info("Making API call to Groq translation endpoint")
-                translation = self.client.audio.translations.create(
-                    file=(file_path, file.read()),
-                    model="whisper-large-v3",
-                    prompt=prompt,
-                    response_format="json",
-                    temperature=0.0
+            api_logger.info("Making API call to Groq translation endpoint")
+            with span("stt", operation="translate"):
+                result_text = self._run_audio_request(
+                    audio, lambda upload: self._create_translation(upload, prompt)
                 )
             
             api_time = time.time() - start_time
             api_logger.info(f"Translation API call completed in {api_time:.2f}s")
             
-            result_text = translation.text
             transcription_logger.info(f"Translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
             
             return result_text
@@ -96,87 +297,278 @@ class Transcriber:
             api_logger.error(f"API Error details: {str(e)}")
             return f"Error during translation: {str(e)}"
 
+    def transcribe_and_translate_audio(self, audio, language="es", prompt=None):
+        """(transcript in language, English translation) of one recording
+
+        Both Whisper calls run concurrently on the same upload, so the pair
+        takes about as long as the slower of the two.
+        """
+        transcription_logger.info(f"Starting transcription and audio translation: audio={describe_audio(audio)}, language={language}")
+        api_logger.debug(f"Transcription/translation params: prompt={prompt}, model={STT_MODEL}")
+
+        if is_audio_path(audio) and not os.path.exists(audio):
+            transcription_logger.error(f"Audio file not found: {audio}")
+            return "Error: Audio file not found.", "Error: Audio file not found."
+
+        try:
+            start_time = time.time()
+
+            api_logger.info("Making concurrent API calls to Groq transcription and translation endpoints")
+            with span("stt", operation="transcribe_translate"):
+                transcript, translation = self._run_audio_requests(audio, [
+                    lambda upload: self._create_transcription(upload, prompt, language),
+                    lambda upload: self._create_translation(upload, prompt),
+                ])
+
+            api_time = time.time() - start_time
+            api_logger.info(f"Transcription and translation API calls completed in {api_time:.2f}s")
+
+        except Exception as e:
+            transcription_logger.error(f"Transcription and audio translation failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            return f"Error during transcription: {str(e)}", f"Error during translation: {str(e)}"
+
+        if isinstance(transcript, Exception):
+            transcription_logger.error(f"Transcription failed: {transcript}")
+            transcript = f"Error during transcription: {str(transcript)}"
+        if isinstance(translation, Exception):
+            transcription_logger.error(f"Audio translation failed: {translation}")
+            translation = f"Error during translation: {str(translation)}"
+        transcription_logger.info(f"Transcription and translation finished: {len(transcript)} / {len(translation)} chars")
+        return transcript, translation
+
     def translate_text_to_spanish(self, english_text):
-        """Translate English text to Spanish using Llama 3.3 70B"""
+        """Translate English text to Spanish with the configured MT backend (Llama 3.3 70B on Groq by default)"""
         transcription_logger.info(f"Starting text translation to Spanish: '{english_text[:50]}...'")
-        api_logger.debug(f"Text translation params: model=llama-3.3-70b-versatile, temp=0.1")
+        api_logger.debug(f"Text translation params: model={TRANSLATION_MODEL}, temp=0.1")
+        
+        if self.translation_memory:
+            remembered = self.translation_memory.lookup("en-es", english_text)
+            if remembered is not None:
+                return remembered
         
         try:
             start_time = time.time()
             
-            api_logger.info("Making API call to Groq chat completion for Spanish translation")
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional translator. Translate the following English text to natural, conversational Spanish. Only return the Spanish translation, no explanations."
-                    },
-                    {
-                        "role": "user", 
-                        "content": english_text
-                    }
-                ],
-                model="llama-3.3-70b-versatile",
-                temperature=0.1,
-                max_tokens=1000
-            )
+            result_text = self.mt.call("translate", "en-es", english_text, size=len(english_text))
             
             api_time = time.time() - start_time
-            api_logger.info(f"Spanish translation API call completed in {api_time:.2f}s")
+            api_logger.info(f"Spanish translation completed in {api_time:.2f}s")
             
-            result_text = chat_completion.choices[0].message.content.strip()
             transcription_logger.info(f"Spanish translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
             
-            # Log usage if available
-            if hasattr(chat_completion, 'usage'):
-                api_logger.debug(f"Token usage: {chat_completion.usage}")
+            if self.translation_memory:
+                self.translation_memory.store("en-es", english_text, result_text)
             
-            return result_text
+            return TranslationResult(result_text)
             
         except Exception as e:
             transcription_logger.error(f"Spanish translation failed: {e}")
             api_logger.error(f"API Error details: {str(e)}")
-            return f"Error during text translation: {str(e)}"
+            return TranslationResult(f"Error during text translation: {str(e)}")
     
-    def translate_text_to_english(self, spanish_text):
-        """Translate Spanish text to English using Llama 3.3 70B"""
-        transcription_logger.info(f"Starting text translation to English: '{spanish_text[:50]}...'")
-        api_logger.debug(f"Text translation params: model=llama-3.3-70b-versatile, temp=0.1")
+    def stream_translate_text_to_spanish(self, english_text):
+        """Stream the Spanish translation of English text as it is generated"""
+        transcription_logger.info(f"Starting streamed text translation to Spanish: '{english_text[:50]}...'")
+        api_logger.debug(f"Text translation params: model={TRANSLATION_MODEL}, temp=0.1, stream=True")
+        
+        if self.translation_memory:
+            remembered = self.translation_memory.lookup("en-es", english_text)
+            if remembered is not None:
+                yield remembered
+                return
         
         try:
             start_time = time.time()
+            first_token_time = None
+            parts = []
             
-            api_logger.info("Making API call to Groq chat completion for English translation")
-            chat_completion = self.client.chat.completions.create(
+            api_logger.info("Making streaming API call to Groq chat completion for Spanish translation")
+            stream = self._stream_chat_completion(
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a professional translator. Translate the following Spanish text to natural, conversational English. Only return the English translation, no explanations."
+                        "content": SYSTEM_PROMPTS["en-es"]
                     },
                     {
                         "role": "user", 
-                        "content": spanish_text
+                        "content": english_text
                     }
                 ],
-                model="llama-3.3-70b-versatile",
-                temperature=0.1,
                 max_tokens=1000
             )
             
-            duration = time.time() - start_time
-            api_logger.info(f"Text translation API call completed in {duration:.2f}s")
+            for delta in stream:
+                if delta:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                        api_logger.info(f"Spanish translation first token after {first_token_time:.2f}s")
+                        METRICS.observe("mt_first_token", first_token_time)
+                    parts.append(delta)
+                    yield delta
+            
+            api_time = time.time() - start_time
+            api_logger.info(f"Streamed Spanish translation API call completed in {api_time:.2f}s")
+            
+            result_text = "".join(parts).strip()
+            transcription_logger.info(f"Streamed Spanish translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
+            
+            if self.translation_memory:
+                self.translation_memory.store("en-es", english_text, result_text)
+            
+        except Exception as e:
+            transcription_logger.error(f"Streamed Spanish translation failed: {e}")
+            api_logger.error(f"API Error details: {str(e)}")
+            raise
+    
+    def translate_text(self, direction, source_text):
+        """Translate text in the given direction ("en-es" or "es-en")"""
+        if direction == "en-es":
+            return self.translate_text_to_spanish(source_text)
+        return self.translate_text_to_english(source_text)
+
+    def translate_speech(self, audio, direction, strategy=None):
+        """(source_text, translation) for a recording using the configured strategy for direction
+
+        source_text is "" if the direct strategy was configured without a source transcript.
+        """
+        return self.speech_translator.translate(audio, direction, strategy)
+
+    def translate_text_batch(self, direction, texts):
+        """Translate many segments with one chat completion
+
+        Segments are packed behind numbered markers and split back apart on
+        them; any segment the model drops or mangles is retried on its own.
+        API errors for the packed request are raised so batch callers can back
+        off and retry.
+        """
+        results = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            remembered = self.translation_memory.lookup(direction, text) if self.translation_memory else None
+            if remembered is not None:
+                results[index] = remembered
+            elif not text.strip() or SEGMENT_MARKER.search(text):
+                # Blank or marker-like segments would confuse the split; do them alone
+                results[index] = self.translate_text(direction, text) if text.strip() else TranslationResult(text)
+            else:
+                pending.append(index)
+
+        if not pending:
+            return results
+
+        transcription_logger.info(f"Starting batch text translation ({direction}): {len(pending)} segments")
+        packed = "\n".join(f"[[{number}]]\n{texts[index].strip()}" for number, index in enumerate(pending, 1))
+        start_time = time.time()
+
+        api_logger.info(f"Making API call to Groq chat completion for batch translation ({direction})")
+        chat_completion = self._create_chat_completion(
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPTS[direction] + BATCH_INSTRUCTIONS
+                },
+                {
+                    "role": "user",
+                    "content": packed
+                }
+            ],
+            max_tokens=max(1000, len(packed) // 2)
+        )
+
+        api_time = time.time() - start_time
+        api_logger.info(f"Batch translation API call ({direction}) completed in {api_time:.2f}s")
+        if hasattr(chat_completion, 'usage'):
+            api_logger.debug(f"Token usage: {chat_completion.usage}")
+
+        content = chat_completion.choices[0].message.content or ""
+        parts = SEGMENT_MARKER.split(content)
+        # split() yields [preamble, number, text, number, text, ...]
+        translated = {int(number): text.strip() for number, text in zip(parts[1::2], parts[2::2])}
+
+        retried = 0
+        for number, index in enumerate(pending, 1):
+            result_text = translated.get(number)
+            if result_text:
+                if self.translation_memory:
+                    self.translation_memory.store(direction, texts[index], result_text)
+                results[index] = TranslationResult(result_text)
+            else:
+                retried += 1
+                results[index] = self.translate_text(direction, texts[index])
+
+        if retried:
+            transcription_logger.warning(f"Batch translation ({direction}) retried {retried}/{len(pending)} segments individually")
+        return results
+
+    def _groq_translate_text(self, direction, source_text, model=None):
+        """One Llama chat completion translating source_text in direction
+
+        Hedged attempts stream the completion so the losing request can hang
+        up, and stop generating, as soon as the other one has answered.
+        """
+        model = model or TRANSLATION_MODEL
+        api_logger.info(f"Making API call to Groq chat completion ({model}) for {direction} translation")
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPTS[direction]
+            },
+            {
+                "role": "user", 
+                "content": source_text
+            }
+        ]
+        
+        if current_attempt.get() is not None:
+            stream = self._stream_chat_completion(messages=messages, max_tokens=1000, model=model)
+            parts = []
+            try:
+                for delta in stream:
+                    check_cancelled()
+                    parts.append(delta)
+            finally:
+                stream.close()
+            return "".join(parts).strip()
+        
+        chat_completion = self._create_chat_completion(
+            messages=messages,
+            max_tokens=1000,
+            model=model
+        )
+        
+        # Log usage if available
+        if hasattr(chat_completion, 'usage'):
+            api_logger.debug(f"Token usage: {chat_completion.usage}")
+        
+        return chat_completion.choices[0].message.content.strip()
+
+    def translate_text_to_english(self, spanish_text):
+        """Translate Spanish text to English with the configured MT backend (Llama 3.3 70B on Groq by default)"""
+        transcription_logger.info(f"Starting text translation to English: '{spanish_text[:50]}...'")
+        api_logger.debug(f"Text translation params: model={TRANSLATION_MODEL}, temp=0.1")
+        
+        if self.translation_memory:
+            remembered = self.translation_memory.lookup("es-en", spanish_text)
+            if remembered is not None:
+                return remembered
+        
+        try:
+            start_time = time.time()
             
-            result_text = chat_completion.choices[0].message.content.strip()
+            result_text = self.mt.call("translate", "es-en", spanish_text, size=len(spanish_text))
             
-            # Log usage if available
-            if hasattr(chat_completion, 'usage'):
-                api_logger.debug(f"Token usage: {chat_completion.usage}")
+            duration = time.time() - start_time
+            api_logger.info(f"Text translation completed in {duration:.2f}s")
             
             transcription_logger.info(f"Translation successful: '{result_text[:100]}...' ({len(result_text)} chars)")
             
-            return result_text
+            if self.translation_memory:
+                self.translation_memory.store("es-en", spanish_text, result_text)
+            
+            return TranslationResult(result_text)
             
         except Exception as e:
             transcription_logger.error(f"English translation failed: {e}")
             api_logger.error(f"API Error details: {str(e)}")
-            return f"Error during text translation: {str(e)}"
\ No newline at end of file
+            return TranslationResult(f"Error during text translation: {str(e)}")
\ No newline at end of file
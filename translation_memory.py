@@ -0,0 +1,187 @@
+"""
+SQLite-backed translation memory for the Llama text translation calls.
+Operators repeat the same stock phrases all day; an exact (or close enough)
+match is served from here instead of a fresh chat completion.
+"""
+import os
+import time
+import difflib
+import sqlite3
+import threading
+import unicodedata
+from config import (
+    LOGGERS,
+    TRANSLATION_MEMORY_PATH,
+    TRANSLATION_MEMORY_MAX_ENTRIES,
+    TRANSLATION_MEMORY_FUZZY_THRESHOLD,
+)
+
+transcription_logger = LOGGERS['transcription']
+
+# Only this many recent same-length candidates are scored for a fuzzy match
+FUZZY_CANDIDATE_LIMIT = 500
+FUZZY_LENGTH_TOLERANCE = 0.25
+
+
+class TranslationResult(str):
+    """Translated text tagged with where it came from"""
+
+    def __new__(cls, text, from_memory=False, match_score=None):
+        result = super().__new__(cls, text)
+        result.from_memory = from_memory
+        result.match_score = match_score
+        return result
+
+
+def normalize_source(text):
+    """Normalize source text for exact-match lookups"""
+    text = unicodedata.normalize("NFC", str(text or ""))
+    return " ".join(text.split()).casefold()
+
+
+class TranslationMemory:
+    def __init__(self, db_path=TRANSLATION_MEMORY_PATH, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES,
+                 fuzzy_threshold=TRANSLATION_MEMORY_FUZZY_THRESHOLD):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        # 0 disables fuzzy matching; otherwise a difflib ratio in (0, 1]
+        self.fuzzy_threshold = fuzzy_threshold
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Shared by every Streamlit session thread, serialized by self._lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory (
+                direction TEXT NOT NULL,
+                source_key TEXT NOT NULL,
+                source_len INTEGER NOT NULL,
+                translation TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (direction, source_key)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS memory_len ON memory (direction, source_len)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS memory_last_used ON memory (last_used)"
+        )
+        self._conn.commit()
+        transcription_logger.info(
+            f"Translation memory ready: {db_path} ({self.count()} entries, "
+            f"fuzzy_threshold={self.fuzzy_threshold})"
+        )
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def lookup(self, direction, source_text):
+        """Return a TranslationResult from memory, or None on a miss"""
+        key = normalize_source(source_text)
+        if not key:
+            return None
+
+        try:
+            return self._lookup(direction, key)
+        except sqlite3.Error as e:
+            # A broken memory must never block a live translation
+            transcription_logger.error(f"Translation memory lookup failed: {e}")
+            return None
+
+    def _lookup(self, direction, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM memory WHERE direction = ? AND source_key = ?",
+                (direction, key),
+            ).fetchone()
+            if row:
+                self._touch_locked(direction, key)
+                transcription_logger.info(f"Translation memory hit ({direction}): '{key[:50]}'")
+                return TranslationResult(row[0], from_memory=True, match_score=1.0)
+
+            match = self._fuzzy_locked(direction, key) if self.fuzzy_threshold else None
+            if match:
+                match_key, translation, score = match
+                self._touch_locked(direction, match_key)
+                transcription_logger.info(
+                    f"Translation memory fuzzy hit ({direction}, score={score:.2f}): '{key[:50]}'"
+                )
+                return TranslationResult(translation, from_memory=True, match_score=score)
+
+        transcription_logger.debug(f"Translation memory miss ({direction}): '{key[:50]}'")
+        return None
+
+    def _fuzzy_locked(self, direction, key):
+        """Best near-match above the threshold among similar-length entries"""
+        low = int(len(key) * (1 - FUZZY_LENGTH_TOLERANCE))
+        high = int(len(key) * (1 + FUZZY_LENGTH_TOLERANCE)) + 1
+        rows = self._conn.execute(
+            "SELECT source_key, translation FROM memory "
+            "WHERE direction = ? AND source_len BETWEEN ? AND ? "
+            "ORDER BY last_used DESC LIMIT ?",
+            (direction, low, high, FUZZY_CANDIDATE_LIMIT),
+        ).fetchall()
+
+        best = None
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(key)
+        for candidate_key, translation in rows:
+            matcher.set_seq1(candidate_key)
+            # Cheap upper bounds first; full ratio only for plausible candidates
+            if matcher.real_quick_ratio() < self.fuzzy_threshold:
+                continue
+            if matcher.quick_ratio() < self.fuzzy_threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.fuzzy_threshold and (best is None or score > best[2]):
+                best = (candidate_key, translation, score)
+        return best
+
+    def _touch_locked(self, direction, key):
+        self._conn.execute(
+            "UPDATE memory SET hits = hits + 1, last_used = ? WHERE direction = ? AND source_key = ?",
+            (time.time(), direction, key),
+        )
+        self._conn.commit()
+
+    def store(self, direction, source_text, translation):
+        """Remember a translation, evicting least recently used entries past max_entries"""
+        key = normalize_source(source_text)
+        if not key or not translation:
+            return
+
+        try:
+            evicted = self._store(direction, key, translation)
+        except sqlite3.Error as e:
+            transcription_logger.error(f"Translation memory store failed: {e}")
+            return
+
+        if evicted:
+            transcription_logger.info(f"Translation memory evicted {evicted} entries")
+
+    def _store(self, direction, key, translation):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO memory (direction, source_key, source_len, translation, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (direction, source_key) DO UPDATE SET "
+                "translation = excluded.translation, last_used = excluded.last_used",
+                (direction, key, len(key), str(translation), now, now),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM memory WHERE rowid IN ("
+                "SELECT rowid FROM memory ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._conn.commit()
+        return evicted
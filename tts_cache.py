@@ -0,0 +1,332 @@
+"""
+Content-addressed on-disk cache for synthesized TTS audio.
+Streamlit reruns the whole script on every widget change, so without this the
+same translation is re-synthesized (and re-billed) by ElevenLabs over and over.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from config import LOGGERS, TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+from waveform import PEAKS_SUFFIX
+
+tts_logger = LOGGERS['tts']
+
+# Temp files older than this are leftovers of interrupted writes; younger ones may
+# belong to another process sharing the cache directory
+STALE_TMP_SECONDS = 3600
+
+
+def normalize_text(text):
+    """Normalize text so cosmetic differences map to the same cache entry"""
+    text = unicodedata.normalize("NFC", str(text or ""))
+    return " ".join(text.split())
+
+
+class TTSCache:
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+
+        # key -> (path, size), least recently used first
+        self._index = OrderedDict()
+        # key -> StreamingEntry for downloads still in progress
+        self._streams = {}
+        # key -> number of holders; pinned entries are never evicted
+        self._pins = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+        tts_logger.info(
+            f"TTS cache ready: {self.cache_dir} ({len(self._index)} entries, "
+            f"{self.total_bytes} / {self.max_bytes} bytes)"
+        )
+
+    @staticmethod
+    def make_key(text, voice_id, model_id, voice_settings):
+        """Build the content address for a synthesis request"""
+        payload = json.dumps(
+            {
+                "text": normalize_text(text),
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "voice_settings": voice_settings or {},
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        """Rebuild the in-process index from disk, oldest access first"""
+        entries = []
+        stale_before = time.time() - STALE_TMP_SECONDS
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".tmp"):
+                if entry.stat().st_mtime < stale_before:
+                    # Leftover from an interrupted write
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+                continue
+            if entry.name.endswith(PEAKS_SUFFIX):
+                # Waveform sidecar of an entry, not audio; removed together with it
+                continue
+            key = os.path.splitext(entry.name)[0]
+            stat = entry.stat()
+            entries.append((stat.st_mtime, key, entry.path, stat.st_size))
+
+        for _, key, path, size in sorted(entries):
+            self._index[key] = (path, size)
+            self.total_bytes += size
+
+        with self._lock:
+            self._evict_locked()
+
+    def get(self, key):
+        """Return the cached audio path for key, or None on a miss"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and os.path.exists(entry[0]):
+                self._index.move_to_end(key)
+                self.hits += 1
+                path = entry[0]
+            else:
+                if entry:
+                    # File was removed behind our back
+                    del self._index[key]
+                    self.total_bytes -= entry[1]
+                self.misses += 1
+                path = None
+
+        if path:
+            # Persist recency so LRU order survives a restart
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            tts_logger.info(f"TTS cache hit: {key[:12]} ({self._counters()})")
+        else:
+            tts_logger.info(f"TTS cache miss: {key[:12]} ({self._counters()})")
+        return path
+
+    def path_for(self, key):
+        """Return the cached path for key without touching counters or recency"""
+        with self._lock:
+            entry = self._index.get(key)
+        return entry[0] if entry and os.path.exists(entry[0]) else None
+
+    def put(self, key, audio_bytes, suffix=".mp3"):
+        """Store audio for key and return its path"""
+        path = os.path.join(self.cache_dir, f"{key}{suffix}")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "wb") as fp:
+            fp.write(audio_bytes)
+        return self._commit(key, tmp_path, path, len(audio_bytes))
+
+    def open_stream(self, key, suffix=".mp3"):
+        """Start (or join) an incremental download for key
+
+        Returns (entry, created); only the caller that gets created=True
+        should write to the entry.
+        """
+        with self._lock:
+            entry = self._streams.get(key)
+            if entry:
+                return entry, False
+            path = os.path.join(self.cache_dir, f"{key}{suffix}")
+            entry = StreamingEntry(self, key, path)
+            self._streams[key] = entry
+            return entry, True
+
+    def stream_for(self, key):
+        """Return the in-flight download for key, if any"""
+        with self._lock:
+            return self._streams.get(key)
+
+    def _end_stream(self, key):
+        with self._lock:
+            self._streams.pop(key, None)
+
+    def _commit(self, key, tmp_path, path, size):
+        """Move a fully written temp file into place and index it"""
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous:
+                self.total_bytes -= previous[1]
+            self._index[key] = (path, size)
+            self.total_bytes += size
+            self._evict_locked(keep=key)
+
+        tts_logger.debug(f"TTS cache stored: {key[:12]} ({size} bytes, total={self.total_bytes})")
+        return path
+
+    @staticmethod
+    def _key_for_path(path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def pin(self, path):
+        """Keep the entry at path from being evicted (e.g. while a session is playing it)"""
+        key = self._key_for_path(path)
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, path):
+        key = self._key_for_path(path)
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+            self._evict_locked()
+
+    def _evict_locked(self, keep=None):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        evicted = 0
+        for key, (path, size) in list(self._index.items()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            del self._index[key]
+            self.total_bytes -= size
+            for stale_path in (path, path + PEAKS_SUFFIX):
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+            evicted += 1
+
+        if evicted:
+            self.evictions += evicted
+            tts_logger.info(f"TTS cache evicted {evicted} entries ({self._counters()})")
+
+    def _counters(self):
+        return (
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions} "
+            f"entries={len(self._index)} bytes={self.total_bytes}"
+        )
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class StreamIncomplete(Exception):
+    """A streamed entry failed or stalled before all of its audio arrived"""
+
+
+class StreamingEntry:
+    """A cache entry still being downloaded; readers can tail it while it grows"""
+
+    def __init__(self, cache, key, path):
+        self.cache = cache
+        self.key = key
+        self.path = path
+        self.tmp_path = f"{path}.{id(self)}.tmp"
+        self.size = 0
+        self.done = False
+        self.failed = False
+        self._fp = open(self.tmp_path, "wb")
+        self._cond = threading.Condition()
+
+    def write(self, chunk):
+        self._fp.write(chunk)
+        self._fp.flush()
+        with self._cond:
+            self.size += len(chunk)
+            self._cond.notify_all()
+
+    def finish(self):
+        """Commit the download into the cache"""
+        self._fp.close()
+        with self._cond:
+            # Rename under the condition so readers never see a missing temp file
+            self.cache._commit(self.key, self.tmp_path, self.path, self.size)
+            self.done = True
+            self._cond.notify_all()
+        self.cache._end_stream(self.key)
+        tts_logger.debug(f"TTS stream committed: {self.key[:12]} ({self.size} bytes)")
+
+    def fail(self):
+        """Abandon the download and wake up any readers"""
+        self._fp.close()
+        with self._cond:
+            try:
+                os.remove(self.tmp_path)
+            except OSError:
+                pass
+            self.failed = True
+            self._cond.notify_all()
+        self.cache._end_stream(self.key)
+
+    def wait_for_data(self, min_bytes=1, timeout=None):
+        """Block until min_bytes are available or the download ends; False if it failed"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.size >= min_bytes or self.done or self.failed, timeout)
+            return not self.failed and self.size > 0
+
+    def wait_until_done(self, timeout=None):
+        """Block until the download ends; returns the committed path or None"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done or self.failed, timeout)
+            return self.path if self.done else None
+
+    def iter_chunks(self, chunk_size=16384, timeout=30):
+        """Yield the audio from the start, following the download as it grows
+
+        Raises StreamIncomplete if the download fails or produces nothing new
+        for timeout seconds, so readers can tell a cut-off stream from a whole one.
+        """
+        with self._cond:
+            if self.failed:
+                raise StreamIncomplete("download failed")
+            # The temp file is renamed on finish; an already open handle survives that
+            fp = open(self.path if self.done else self.tmp_path, "rb")
+
+        with fp:
+            position = 0
+            while True:
+                with self._cond:
+                    if not self._cond.wait_for(
+                        lambda: self.size > position or self.done or self.failed, timeout
+                    ):
+                        raise StreamIncomplete(f"no data for {timeout}s")
+                    if self.failed:
+                        raise StreamIncomplete("download failed")
+                    available = self.size - position
+                    finished = self.done
+
+                while available > 0:
+                    chunk = fp.read(min(chunk_size, available))
+                    if not chunk:
+                        break
+                    position += len(chunk)
+                    available -= len(chunk)
+                    yield chunk
+
+                if finished and position >= self.size:
+                    return
@@ -0,0 +1,313 @@
+"""
+ElevenLabs text-to-speech client.
+A single pooled keep-alive session with timeouts, retry/backoff and a circuit
+breaker, plus request helpers shared with the async path.
+"""
+import time
+import random
+import threading
+import email.utils
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    LOGGERS,
+    ELEVEN_LABS_API_KEY,
+    ELEVEN_LABS_BASE_URL,
+    ELEVEN_LABS_MODEL_ID,
+    ELEVEN_LABS_VOICE_SETTINGS,
+    ELEVEN_LABS_CONNECT_TIMEOUT,
+    ELEVEN_LABS_READ_TIMEOUT,
+    ELEVEN_LABS_MAX_RETRIES,
+    ELEVEN_LABS_BACKOFF_BASE,
+    ELEVEN_LABS_BACKOFF_MAX,
+    ELEVEN_LABS_POOL_SIZE,
+    ELEVEN_LABS_BREAKER_THRESHOLD,
+    ELEVEN_LABS_BREAKER_RESET,
+    TTS_STREAM_CHUNK_SIZE,
+    TTS_BACKENDS,
+    BACKEND_SHORT_TEXT_CHARS,
+)
+from metrics import METRICS, span
+from backends import build_router
+
+tts_logger = LOGGERS['tts']
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def build_tts_request(text, voice_id, base_url=ELEVEN_LABS_BASE_URL, stream=False):
+    """Return (url, headers, payload) for an ElevenLabs synthesis request"""
+    url = f"{base_url}/v1/text-to-speech/{voice_id}"
+    if stream:
+        url += "/stream"
+
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": ELEVEN_LABS_API_KEY
+    }
+
+    payload = {
+        "text": text,
+        "model_id": ELEVEN_LABS_MODEL_ID,
+        "voice_settings": ELEVEN_LABS_VOICE_SETTINGS
+    }
+    return url, headers, payload
+
+
+def tts_cache_key(tts_cache, text, voice_id):
+    """Cache key for the request build_tts_request would make"""
+    return tts_cache.make_key(text, voice_id, ELEVEN_LABS_MODEL_ID, ELEVEN_LABS_VOICE_SETTINGS)
+
+
+def has_mp3_header(audio_bytes):
+    """Check the first few bytes for an MP3 signature"""
+    header = bytes(audio_bytes[:4])
+    if not (header.startswith(b'ID3') or header.startswith(b'\xff\xfb')):
+        tts_logger.error(f"Invalid MP3 header from ElevenLabs: {header}")
+        return False
+    return True
+
+
+def validate_tts_audio(audio_bytes):
+    """Return True if audio_bytes looks like a usable MP3 from ElevenLabs"""
+    file_size = len(audio_bytes)
+    if file_size < 100:
+        tts_logger.error(f"ElevenLabs audio file too small: {file_size} bytes")
+        return False
+
+    return has_mp3_header(audio_bytes)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures → half-open trial after a cooldown"""
+
+    def __init__(self, failure_threshold=ELEVEN_LABS_BREAKER_THRESHOLD, reset_timeout=ELEVEN_LABS_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self._trial_in_flight = False
+                tts_logger.info("ElevenLabs circuit breaker half-open, allowing a trial request")
+            if self.state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                tts_logger.info("ElevenLabs circuit breaker closed")
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a request that says nothing about the service's health (e.g. a 4xx) without changing state"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    tts_logger.error(
+                        f"ElevenLabs circuit breaker open after {self.failures} failures "
+                        f"(cooldown {self.reset_timeout:.0f}s)"
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class TTSClient:
+    def __init__(self, base_url=ELEVEN_LABS_BASE_URL, connect_timeout=ELEVEN_LABS_CONNECT_TIMEOUT,
+                 read_timeout=ELEVEN_LABS_READ_TIMEOUT, max_retries=ELEVEN_LABS_MAX_RETRIES,
+                 backoff_base=ELEVEN_LABS_BACKOFF_BASE, backoff_max=ELEVEN_LABS_BACKOFF_MAX,
+                 pool_size=ELEVEN_LABS_POOL_SIZE, breaker=None):
+        tts_logger.info(f"Initializing ElevenLabs TTS client: {base_url}")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        # Keep-alive pool so repeat syntheses skip the TCP/TLS handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Cached syntheses go through the configured engines; streaming is ElevenLabs-only
+        self.backends = build_router("tts", TTS_BACKENDS, self, BACKEND_SHORT_TEXT_CHARS)
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, or the server's Retry-After if it asked"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, url, **kwargs):
+        """POST with retries on 429/5xx/connection errors; returns the successful response"""
+        if not self.breaker.allow():
+            raise CircuitOpenError("ElevenLabs circuit breaker is open")
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+                tts_logger.warning(f"ElevenLabs request error (attempt {attempt + 1}): {e}")
+            except Exception:
+                # Not retried (e.g. a broken body or an invalid URL), but a half-open trial must not stay in flight
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    if response.ok:
+                        self.breaker.record_success()
+                    else:
+                        # Client errors are our fault: neither trip the breaker nor close it
+                        self.breaker.release()
+                    response.raise_for_status()
+                    return response
+
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} from ElevenLabs", response=response
+                )
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                tts_logger.warning(
+                    f"ElevenLabs returned {response.status_code} (attempt {attempt + 1}, "
+                    f"retry_after={retry_after})"
+                )
+                response.close()
+
+            if attempt >= self.max_retries:
+                self.breaker.record_failure()
+                raise error
+
+            delay = self._backoff(attempt, retry_after)
+            tts_logger.debug(f"Retrying ElevenLabs request in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def synthesize(self, text, voice_id):
+        """Synthesize text and return the raw MP3 bytes"""
+        url, headers, payload = build_tts_request(text, voice_id, base_url=self.base_url)
+        start_time = time.time()
+        with span("tts"):
+            response = self.post(url, json=payload, headers=headers)
+            audio_bytes = response.content
+        tts_logger.debug(f"ElevenLabs synthesis took {time.time() - start_time:.2f}s ({len(audio_bytes)} bytes)")
+        return audio_bytes
+
+    def synthesize_to_cache(self, tts_cache, text, voice_id):
+        """Cache-first synthesis; returns the cached MP3 path, or None on failure"""
+        cache_key = tts_cache_key(tts_cache, text, voice_id)
+        cached_path = tts_cache.get(cache_key)
+        if cached_path:
+            return cached_path
+
+        try:
+            tts_logger.debug(f"Making ElevenLabs API request for voice {voice_id}")
+            audio_bytes = self.backends.call("synthesize", text, voice_id, size=len(text))
+
+            # Validate it's actually MP3 audio before it goes into the cache
+            if not validate_tts_audio(audio_bytes):
+                return None
+
+            audio_path = tts_cache.put(cache_key, audio_bytes)
+            tts_logger.info(f"ElevenLabs audio generated: {audio_path} ({len(audio_bytes)} bytes)")
+            return audio_path
+
+        except requests.exceptions.RequestException as e:
+            tts_logger.error(f"ElevenLabs API request failed: {e}")
+            return None
+        except Exception as e:
+            tts_logger.error(f"ElevenLabs TTS generation failed: {e}")
+            return None
+
+    def stream(self, text, voice_id, chunk_size=TTS_STREAM_CHUNK_SIZE):
+        """Synthesize via the /stream endpoint, yielding MP3 bytes as they arrive
+
+        Retries only happen before the first byte; a failure mid-body raises.
+        """
+        url, headers, payload = build_tts_request(text, voice_id, base_url=self.base_url, stream=True)
+        response = self.post(url, json=payload, headers=headers, stream=True)
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
+
+    def stream_to(self, entry, text, voice_id):
+        """Download a streamed synthesis into a StreamingEntry, committing it on success"""
+        start_time = time.time()
+        header = b""
+        try:
+            for chunk in self.stream(text, voice_id):
+                if header is not None:
+                    # Hold the first bytes back until the MP3 signature is confirmed
+                    header += chunk
+                    if len(header) < 4:
+                        continue
+                    if not has_mp3_header(header):
+                        entry.fail()
+                        return False
+                    chunk, header = header, None
+                    tts_logger.info(f"ElevenLabs stream first bytes after {time.time() - start_time:.2f}s")
+                    METRICS.observe("tts_first_byte", time.time() - start_time)
+                entry.write(chunk)
+
+            if header is not None or entry.size < 100:
+                tts_logger.error(f"ElevenLabs stream too small: {entry.size} bytes")
+                entry.fail()
+                return False
+
+            entry.finish()
+            tts_logger.info(f"ElevenLabs stream completed in {time.time() - start_time:.2f}s ({entry.size} bytes)")
+            METRICS.observe("tts", time.time() - start_time, mode="stream")
+            return True
+
+        except Exception as e:
+            tts_logger.error(f"ElevenLabs streaming TTS failed: {e}")
+            METRICS.observe("tts", time.time() - start_time, error=True, mode="stream")
+            entry.fail()
+            return False
@@ -0,0 +1,182 @@
+"""
+Energy / zero-crossing voice activity detection for recorded WAV audio.
+Leading and trailing silence and long pauses are trimmed before upload, so we
+stop paying for them in upload bytes and Whisper processing time.
+"""
+import io
+import math
+import wave
+import array
+import warnings
+from config import (
+    LOGGERS,
+    VAD_FRAME_MS,
+    VAD_PADDING_MS,
+    VAD_MAX_PAUSE_MS,
+    VAD_KEEP_PAUSE_MS,
+    VAD_ENERGY_RATIO,
+    VAD_MIN_RMS,
+)
+
+audio_logger = LOGGERS['audio']
+
+# audioop is C-fast but deprecated (removed in Python 3.13); fall back to pure Python
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+ARRAY_TYPECODES = {1: "b", 2: "h", 4: "i"}
+
+
+def _frame_rms(frame, sample_width):
+    if audioop:
+        return audioop.rms(frame, sample_width)
+    samples = _samples(frame, sample_width)
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples)))
+
+
+def _frame_zcr(frame, sample_width):
+    """Zero crossings per sample; high for unvoiced consonants, low for hum"""
+    count = len(frame) // sample_width
+    if not count:
+        return 0.0
+    if audioop:
+        return audioop.cross(frame, sample_width) / count
+    samples = _samples(frame, sample_width)
+    crossings = sum(1 for a, b in zip(samples, samples[1:]) if (a < 0) != (b < 0))
+    return crossings / count
+
+
+def _samples(frame, sample_width):
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        return [b - 128 for b in frame]
+    return array.array(ARRAY_TYPECODES[sample_width], frame)
+
+
+def _mono_pcm(pcm, sample_width, channels):
+    """First-channel / downmixed PCM, used only for analysis"""
+    if channels == 1:
+        return pcm
+    if audioop and channels == 2:
+        return audioop.tomono(pcm, sample_width, 0.5, 0.5)
+    if sample_width == 1:
+        return pcm[::channels]
+    return array.array(ARRAY_TYPECODES[sample_width], pcm)[::channels].tobytes()
+
+
+def detect_speech(frames_rms, frames_zcr, energy_ratio=VAD_ENERGY_RATIO, min_rms=VAD_MIN_RMS):
+    """Flag each frame as speech using an adaptive noise floor"""
+    ordered = sorted(frames_rms)
+    if not ordered:
+        return []
+    noise_floor = ordered[len(ordered) // 10]
+    loud = ordered[(len(ordered) * 95) // 100]
+    # A recording with hardly any silence has a "noise floor" that is really speech;
+    # never demand more than a fraction of the loud frames' energy
+    threshold = max(min_rms, min(noise_floor * energy_ratio, loud * 0.3))
+
+    speech = []
+    for rms, zcr in zip(frames_rms, frames_zcr):
+        # Quieter frames still count if they look like fricatives (s, f, th)
+        speech.append(rms >= threshold or (rms >= threshold / 2 and zcr >= 0.25))
+    return speech
+
+
+def analyze_frames(pcm, sample_width, channels, samples_per_frame):
+    """Per-frame (rms, is_speech) lists for interleaved PCM"""
+    mono = _mono_pcm(pcm, sample_width, channels)
+    if audioop and sample_width == 1:
+        # 8-bit WAV is unsigned; audioop expects signed samples
+        mono = audioop.bias(mono, 1, -128)
+    mono_chunk = samples_per_frame * sample_width
+    mono_frames = [mono[i:i + mono_chunk] for i in range(0, len(mono), mono_chunk)]
+    frames_rms = [_frame_rms(frame, sample_width) for frame in mono_frames]
+    frames_zcr = [_frame_zcr(frame, sample_width) for frame in mono_frames]
+    return frames_rms, detect_speech(frames_rms, frames_zcr)
+
+
+def trim_silence(wav_bytes, frame_ms=VAD_FRAME_MS, padding_ms=VAD_PADDING_MS,
+                 max_pause_ms=VAD_MAX_PAUSE_MS, keep_pause_ms=VAD_KEEP_PAUSE_MS):
+    """Trim leading/trailing silence and collapse long pauses in a WAV recording
+
+    Returns (wav_bytes, stats). The input is returned untouched if it is not a
+    PCM WAV file or no speech is found, so Whisper still gets to decide.
+    """
+    stats = {"original_seconds": 0.0, "trimmed_seconds": 0.0, "seconds_saved": 0.0, "bytes_saved": 0}
+
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as reader:
+            params = reader.getparams()
+            pcm = reader.readframes(params.nframes)
+    except (wave.Error, EOFError) as e:
+        audio_logger.warning(f"VAD skipped, not a PCM WAV recording: {e}")
+        return wav_bytes, stats
+
+    if params.sampwidth not in ARRAY_TYPECODES:
+        audio_logger.warning(f"VAD skipped, unsupported sample width: {params.sampwidth}")
+        return wav_bytes, stats
+
+    frame_bytes = params.sampwidth * params.nchannels
+    samples_per_frame = max(1, params.framerate * frame_ms // 1000)
+    chunk_bytes = samples_per_frame * frame_bytes
+    stats["original_seconds"] = params.nframes / params.framerate
+
+    frames = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+    if not frames:
+        return wav_bytes, stats
+
+    _, speech = analyze_frames(pcm, params.sampwidth, params.nchannels, samples_per_frame)
+
+    if not any(speech):
+        audio_logger.info("VAD found no speech, sending recording unchanged")
+        stats["trimmed_seconds"] = stats["original_seconds"]
+        return wav_bytes, stats
+
+    # Pad speech on both sides so word onsets and tails are not clipped
+    padding = padding_ms // frame_ms
+    padded = list(speech)
+    for index, is_speech in enumerate(speech):
+        if is_speech:
+            for neighbour in range(max(0, index - padding), min(len(speech), index + padding + 1)):
+                padded[neighbour] = True
+
+    # Keep speech frames; inside the utterance, long pauses shrink to keep_pause_ms
+    first = padded.index(True)
+    last = len(padded) - 1 - padded[::-1].index(True)
+    max_pause = max_pause_ms // frame_ms
+    keep_pause = keep_pause_ms // frame_ms
+
+    kept = []
+    pause = []
+    for index in range(first, last + 1):
+        if padded[index]:
+            if pause:
+                kept.extend(pause if len(pause) <= max_pause else pause[:keep_pause])
+                pause = []
+            kept.append(frames[index])
+        else:
+            pause.append(frames[index])
+
+    trimmed_pcm = b"".join(kept)
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(params.nchannels)
+        writer.setsampwidth(params.sampwidth)
+        writer.setframerate(params.framerate)
+        writer.writeframes(trimmed_pcm)
+    trimmed_bytes = output.getvalue()
+
+    stats["trimmed_seconds"] = len(trimmed_pcm) / frame_bytes / params.framerate
+    stats["seconds_saved"] = stats["original_seconds"] - stats["trimmed_seconds"]
+    stats["bytes_saved"] = len(wav_bytes) - len(trimmed_bytes)
+    audio_logger.info(
+        f"VAD trimmed {stats['original_seconds']:.2f}s → {stats['trimmed_seconds']:.2f}s "
+        f"(saved {stats['seconds_saved']:.2f}s, {stats['bytes_saved']} bytes)"
+    )
+    return trimmed_bytes, stats
@@ -0,0 +1,218 @@
+"""
+Peak envelopes for the audio player's waveform.
+Each clip is reduced once to a few hundred (min, max) pairs and cached in a
+sidecar file next to the audio, so rerenders only ship a small JSON array.
+WAV clips are decoded exactly. There is no MP3 decoder in the standard
+library, so for MP3 (all TTS output) the envelope is estimated from each
+Layer III granule's global gain, which tracks loudness closely enough to draw.
+"""
+import io
+import os
+import json
+import wave
+import array
+import threading
+from config import LOGGERS, WAVEFORM_PEAKS
+from audio_encoding import _to_mono16
+
+audio_logger = LOGGERS['audio']
+
+# Stored next to the audio as <audio path><PEAKS_SUFFIX>
+PEAKS_SUFFIX = ".peaks.json"
+
+MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Each global_gain step is 1.5 dB; envelopes show this range below the loudest granule
+MP3_GAIN_STEP_DB = 1.5
+MP3_RANGE_DB = 48.0
+# Header version bits -> (MPEG version for the tables, sample rates)
+MP3_VERSIONS = {
+    0b11: (1, (44100, 48000, 32000)),
+    0b10: (2, (22050, 24000, 16000)),
+    0b00: (2, (11025, 12000, 8000)),
+}
+
+
+class _BitReader:
+    def __init__(self, data, offset):
+        self.data = data
+        self.position = offset * 8
+
+    def read(self, bits):
+        value = 0
+        for _ in range(bits):
+            byte = self.data[self.position >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.position & 7))) & 1)
+            self.position += 1
+        return value
+
+    def skip(self, bits):
+        self.position += bits
+
+
+def _skip_id3(data):
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return 10 + size
+    return 0
+
+
+def _mp3_granule_gains(data, offset, version, channels, crc):
+    """Global gain per granule of one Layer III frame (None for silent granules), from its side info"""
+    reader = _BitReader(data, offset + 4 + (2 if crc else 0))
+    if version == 1:
+        reader.skip(9 + (5 if channels == 1 else 3) + 4 * channels)
+        granules, granule_bits_after_gain = 2, 4 + 1 + 22 + 3
+    else:
+        reader.skip(8 + (1 if channels == 1 else 2))
+        granules, granule_bits_after_gain = 1, 9 + 1 + 22 + 2
+
+    gains = []
+    for _ in range(granules):
+        gain = None
+        for _ in range(channels):
+            part2_3_length = reader.read(12)
+            big_values = reader.read(9)
+            global_gain = reader.read(8)
+            reader.skip(granule_bits_after_gain)
+            if part2_3_length and big_values:
+                gain = global_gain if gain is None else max(gain, global_gain)
+        gains.append(gain)
+    return gains
+
+
+def _mp3_envelope(data):
+    """(duration, [gain per granule]) for MPEG Layer III data, or None"""
+    position = _skip_id3(data)
+    gains = []
+    duration = 0.0
+    while position + 4 <= len(data):
+        if data[position] != 0xFF or (data[position + 1] & 0xE0) != 0xE0:
+            position += 1
+            continue
+        header = int.from_bytes(data[position:position + 4], "big")
+        version_bits = (header >> 19) & 0b11
+        layer = (header >> 17) & 0b11
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0b11
+        if version_bits not in MP3_VERSIONS or layer != 0b01 or bitrate_index in (0, 15) or rate_index == 3:
+            position += 1
+            continue
+
+        version, rates = MP3_VERSIONS[version_bits]
+        sample_rate = rates[rate_index]
+        bitrate = MP3_BITRATES[version][bitrate_index] * 1000
+        padding = (header >> 9) & 1
+        channels = 1 if (header >> 6) & 0b11 == 0b11 else 2
+        crc = not (header >> 16) & 1
+        frame_length = (144 if version == 1 else 72) * bitrate // sample_rate + padding
+        if position + frame_length > len(data):
+            break
+
+        gains.extend(_mp3_granule_gains(data, position, version, channels, crc))
+        duration += (1152 if version == 1 else 576) / sample_rate
+        position += frame_length
+
+    if not gains:
+        return None
+    return duration, gains
+
+
+def _bucket(values, bins):
+    """Split values into bins consecutive runs (the last ones may be empty for short input)"""
+    count = len(values)
+    return [values[i * count // bins:(i + 1) * count // bins] for i in range(bins)]
+
+
+def compute_peaks(audio_bytes, bins=WAVEFORM_PEAKS):
+    """{"duration": seconds, "peaks": [[min, max], ...]} scaled to -1..1, or None if undecodable"""
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            params = reader.getparams()
+            pcm = reader.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        params = None
+
+    if params and params.sampwidth in (1, 2, 4):
+        samples = array.array("h", _to_mono16(pcm, params.sampwidth, params.nchannels))
+        duration = len(samples) / params.framerate if params.framerate else 0.0
+        peaks = [
+            [round(min(chunk) / 32768, 3), round(max(chunk) / 32768, 3)] if chunk else [0.0, 0.0]
+            for chunk in _bucket(samples, bins)
+        ]
+        return {"duration": duration, "peaks": peaks}
+
+    envelope = _mp3_envelope(audio_bytes)
+    if not envelope:
+        return None
+    duration, gains = envelope
+    loudest = max((gain for gain in gains if gain is not None), default=0)
+    levels = [
+        max(0.0, 1.0 - (loudest - gain) * MP3_GAIN_STEP_DB / MP3_RANGE_DB) if gain is not None else 0.0
+        for gain in gains
+    ]
+    peaks = []
+    for chunk in _bucket(levels, bins):
+        level = round(max(chunk), 3) if chunk else 0.0
+        peaks.append([-level if level else 0.0, level])
+    return {"duration": duration, "peaks": peaks}
+
+
+def peaks_for(audio_path, bins=WAVEFORM_PEAKS):
+    """Peaks for an audio file, computed once and cached in a sidecar next to it"""
+    sidecar_path = audio_path + PEAKS_SUFFIX
+    try:
+        if os.path.getmtime(sidecar_path) >= os.path.getmtime(audio_path):
+            with open(sidecar_path, "r", encoding="utf-8") as file:
+                cached = json.load(file)
+            if len(cached.get("peaks", ())) == bins:
+                return cached
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open(audio_path, "rb") as file:
+            peaks = compute_peaks(file.read(), bins)
+    except OSError as e:
+        audio_logger.debug(f"Waveform peaks unavailable for {audio_path}: {e}")
+        return None
+    if peaks is None:
+        audio_logger.debug(f"Waveform peaks unavailable for {audio_path}: unsupported format")
+        return None
+
+    tmp_path = f"{sidecar_path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(peaks, file, separators=(",", ":"))
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        # The audio may have been evicted meanwhile; the peaks are still usable
+        audio_logger.debug(f"Could not cache waveform peaks for {audio_path}: {e}")
+    return peaks
+
+
+def combine_peaks(clips, bins=WAVEFORM_PEAKS):
+    """One envelope for clips played back to back, each taking its share of the width by duration"""
+    clips = [clip for clip in clips if clip and clip["duration"] > 0]
+    if not clips:
+        return None
+    if len(clips) == 1:
+        return clips[0]
+
+    total = sum(clip["duration"] for clip in clips)
+    timeline = []
+    start = 0.0
+    for clip in clips:
+        step = clip["duration"] / len(clip["peaks"])
+        for index, peak in enumerate(clip["peaks"]):
+            timeline.append((start + index * step, peak))
+        start += clip["duration"]
+
+    peaks = [[0.0, 0.0] for _ in range(bins)]
+    for time_offset, (low, high) in timeline:
+        index = min(bins - 1, int(time_offset / total * bins))
+        peaks[index][0] = min(peaks[index][0], low)
+        peaks[index][1] = max(peaks[index][1], high)
+    return {"duration": total, "peaks": peaks}